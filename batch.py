@@ -0,0 +1,141 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from src.ekg import EKGTest
+from src.storage import DB_PATH, JSONPersonStore
+
+
+def analyze_test(job):
+    """
+    Analysiert einen einzelnen EKG-Test (läuft in einem Worker-Prozess).
+
+    Args:
+        job (dict): Test-ID, Person und Pfad zur EKG-Datei.
+
+    Returns:
+        dict: Eine Zeile der Ergebnistabelle inkl. Laufzeiten der einzelnen Schritte.
+    """
+    row = dict(job)
+    ekg_test = EKGTest(job["test_id"], job["date"], job["result_link"])
+    try:
+        start = time.perf_counter()
+        ekg_test.load_data()
+        loaded = time.perf_counter()
+        peaks = ekg_test.get_peaks()
+        detected = time.perf_counter()
+        bpm = ekg_test.bpm()
+        scored = time.perf_counter()
+        hrv = ekg_test.hrv()
+        done = time.perf_counter()
+        duration_ms = float(ekg_test.time[-1] - ekg_test.time[0]) if len(ekg_test.time) > 1 else 0.0
+        row.update({
+            "duration_min": duration_ms / 1000 / 60,
+            "num_peaks": len(peaks),
+            "bpm": bpm,
+            "sdnn_ms": hrv["sdnn_ms"],
+            "rmssd_ms": hrv["rmssd_ms"],
+            "pnn50": hrv["pnn50"],
+            "load_s": loaded - start,
+            "detect_s": detected - loaded,
+            "bpm_s": scored - detected,
+            "hrv_s": done - scored,
+            "total_s": done - start,
+            "error": "",
+        })
+    except Exception as e:
+        row["error"] = str(e)
+    return row
+
+
+def collect_jobs(persons_list):
+    """
+    Erstellt die Aufgabenliste aller EKG-Tests der Datenbank.
+
+    Args:
+        persons_list (list): Liste von Dictionaries mit Personendaten.
+
+    Returns:
+        list: Ein Dictionary pro EKG-Test.
+    """
+    return [
+        {
+            "test_id": test["id"],
+            "person_id": p["id"],
+            "person": f"{p['firstname']} {p['lastname']}",
+            "date": test.get("date"),
+            "result_link": test.get("result_link"),
+        }
+        for p in persons_list
+        for test in p.get("ekg_tests", [])
+    ]
+
+
+def run_batch(jobs, workers=None):
+    """
+    Analysiert alle Tests parallel in einem Prozess-Pool.
+
+    Args:
+        jobs (list): Aufgaben aus collect_jobs.
+        workers (int): Anzahl der Worker-Prozesse (Standard: Anzahl CPU-Kerne).
+
+    Returns:
+        pd.DataFrame: Ergebnistabelle in der Reihenfolge der Aufgaben.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        rows = [analyze_test(job) for job in jobs]
+    else:
+        # Mehrere Aufgaben pro Übergabe, damit sich der Prozess-Overhead bei großen Kohorten verteilt
+        chunksize = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = list(pool.map(analyze_test, jobs, chunksize=chunksize))
+    return pd.DataFrame(rows)
+
+
+def write_summary(df, path):
+    """
+    Schreibt die Ergebnistabelle als CSV oder Parquet (je nach Dateiendung).
+
+    Args:
+        df (pd.DataFrame): Ergebnistabelle.
+        path (str): Zieldatei (.csv oder .parquet).
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if path.lower().endswith(".parquet"):
+        df.to_parquet(path, index=False)  # benötigt pyarrow oder fastparquet
+    else:
+        df.to_csv(path, index=False)
+
+
+def main():
+    """
+    Kommandozeilen-Einstieg: analysiert alle EKG-Tests der Personen-Datenbank ohne Streamlit.
+    """
+    parser = argparse.ArgumentParser(description="Analysiert alle EKG-Tests der Personen-Datenbank parallel.")
+    parser.add_argument("--db", default=DB_PATH, help="Pfad zur Personen-Datenbank (.json oder .sqlite)")
+    parser.add_argument("--workers", type=int, default=None, help="Anzahl der Worker-Prozesse (Standard: alle Kerne)")
+    parser.add_argument("--output", default="batch_summary.csv", help="Zieldatei (.csv oder .parquet)")
+    args = parser.parse_args()
+
+    if args.db.lower().endswith(".sqlite"):
+        from src.sqlitestore import SQLitePersonStore
+        store = SQLitePersonStore(args.db)
+    else:
+        store = JSONPersonStore(args.db)
+    jobs = collect_jobs(store.load())
+
+    start = time.perf_counter()
+    df = run_batch(jobs, args.workers)
+    elapsed = time.perf_counter() - start
+    write_summary(df, args.output)
+
+    failed = int((df["error"] != "").sum()) if "error" in df else 0
+    print(f"{len(df)} Tests in {elapsed:.1f} s analysiert ({failed} fehlgeschlagen) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import argparse
+import glob
+import os
+import sys
+import time
+import numpy as np
+from src.signalcache import load_recording
+from src.peaks import default_peak_params, detect_peaks
+
+# Mitgelieferte Aufnahmen, auf denen beide Verfahren verglichen werden
+DEFAULT_PATTERNS = ["data/ekg_data/*.txt", "data/ekg_data/*.csv", "data/ekg/*.txt", "data/ekg/*.csv"]
+SKIP_FILES = {"ReadMe.txt"}
+
+
+def reference_peaks_txt(time_ms, voltage, threshold, min_distance_ms):
+    """
+    Ursprüngliche Schleifen-Implementierung von EKGTest.find_peaks (Referenz).
+    """
+    peak_indices = []
+    for i in range(1, len(voltage) - 1):
+        if (
+            voltage[i] >= voltage[i - 1]
+            and voltage[i] >= voltage[i + 1]
+            and voltage[i] > threshold
+        ):
+            peak_indices.append(i)
+    filtered_peaks = []
+    last_peak_time = -np.inf
+    for idx in peak_indices:
+        if time_ms[idx] - last_peak_time >= min_distance_ms:
+            filtered_peaks.append(idx)
+            last_peak_time = time_ms[idx]
+    return np.asarray(filtered_peaks, dtype=np.intp)
+
+
+def reference_peaks_csv(voltage, threshold, min_distance_samples):
+    """
+    Ursprüngliche Schleifen-Implementierung von EKGTest.find_peaks_csv (Referenz).
+    """
+    peaks = []
+    last_peak = -min_distance_samples
+    for i in range(1, len(voltage) - 1):
+        if (
+            voltage[i] > threshold and
+            voltage[i] > voltage[i - 1] and
+            voltage[i] > voltage[i + 1] and
+            (i - last_peak) >= min_distance_samples
+        ):
+            peaks.append(i)
+            last_peak = i
+    return np.asarray(peaks, dtype=np.intp)
+
+
+def compare_recording(path):
+    """
+    Erkennt die Peaks einer Aufnahme mit der Referenz und mit detect_peaks
+    (find_candidates + suppress_close) und misst beide Laufzeiten.
+
+    Args:
+        path (str): Pfad zur Aufnahme.
+
+    Returns:
+        dict: Anzahl Peaks, Übereinstimmung und Laufzeiten in Sekunden.
+    """
+    time_ms, voltage, filetype = load_recording(path, use_cache=False)
+    time_ms, voltage = np.asarray(time_ms), np.asarray(voltage)
+    params = default_peak_params(filetype)
+
+    if filetype == "csv":
+        min_distance = int(params["min_distance_ms"] / np.median(np.diff(time_ms)))
+        start = time.perf_counter()
+        reference = reference_peaks_csv(voltage, params["threshold"], min_distance)
+        loop_s = time.perf_counter() - start
+        start = time.perf_counter()
+        vectorized = detect_peaks(voltage, params["threshold"], min_distance, strict=True)
+        vectorized_s = time.perf_counter() - start
+    else:
+        start = time.perf_counter()
+        reference = reference_peaks_txt(time_ms, voltage, params["threshold"], params["min_distance_ms"])
+        loop_s = time.perf_counter() - start
+        start = time.perf_counter()
+        vectorized = detect_peaks(voltage, params["threshold"], params["min_distance_ms"], time=time_ms)
+        vectorized_s = time.perf_counter() - start
+
+    return {
+        "peaks": len(vectorized),
+        "identical": np.array_equal(reference, vectorized),
+        "loop_s": loop_s,
+        "vectorized_s": vectorized_s,
+    }
+
+
+def main():
+    """
+    Kommandozeilen-Einstieg: prüft, dass die vektorisierte Peak-Erkennung exakt
+    dieselben Indizes liefert wie die ursprünglichen Schleifen, und vergleicht die
+    Laufzeiten. Beendet sich mit Code 1, wenn eine Aufnahme abweicht.
+    """
+    parser = argparse.ArgumentParser(description="Vergleicht die vektorisierte Peak-Erkennung mit der Referenz.")
+    parser.add_argument("paths", nargs="*", help="Aufnahmen (Standard: mitgelieferte Daten)")
+    args = parser.parse_args()
+
+    paths = args.paths or sorted({path for pattern in DEFAULT_PATTERNS for path in glob.glob(pattern)
+                                  if os.path.basename(path) not in SKIP_FILES})
+    mismatches = 0
+    for path in paths:
+        result = compare_recording(path)
+        status = "OK" if result["identical"] else "ABWEICHUNG"
+        speedup = result["loop_s"] / result["vectorized_s"] if result["vectorized_s"] > 0 else float("inf")
+        print(f"{path:<45} {result['peaks']:6d} Peaks  Schleife {result['loop_s'] * 1000:9.2f} ms  "
+              f"vektorisiert {result['vectorized_s'] * 1000:7.2f} ms  (x{speedup:.0f})  {status}")
+        mismatches += not result["identical"]
+    if mismatches:
+        print(f"{mismatches} Aufnahme(n) mit abweichenden Peaks.")
+        sys.exit(1)
+    print("Alle Peaks identisch.")
+
+
+if __name__ == "__main__":
+    main()
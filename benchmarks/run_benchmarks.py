@@ -0,0 +1,211 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+from src import signalcache
+from src.ekg import EKGTest
+from src.peaks import DETECTOR_NAME, DETECTOR_VERSION, default_peak_params
+from src.resultstore import result_store
+from src.synthetic import write_synthetic_recording
+
+# Generierte Aufnahmen werden wiederverwendet, da das Erzeugen langer Dateien dauert
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+DEFAULT_SIZES_MIN = [1, 10, 60]
+DEFAULT_THRESHOLD = 0.2  # 20 % langsamer gilt als Regression
+NOISE_FLOOR_S = 0.001  # Unterschiede unter 1 ms werden ignoriert
+
+
+def recording_path(filetype, minutes):
+    """
+    Liefert den Pfad einer synthetischen Aufnahme und erzeugt sie bei Bedarf.
+
+    Args:
+        filetype (str): "txt" oder "csv".
+        minutes (float): Dauer in Minuten.
+
+    Returns:
+        str: Pfad zur Aufnahme.
+    """
+    path = os.path.join(DATA_DIR, f"synthetic_{minutes:g}min.{filetype}")
+    if not os.path.exists(path):
+        print(f"Erzeuge {path} ...", file=sys.stderr)
+        write_synthetic_recording(path, minutes)
+    return path
+
+
+def _fresh_test(path, load=True, peaks=False):
+    """
+    Erzeugt einen neuen EKGTest, optional mit geladenen Daten und Peaks.
+    """
+    ekg_test = EKGTest("bench", "", path)
+    if load:
+        ekg_test.load_data()
+    if peaks:
+        ekg_test.get_peaks()
+    return ekg_test
+
+
+def _without_stored_peaks(path):
+    """
+    Erzeugt einen geladenen EKGTest und löscht vorher gespeicherte Peaks der
+    Aufnahme, damit get_peaks die Erkennung tatsächlich ausführt.
+    """
+    ekg_test = _fresh_test(path)
+    stored = result_store.path_for(result_store.content_hash(path), DETECTOR_NAME, DETECTOR_VERSION,
+                                   default_peak_params(ekg_test.filetype))
+    if os.path.exists(stored):
+        os.remove(stored)
+    return ekg_test
+
+
+def stages(path):
+    """
+    Definiert die gemessenen Schritte. Jeder Eintrag besteht aus einer Vorbereitung
+    (nicht gemessen) und dem gemessenen Aufruf.
+
+    Args:
+        path (str): Pfad zur Aufnahme.
+
+    Returns:
+        dict: Name -> (setup, run)
+    """
+    def cold_setup():
+        signalcache.clear_signal_cache()
+        return _fresh_test(path, load=False)
+
+    return {
+        "load_data_cold": (cold_setup, lambda t: t.load_data()),
+        "load_data_warm": (lambda: _fresh_test(path, load=False), lambda t: t.load_data()),
+        # Erkennung mit dem zum Dateityp passenden Verfahren, wie in der App
+        "peaks": (lambda: _without_stored_peaks(path), lambda t: t.get_peaks()),
+        "bpm": (lambda: _fresh_test(path, peaks=True), lambda t: t.bpm()),
+        "plot_window": (lambda: _fresh_test(path, peaks=True),
+                        lambda t: t.plot_window(float(t.time[0]), float(t.time[-1]))),
+    }
+
+
+def measure(setup, run, repeat):
+    """
+    Misst die beste Laufzeit aus repeat Durchläufen und den Spitzen-Speicher eines
+    zusätzlichen Durchlaufs (tracemalloc, damit die Zeitmessung unverfälscht bleibt).
+
+    Returns:
+        tuple: (Sekunden, Spitzen-Speicher in MB)
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        obj = setup()
+        start = time.perf_counter()
+        run(obj)
+        best = min(best, time.perf_counter() - start)
+    obj = setup()
+    tracemalloc.start()
+    run(obj)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / 1024 / 1024
+
+
+def run_suite(sizes, repeat):
+    """
+    Führt alle Messungen für alle Größen und Dateitypen aus.
+
+    Args:
+        sizes (list): Dauer der Aufnahmen in Minuten.
+        repeat (int): Wiederholungen pro Messung.
+
+    Returns:
+        dict: Metadaten und Ergebnisliste.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # Eigene Cache-Verzeichnisse für Signale und Ergebnisse (samt gemerkter Hashes),
+        # damit die Messung den App-Cache nicht verändert
+        signalcache.SIGNAL_CACHE_DIR = cache_dir
+        result_store.directory = os.path.join(cache_dir, "results")
+        result_store._hashes = None
+        for minutes in sizes:
+            for filetype in ("txt", "csv"):
+                path = recording_path(filetype, minutes)
+                name = f"{filetype}_{minutes:g}min"
+                for stage, (setup, run) in stages(path).items():
+                    seconds, peak_mb = measure(setup, run, repeat)
+                    results.append({"recording": name, "stage": stage, "seconds": seconds, "peak_mb": peak_mb})
+                    print(f"{name:<14} {stage:<16} {seconds * 1000:10.2f} ms {peak_mb:9.1f} MB")
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Vergleicht Ergebnisse mit einer gespeicherten Baseline.
+
+    Args:
+        current (dict): Aktuelle Ergebnisse.
+        baseline (dict): Baseline-Ergebnisse.
+        threshold (float): Erlaubte relative Verlangsamung.
+
+    Returns:
+        list: Regressionen als (Aufnahme, Schritt, Baseline s, aktuell s).
+    """
+    base = {(r["recording"], r["stage"]): r["seconds"] for r in baseline["results"]}
+    regressions = []
+    for r in current["results"]:
+        old = base.get((r["recording"], r["stage"]))
+        if old is None:
+            continue
+        new = r["seconds"]
+        if new > old * (1 + threshold) and new - old > NOISE_FLOOR_S:
+            regressions.append((r["recording"], r["stage"], old, new))
+    return regressions
+
+
+def main():
+    """
+    Kommandozeilen-Einstieg der Benchmark-Suite.
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks für Laden, Peak-Erkennung, bpm und Plot.")
+    parser.add_argument("--sizes", type=float, nargs="+", default=DEFAULT_SIZES_MIN,
+                        help="Dauer der Aufnahmen in Minuten (24 h = 1440)")
+    parser.add_argument("--repeat", type=int, default=3, help="Wiederholungen pro Messung")
+    parser.add_argument("--output", default="benchmarks/results.json", help="Ergebnisdatei (JSON)")
+    parser.add_argument("--compare", metavar="BASELINE", help="Mit gespeicherter Baseline vergleichen")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Erlaubte relative Verlangsamung (0.2 = 20 %%)")
+    args = parser.parse_args()
+
+    current = run_suite(args.sizes, args.repeat)
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(current, f, indent=2)
+    print(f"Ergebnisse in {args.output} gespeichert.")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        for recording, stage, old, new in regressions:
+            print(f"REGRESSION {recording} {stage}: {old * 1000:.2f} ms -> {new * 1000:.2f} ms "
+                  f"(+{(new / old - 1) * 100:.0f} %)")
+        if regressions:
+            sys.exit(1)
+        print("Keine Regressionen gegenüber der Baseline.")
+
+
+if __name__ == "__main__":
+    main()
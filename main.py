@@ -1,9 +1,9 @@
 import streamlit as st
-import json
 from src.startseite import show_start_page
 from src.probantenauswahl import show_probantenauswahl, show_plot_page
-from src.persondb import PersonDB
+from src.persondb import get_shared_person_db
 from src.probdel import show_probdel
+from src.instrumentation import start_run, stage, finish_run, render_sidebar
 
 def main():
     """
@@ -16,22 +16,36 @@ def main():
     if "selected_person_id" not in st.session_state:
         st.session_state.selected_person_id = None
 
-    # Passe den Pfad an: 
-    with open("data/person_db.json", "r", encoding="utf-8") as f:
-        persons_list = json.load(f)
-    person_db = PersonDB(persons_list)
+    start_run(st.session_state.state)
+    try:
+        # Geteilte PersonDB des konfigurierten Speichers (JSON oder SQLite, siehe storage);
+        # neu geparst wird nur, wenn sich die Datei geändert hat
+        with stage("db_load") as s:
+            person_db = get_shared_person_db()
+            s.set(persons=len(person_db))
 
-    if st.session_state.state == "start":
-        show_start_page()
-    elif st.session_state.state == "probantenauswahl":
-        show_probantenauswahl(person_db)
-    elif st.session_state.state == "plot":
-        show_plot_page(person_db)
-    elif st.session_state.state == "probdel":
-        show_probdel(person_db)
-    elif st.session_state.state == "vergl":
-        from src.vergl import show_vergleich_page
-        show_vergleich_page(person_db)
+        if st.session_state.state == "start":
+            show_start_page()
+        elif st.session_state.state == "probantenauswahl":
+            show_probantenauswahl(person_db)
+        elif st.session_state.state == "plot":
+            show_plot_page(person_db)
+        elif st.session_state.state == "probdel":
+            show_probdel(person_db)
+        elif st.session_state.state == "vergl":
+            from src.vergl import show_vergleich_page
+            show_vergleich_page(person_db)
+        elif st.session_state.state == "dashboard":
+            from src.dashboard import show_dashboard_page
+            show_dashboard_page(person_db)
+        elif st.session_state.state == "live":
+            from src.livemodus import show_live_page
+            show_live_page()
+
+        # Optionale Laufzeitübersicht (nur mit EKG_PROFILE=1)
+        render_sidebar()
+    finally:
+        finish_run()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
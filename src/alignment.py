@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+BIN_MS = 10  # Auflösung der Schlagfolgen für die Kreuzkorrelation (100 Hz)
+SMOOTH_BINS = 5  # Breite der Glättung der Schlag-Impulse in Bins
+DISPLAY_RATE_HZ = 250  # Gemeinsame Abtastrate für die Überlagerung
+DEFAULT_MAX_LAG_MS = 10_000
+
+
+def beat_train(peak_times_ms, start_ms, n_bins, bin_ms=BIN_MS):
+    """
+    Wandelt Peak-Zeitpunkte in eine geglättete Impulsfolge auf einem festen Raster um.
+
+    Args:
+        peak_times_ms (np.ndarray): Zeitpunkte der Peaks in ms.
+        start_ms (float): Beginn des Rasters in ms.
+        n_bins (int): Anzahl der Bins.
+        bin_ms (float): Breite eines Bins in ms.
+
+    Returns:
+        np.ndarray: Impulsfolge der Länge n_bins.
+    """
+    bins = ((np.asarray(peak_times_ms, dtype=np.float64) - start_ms) // bin_ms).astype(np.int64)
+    bins = bins[(bins >= 0) & (bins < n_bins)]
+    train = np.bincount(bins, minlength=n_bins).astype(np.float64)
+    if SMOOTH_BINS > 1:
+        # Kleine Abweichungen der Peak-Lage sollen die Korrelation nicht zerstören
+        train = np.convolve(train, np.hanning(SMOOTH_BINS + 2)[1:-1], mode="same")
+    return train - train.mean()
+
+
+def estimate_lag(peak_times_a, peak_times_b, start_a=0.0, start_b=0.0, bin_ms=BIN_MS,
+                 max_lag_ms=DEFAULT_MAX_LAG_MS):
+    """
+    Bestimmt die Verschiebung zweier Aufnahmen über die Kreuzkorrelation ihrer
+    Schlagfolgen. Die Korrelation wird per FFT berechnet (O(n log n)).
+
+    Args:
+        peak_times_a (np.ndarray): Peak-Zeitpunkte der Referenz in ms.
+        peak_times_b (np.ndarray): Peak-Zeitpunkte der zweiten Aufnahme in ms.
+        start_a (float): Beginn der Referenz in ms.
+        start_b (float): Beginn der zweiten Aufnahme in ms.
+        bin_ms (float): Rasterbreite in ms.
+        max_lag_ms (float): Maximal gesuchte Verschiebung in ms.
+
+    Returns:
+        float: Verschiebung in ms; (t_b - start_b) + lag entspricht (t_a - start_a).
+    """
+    peak_times_a = np.asarray(peak_times_a, dtype=np.float64)
+    peak_times_b = np.asarray(peak_times_b, dtype=np.float64)
+    if len(peak_times_a) < 2 or len(peak_times_b) < 2:
+        return 0.0
+    n_a = int((peak_times_a[-1] - start_a) // bin_ms) + 1
+    n_b = int((peak_times_b[-1] - start_b) // bin_ms) + 1
+    train_a = beat_train(peak_times_a, start_a, n_a, bin_ms)
+    train_b = beat_train(peak_times_b, start_b, n_b, bin_ms)
+
+    n_fft = 1 << int(np.ceil(np.log2(n_a + n_b - 1)))
+    spectrum = np.fft.rfft(train_a, n_fft) * np.conj(np.fft.rfft(train_b, n_fft))
+    corr = np.fft.irfft(spectrum, n_fft)
+    # corr[k] = sum_i a[i + k] * b[i]; negative Verschiebungen liegen am Ende
+    lags = np.arange(n_fft)
+    lags[lags >= n_fft // 2] -= n_fft
+    max_bins = int(max_lag_ms // bin_ms)
+    allowed = (np.abs(lags) <= max_bins) & (lags > -n_b) & (lags < n_a)
+    best = np.flatnonzero(allowed)[np.argmax(corr[allowed])]
+    return float(lags[best] * bin_ms)
+
+
+def resample(time, voltage, start_ms, end_ms, rate_hz=DISPLAY_RATE_HZ):
+    """
+    Tastet einen Ausschnitt linear auf ein gleichmäßiges Raster ab.
+
+    Args:
+        time (np.ndarray): Zeitachse in ms (monoton steigend).
+        voltage (np.ndarray): Signal.
+        start_ms (float): Beginn in ms.
+        end_ms (float): Ende in ms.
+        rate_hz (float): Ziel-Abtastrate.
+
+    Returns:
+        tuple: (Raster in ms, Werte)
+    """
+    step = 1000 / rate_hz
+    grid = np.arange(start_ms, end_ms + step / 2, step)
+    lo = max(int(np.searchsorted(time, start_ms, side="left")) - 1, 0)
+    hi = int(np.searchsorted(time, end_ms, side="right")) + 1
+    window_time = np.asarray(time[lo:hi], dtype=np.float64)
+    window_voltage = np.asarray(voltage[lo:hi], dtype=np.float64)
+    if len(window_time) == 0:
+        return grid, np.full(len(grid), np.nan)
+    values = np.interp(grid, window_time, window_voltage, left=np.nan, right=np.nan)
+    return grid, values
+
+
+def zscore(values):
+    """
+    Normiert Werte auf Mittelwert 0 und Standardabweichung 1 (NaN werden ignoriert).
+    """
+    mean = np.nanmean(values) if np.any(np.isfinite(values)) else 0.0
+    std = np.nanstd(values) if np.any(np.isfinite(values)) else 0.0
+    return (values - mean) / std if std > 0 else values - mean
+
+
+def minmax_decimate(grid, values, max_points):
+    """
+    Reduziert ein gleichmäßig abgetastetes Signal auf höchstens max_points Punkte,
+    wobei Minimum und Maximum jedes Blocks erhalten bleiben.
+
+    Returns:
+        tuple: (Raster, Werte)
+    """
+    n = len(values)
+    if n <= max_points:
+        return grid, values
+    bucket = int(np.ceil(n / (max_points // 2)))
+    n_buckets = n // bucket
+    blocks = np.where(np.isnan(values[:n_buckets * bucket]), 0.0, values[:n_buckets * bucket]).reshape(n_buckets, bucket)
+    offsets = np.arange(n_buckets) * bucket
+    idx = np.union1d(offsets + blocks.argmin(axis=1), offsets + blocks.argmax(axis=1))
+    if n_buckets * bucket < n:
+        idx = np.append(idx, n - 1)
+    return grid[idx], values[idx]
+
+
+def plot_overlay(ekg_a, ekg_b, start_ms, end_ms, lag_ms=None, max_points=3000):
+    """
+    Überlagert zwei Aufnahmen auf der Zeitachse der ersten. Beide werden auf eine
+    gemeinsame Abtastrate gebracht, z-normiert und die zweite um die per
+    Kreuzkorrelation bestimmte Verschiebung ausgerichtet.
+
+    Args:
+        ekg_a (EKGTest): Referenz (bestimmt die Zeitachse).
+        ekg_b (EKGTest): Zweite Aufnahme.
+        start_ms (float): Beginn des Fensters auf der Achse von ekg_a in ms.
+        end_ms (float): Ende des Fensters in ms.
+        lag_ms (float): Verschiebung (Standard: estimate_lag).
+        max_points (int): Maximale Anzahl an Punkten pro Kurve.
+
+    Returns:
+        tuple: (Plotly-Figure, Verschiebung in ms)
+    """
+    start_a = float(ekg_a.time[0])
+    start_b = float(ekg_b.time[0])
+    if lag_ms is None:
+        lag_ms = estimate_lag(ekg_a.peak_times(), ekg_b.peak_times(), start_a, start_b)
+    # Zeitpunkt t auf der Achse von a entspricht t - start_a - lag + start_b in b
+    offset_b = start_b - start_a - lag_ms
+
+    grid, values_a = resample(ekg_a.time, ekg_a.voltage, start_ms, end_ms)
+    _, values_b = resample(ekg_b.time, ekg_b.voltage, start_ms + offset_b, end_ms + offset_b)
+    grid_a, values_a = minmax_decimate(grid, zscore(values_a), max_points)
+    grid_b, values_b = minmax_decimate(grid, zscore(values_b), max_points)
+
+    df_overlay = pd.concat([
+        pd.DataFrame({'Time in ms': grid_a, 'Amplitude (z)': values_a, 'EKG': f"Test {ekg_a.test_id}"}),
+        pd.DataFrame({'Time in ms': grid_b, 'Amplitude (z)': values_b, 'EKG': f"Test {ekg_b.test_id}"}),
+    ])
+    fig = px.line(df_overlay, x='Time in ms', y='Amplitude (z)', color='EKG',
+                  title=f"Überlagerung (Verschiebung {lag_ms / 1000:+.2f} s)")
+    fig.update_layout(xaxis_range=[start_ms, end_ms])
+    return fig, lag_ms
@@ -0,0 +1,62 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+DEFAULT_PRE_MS = 250  # Fenster vor der R-Zacke
+DEFAULT_POST_MS = 450  # Fenster nach der R-Zacke (inkl. ST-Strecke und T-Welle)
+DEFAULT_PERCENTILES = (10, 90)
+DEFAULT_MAX_BEATS = 2000  # Begrenzt den Speicher bei 24-Stunden-Aufnahmen
+
+
+def compute_beat_template(voltage, peaks, sample_rate, pre_ms=DEFAULT_PRE_MS, post_ms=DEFAULT_POST_MS,
+                          method="median", percentiles=DEFAULT_PERCENTILES, max_beats=DEFAULT_MAX_BEATS):
+    """
+    Berechnet den gemittelten Herzschlag einer Aufnahme.
+
+    Um jeden Peak wird ein festes Fenster geschnitten. Die Fenster stammen aus einer
+    gestrideten Sicht auf das Signal (sliding_window_view), sodass in einem einzigen
+    vektorisierten Schritt nur die benötigten Ausschnitte gelesen werden. Bei sehr
+    vielen Schlägen werden max_beats gleichmäßig über die Aufnahme verteilt ausgewählt.
+
+    Args:
+        voltage (np.ndarray): Signal (auch memory-gemappt).
+        peaks (np.ndarray): Indizes der Peaks.
+        sample_rate (float): Abtastrate in Hz.
+        pre_ms (float): Fensterlänge vor dem Peak in ms.
+        post_ms (float): Fensterlänge nach dem Peak in ms.
+        method (str): "median" oder "mean".
+        percentiles (tuple): Unteres und oberes Perzentil des Bands.
+        max_beats (int): Maximale Anzahl verwendeter Schläge.
+
+    Returns:
+        dict: offsets_ms (Zeit relativ zum Peak), center, lower, upper, n_beats
+            (Anzahl verwendeter Schläge) und n_available (Schläge mit vollständigem
+            Fenster) bzw. None, wenn kein vollständiges Fenster existiert.
+    """
+    if method not in ("median", "mean"):
+        raise ValueError(f"Unbekannte Methode: {method}")
+    pre = int(round(pre_ms * sample_rate / 1000))
+    post = int(round(post_ms * sample_rate / 1000))
+    width = pre + post + 1
+    peaks = np.asarray(peaks, dtype=np.intp)
+    # Nur Schläge mit vollständigem Fenster
+    peaks = peaks[(peaks >= pre) & (peaks + post < len(voltage))]
+    if len(peaks) == 0:
+        return None
+    n_available = len(peaks)
+    if n_available > max_beats:
+        peaks = peaks[np.linspace(0, len(peaks) - 1, max_beats).astype(np.intp)]
+
+    windows = sliding_window_view(voltage, width)
+    beats = np.asarray(windows[peaks - pre], dtype=np.float64)
+
+    center = np.median(beats, axis=0) if method == "median" else beats.mean(axis=0)
+    lower, upper = np.percentile(beats, percentiles, axis=0)
+    return {
+        "offsets_ms": (np.arange(width) - pre) * 1000 / sample_rate,
+        "center": center,
+        "lower": lower,
+        "upper": upper,
+        "n_beats": int(len(peaks)),
+        "n_available": int(n_available),
+        "method": method,
+    }
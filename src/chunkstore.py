@@ -0,0 +1,275 @@
+import argparse
+import json
+import os
+import struct
+import zlib
+import numpy as np
+
+MAGIC = b"EKGC"
+FORMAT_VERSION = 1
+EXTENSION = ".ekgc"
+DEFAULT_CHUNK_SIZE = 16384  # ca. 33 s bei 500 Hz
+DEFAULT_LEVEL = 6
+_HEADER_LENGTH = struct.Struct("<Q")
+
+
+def _is_integral(values):
+    """
+    Prüft, ob ein Array nur ganzzahlige Werte enthält.
+    """
+    values = np.asarray(values)
+    if values.dtype.kind in "iu":
+        return True
+    return bool(np.all(np.isfinite(values))) and bool(np.all(values == np.round(values)))
+
+
+def _delta_dtype(values):
+    """
+    Wählt den kleinsten Ganzzahltyp (int16 oder int32), in den alle Deltas passen;
+    None, wenn auch int32 nicht reicht. Der Startwert jedes Blocks steht im Blockindex.
+    """
+    deltas = np.diff(np.asarray(values, dtype=np.int64))
+    if len(deltas) == 0:
+        return "int16"
+    low, high = int(deltas.min()), int(deltas.max())
+    for dtype in ("int16", "int32"):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return None
+
+
+def _choose_encoding(values, float_dtype):
+    """
+    Bestimmt die Kodierung eines Kanals: Delta-kodierte Ganzzahlen, wenn möglich,
+    sonst Gleitkommazahlen mit Byte-Shuffle.
+
+    Returns:
+        tuple: (Kodierung, dtype)
+    """
+    if _is_integral(values):
+        dtype = _delta_dtype(values)
+        if dtype is not None:
+            return "delta", dtype
+    return "shuffle", float_dtype
+
+
+def _encode(values, encoding, dtype, level):
+    """
+    Kodiert einen Block eines Kanals und komprimiert ihn mit zlib.
+
+    Bei "delta" werden nur Differenzen gespeichert (die erste ist 0, der Startwert
+    steht im Blockindex).
+    Bei "shuffle" werden die Bytes nach ihrer Position im Wert gruppiert, was die
+    Kompression von Gleitkommazahlen deutlich verbessert.
+    """
+    if encoding == "delta":
+        values = np.asarray(values, dtype=np.int64)
+        raw = np.diff(values, prepend=values[:1]).astype(dtype).tobytes()
+    else:
+        values = np.ascontiguousarray(values, dtype=dtype)
+        raw = values.view(np.uint8).reshape(-1, values.itemsize).T.tobytes()
+    return zlib.compress(raw, level)
+
+
+def _decode(blob, spec, count, first):
+    """
+    Dekomprimiert und dekodiert einen Block eines Kanals im ursprünglichen dtype.
+    """
+    raw = zlib.decompress(blob)
+    dtype = spec["dtype"]
+    if spec["encoding"] == "delta":
+        values = first + np.cumsum(np.frombuffer(raw, dtype=dtype), dtype=np.int64)
+    else:
+        itemsize = np.dtype(dtype).itemsize
+        shuffled = np.frombuffer(raw, dtype=np.uint8).reshape(itemsize, count)
+        values = np.ascontiguousarray(shuffled.T).view(dtype).reshape(count)
+    return values.astype(spec["source_dtype"], copy=False)
+
+
+def write_chunked(path, time, voltage, source_type, chunk_size=DEFAULT_CHUNK_SIZE, level=DEFAULT_LEVEL):
+    """
+    Speichert eine Aufnahme blockweise komprimiert.
+
+    Aufbau der Datei: Kennung, Länge des Headers, JSON-Header mit Blockindex
+    (Sample-Bereich, Zeitbereich, Position in der Datei) und danach die einzeln mit
+    zlib komprimierten Blöcke. Ganzzahlige Signale werden als int16/int32-Deltas
+    abgelegt, sonst als float32. Die Zeitachse wird exakt gespeichert (Ganzzahl-Deltas
+    oder float64).
+
+    Args:
+        path (str): Zieldatei (.ekgc).
+        time (np.ndarray): Zeit in ms.
+        voltage (np.ndarray): Spannung.
+        source_type (str): Ursprüngliches Format ("txt" oder "csv").
+        chunk_size (int): Samples pro Block.
+        level (int): zlib-Kompressionsstufe.
+
+    Returns:
+        dict: Der geschriebene Header.
+    """
+    time = np.asarray(time)
+    voltage = np.asarray(voltage)
+    if len(time) != len(voltage):
+        raise ValueError("Zeit und Spannung müssen gleich lang sein.")
+    n_samples = len(voltage)
+    voltage_encoding, voltage_dtype = _choose_encoding(voltage, "float32")
+    time_encoding, time_dtype = _choose_encoding(time, "float64")
+
+    blobs = []
+    chunks = []
+    offset = 0
+    for start in range(0, n_samples, chunk_size):
+        end = min(start + chunk_size, n_samples)
+        time_blob = _encode(time[start:end], time_encoding, time_dtype, level)
+        voltage_blob = _encode(voltage[start:end], voltage_encoding, voltage_dtype, level)
+        chunks.append({
+            "start": start,
+            "count": end - start,
+            "t_start": float(time[start]),
+            "t_end": float(time[end - 1]),
+            "time_first": time[start].item(),
+            "voltage_first": voltage[start].item(),
+            "offset": offset,
+            "time_bytes": len(time_blob),
+            "voltage_bytes": len(voltage_blob),
+        })
+        blobs.extend([time_blob, voltage_blob])
+        offset += len(time_blob) + len(voltage_blob)
+
+    intervals = np.diff(time)
+    header = {
+        "version": FORMAT_VERSION,
+        "source_type": source_type,
+        "n_samples": n_samples,
+        "sample_rate_hz": 1000 / float(np.median(intervals)) if len(intervals) else None,
+        "chunk_size": chunk_size,
+        "time": {"encoding": time_encoding, "dtype": time_dtype, "source_dtype": time.dtype.str},
+        "voltage": {"encoding": voltage_encoding, "dtype": voltage_dtype, "source_dtype": voltage.dtype.str},
+        "chunks": chunks,
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(_HEADER_LENGTH.pack(len(header_bytes)))
+        f.write(header_bytes)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_path, path)
+    return header
+
+
+class ChunkedRecording:
+    """
+    Lesezugriff auf eine blockweise komprimierte Aufnahme. Die App entpackt sie
+    vollständig (read_all) und hält das Signal danach im Cache.
+    """
+
+    def __init__(self, path):
+        """
+        Liest Kennung und Header der Datei.
+
+        Args:
+            path (str): Pfad zur .ekgc-Datei.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Keine EKG-Blockdatei: {path}")
+            (header_length,) = _HEADER_LENGTH.unpack(f.read(_HEADER_LENGTH.size))
+            self.header = json.loads(f.read(header_length).decode("utf-8"))
+        if self.header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Nicht unterstützte Version: {self.header.get('version')}")
+        self._data_offset = len(MAGIC) + _HEADER_LENGTH.size + header_length
+
+    @property
+    def n_samples(self):
+        """
+        Anzahl der Samples der Aufnahme.
+        """
+        return self.header["n_samples"]
+
+    @property
+    def source_type(self):
+        """
+        Ursprüngliches Format ("txt" oder "csv").
+        """
+        return self.header["source_type"]
+
+    def _read_chunks(self, first, last):
+        """
+        Liest und dekodiert die Blöcke first bis last (inklusive).
+
+        Returns:
+            tuple: (Zeit, Spannung) der Blöcke aneinandergehängt.
+        """
+        chunks = self.header["chunks"][first:last + 1]
+        time_spec = self.header["time"]
+        voltage_spec = self.header["voltage"]
+        times, voltages = [], []
+        with open(self.path, "rb") as f:
+            f.seek(self._data_offset + chunks[0]["offset"])
+            for chunk in chunks:
+                time_blob = f.read(chunk["time_bytes"])
+                voltage_blob = f.read(chunk["voltage_bytes"])
+                times.append(_decode(time_blob, time_spec, chunk["count"], int(chunk["time_first"])))
+                voltages.append(_decode(voltage_blob, voltage_spec, chunk["count"], int(chunk["voltage_first"])))
+        return np.concatenate(times), np.concatenate(voltages)
+
+    def read_all(self):
+        """
+        Liest die gesamte Aufnahme.
+
+        Returns:
+            tuple: (Zeit in ms, Spannung)
+        """
+        if not self.header["chunks"]:
+            return np.empty(0), np.empty(0)
+        return self._read_chunks(0, len(self.header["chunks"]) - 1)
+
+
+def convert(path, output=None, chunk_size=DEFAULT_CHUNK_SIZE, level=DEFAULT_LEVEL):
+    """
+    Wandelt eine TXT- oder CSV-Aufnahme in das Blockformat um.
+
+    Args:
+        path (str): Quelldatei.
+        output (str): Zieldatei (Standard: gleicher Name mit .ekgc).
+        chunk_size (int): Samples pro Block.
+        level (int): zlib-Kompressionsstufe.
+
+    Returns:
+        str: Pfad der geschriebenen Datei.
+    """
+    from src.signalcache import read_recording
+
+    output = output or os.path.splitext(path)[0] + EXTENSION
+    time, voltage, filetype = read_recording(path)
+    write_chunked(output, time, voltage, filetype, chunk_size, level)
+    return output
+
+
+def main():
+    """
+    Kommandozeilen-Einstieg: wandelt Aufnahmen in das komprimierte Blockformat um.
+    """
+    parser = argparse.ArgumentParser(description="Wandelt EKG-Aufnahmen in das komprimierte Blockformat (.ekgc) um.")
+    parser.add_argument("paths", nargs="+", help="TXT- oder CSV-Dateien")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Samples pro Block")
+    parser.add_argument("--level", type=int, default=DEFAULT_LEVEL, help="zlib-Kompressionsstufe (1-9)")
+    args = parser.parse_args()
+
+    for path in args.paths:
+        output = convert(path, chunk_size=args.chunk_size, level=args.level)
+        before = os.path.getsize(path)
+        after = os.path.getsize(output)
+        print(f"{path} -> {output}: {before / 1024:.0f} KB -> {after / 1024:.0f} KB ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
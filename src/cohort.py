@@ -0,0 +1,266 @@
+import threading
+import numpy as np
+import pandas as pd
+from src.recordingindex import RecordingIndex, recording_index
+from src.signalcache import file_stat_key
+from src.instrumentation import stage
+
+# Spalten der Übersichtstabelle (eine Zeile pro EKG-Test)
+METRIC_COLUMNS = ["duration_min", "num_peaks", "bpm", "sdnn_ms", "rmssd_ms", "pnn50"]
+COLUMNS = ["test_id", "person_id", "person", "birth_year", "date", "filetype"] + METRIC_COLUMNS
+METRIC_LABELS = {
+    "duration_min": "Dauer (min)",
+    "num_peaks": "Anzahl Peaks",
+    "bpm": "Herzfrequenz (bpm)",
+    "sdnn_ms": "SDNN (ms)",
+    "rmssd_ms": "RMSSD (ms)",
+    "pnn50": "pNN50 (%)",
+}
+
+
+def _empty_table():
+    """
+    Leere Übersichtstabelle mit festen Spaltentypen.
+    """
+    table = pd.DataFrame({column: pd.Series(dtype="float64") for column in METRIC_COLUMNS})
+    for column in ("test_id", "person_id", "person", "date", "filetype"):
+        table[column] = pd.Series(dtype="object")
+    table["birth_year"] = pd.Series(dtype="float64")
+    return table[COLUMNS].set_index("test_id", drop=False)
+
+
+def _birth_year(value):
+    """
+    Geburtsjahr als Zahl (NaN, wenn es nicht lesbar ist).
+    """
+    try:
+        return float(str(value)[-4:])
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _stat_or_none(result_link):
+    """
+    Fingerabdruck einer Aufnahme (None, wenn die Datei fehlt).
+    """
+    try:
+        return file_stat_key(result_link)
+    except (OSError, TypeError):
+        return None
+
+
+def summary_rows(records, index):
+    """
+    Baut Tabellenzeilen aus Testdatensätzen und dem Metadaten-Index. Fehlende oder
+    veraltete Index-Einträge werden berechnet und der Index danach einmal
+    gespeichert; nicht lesbare Aufnahmen erhalten NaN.
+
+    Args:
+        records (list): Datensätze aus PersonDB.test_records().
+        index (RecordingIndex): Metadaten-Index der Aufnahmen.
+
+    Returns:
+        tuple: (neue Zeilen mit der Test-ID als Index, Test-IDs nicht lesbarer Aufnahmen)
+    """
+    from src.ekg import EKGTest
+
+    rows = []
+    failed = []
+    updated = False
+    for record in records:
+        try:
+            if index.is_current(record["result_link"]):
+                entry = index.get(EKGTest(record["test_id"], record["date"], record["result_link"]))
+            else:
+                entry = index.update(EKGTest(record["test_id"], record["date"], record["result_link"]), save=False)
+                updated = True
+        except Exception:
+            entry = {}
+            failed.append(record["test_id"])
+        row = {
+            "test_id": record["test_id"],
+            "person_id": record["person_id"],
+            "person": record["person"],
+            "birth_year": _birth_year(record["date_of_birth"]),
+            "date": record["date"],
+            "filetype": entry.get("filetype"),
+        }
+        for column in METRIC_COLUMNS:
+            value = entry.get(column)
+            row[column] = np.nan if value is None else float(value)
+        rows.append(row)
+    if updated:
+        try:
+            index.save()
+        except OSError:
+            pass  # Die Einträge bleiben im Speicher und werden beim nächsten Mal geschrieben
+    if not rows:
+        return _empty_table(), failed
+    return pd.DataFrame(rows, columns=COLUMNS).set_index("test_id", drop=False), failed
+
+
+class CohortSummary:
+    """
+    Spaltenorientierte Übersichtstabelle aller EKG-Tests (Dauer, Peaks, Herzfrequenz,
+    HRV) für die Kohortenansicht.
+
+    Die Tabelle wird aus dem Metadaten-Index aufgebaut, ohne Signale zu laden, und
+    danach inkrementell gepflegt: Bei jedem Zugriff werden nur die Zeilen
+    hinzugekommener, geänderter (Datei oder Pfad) und entfernter Tests
+    aktualisiert. Nicht lesbare Aufnahmen werden erneut versucht, sobald sich ihre
+    Datei ändert. Filtern, Sortieren und Histogramme laufen vektorisiert über die
+    ganze Tabelle.
+    """
+
+    def __init__(self, index_path=None):
+        """
+        Args:
+            index_path (str): Pfad zum Metadaten-Index (Standard: der geteilte recording_index).
+        """
+        self.index = RecordingIndex(index_path) if index_path else recording_index
+        self._table = _empty_table()
+        self._links = {}  # Test-ID -> Pfad der Aufnahme, aus der die Zeile stammt
+        self._failed = {}  # Test-ID -> Fingerabdruck der Datei beim letzten Fehlschlag
+        self._records = None  # (PersonDB, Revision, Datensätze)
+        self._lock = threading.Lock()
+
+    def table(self, person_db):
+        """
+        Liefert die aktuelle Übersichtstabelle einer PersonDB.
+
+        Args:
+            person_db (PersonDB): Die Datenbank.
+
+        Returns:
+            pd.DataFrame: Eine Zeile pro Test (nicht verändern, sie wird geteilt).
+        """
+        with self._lock:
+            if self._records is None or self._records[0] is not person_db or self._records[1] != person_db.revision:
+                self._records = (person_db, person_db.revision, person_db.test_records())
+            self._sync(self._records[2])
+            return self._table
+
+    def _stale(self, record, index):
+        """
+        True, wenn die Zeile eines Tests neu berechnet werden muss.
+        """
+        test_id, result_link = record["test_id"], record["result_link"]
+        if test_id in self._failed:
+            return _stat_or_none(result_link) != self._failed[test_id]
+        return self._links.get(test_id) != result_link or not index.is_current(result_link)
+
+    def _sync(self, records):
+        """
+        Gleicht die Tabelle mit den Tests der PersonDB und dem Index ab.
+        """
+        wanted = {record["test_id"] for record in records}
+        index = self.index
+        with stage("cohort_sync") as s:
+            removed = [test_id for test_id in self._links if test_id not in wanted]
+            changed = [record for record in records
+                       if record["test_id"] not in self._links or self._stale(record, index)]
+            if not removed and not changed:
+                return
+            dropped = removed + [record["test_id"] for record in changed if record["test_id"] in self._links]
+            table = self._table.drop(dropped) if dropped else self._table
+            for test_id in removed:
+                self._links.pop(test_id, None)
+                self._failed.pop(test_id, None)
+            if changed:
+                new_rows, failed = summary_rows(changed, index)
+                table = new_rows if table.empty else pd.concat([table, new_rows])
+                failed = set(failed)
+                for record in changed:
+                    test_id = record["test_id"]
+                    self._links[test_id] = record["result_link"]
+                    if test_id in failed:
+                        self._failed[test_id] = _stat_or_none(record["result_link"])
+                    else:
+                        self._failed.pop(test_id, None)
+            self._table = table
+            s.set(changed=len(changed), removed=len(removed), rows=len(table))
+
+    def clear(self):
+        """
+        Verwirft die Tabelle; sie wird beim nächsten Zugriff neu aufgebaut.
+        """
+        with self._lock:
+            self._table = _empty_table()
+            self._links = {}
+            self._failed = {}
+            self._records = None
+
+
+def filter_tests(table, bpm_range=None, birth_year_range=None, min_duration_min=None, persons=None):
+    """
+    Filtert die Übersichtstabelle mit vektorisierten Masken.
+
+    Args:
+        table (pd.DataFrame): Übersichtstabelle.
+        bpm_range (tuple): Erlaubter Bereich der Herzfrequenz (inklusive).
+        birth_year_range (tuple): Erlaubter Bereich des Geburtsjahrs (inklusive).
+        min_duration_min (float): Minimale Aufnahmedauer in Minuten.
+        persons (list): Nur diese Personen (Namen); None für alle.
+
+    Returns:
+        pd.DataFrame: Die passenden Zeilen.
+    """
+    mask = np.ones(len(table), dtype=bool)
+    if bpm_range is not None:
+        bpm = table["bpm"].to_numpy()
+        mask &= (bpm >= bpm_range[0]) & (bpm <= bpm_range[1])
+    if birth_year_range is not None:
+        year = table["birth_year"].to_numpy()
+        mask &= (year >= birth_year_range[0]) & (year <= birth_year_range[1])
+    if min_duration_min:
+        mask &= table["duration_min"].to_numpy() >= min_duration_min
+    if persons:
+        mask &= table["person"].isin(persons).to_numpy()
+    return table[mask]
+
+
+def histogram(table, column, bins=20):
+    """
+    Histogramm einer Kennzahl (NaN-Werte werden ignoriert).
+
+    Args:
+        table (pd.DataFrame): Übersichtstabelle.
+        column (str): Spalte aus METRIC_COLUMNS.
+        bins (int): Anzahl der Klassen.
+
+    Returns:
+        pd.DataFrame: Klassenmitte, Klassengrenzen und Anzahl pro Klasse.
+    """
+    values = table[column].to_numpy(dtype=np.float64)
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return pd.DataFrame({"center": [], "left": [], "right": [], "count": []})
+    counts, edges = np.histogram(values, bins=bins)
+    return pd.DataFrame({
+        "center": (edges[:-1] + edges[1:]) / 2,
+        "left": edges[:-1],
+        "right": edges[1:],
+        "count": counts,
+    })
+
+
+def stats_by(table, column, by="birth_year"):
+    """
+    Kennzahlen einer Spalte gruppiert nach einer anderen (z.B. Herzfrequenz nach Geburtsjahr).
+
+    Args:
+        table (pd.DataFrame): Übersichtstabelle.
+        column (str): Auszuwertende Spalte.
+        by (str): Gruppierungsspalte.
+
+    Returns:
+        pd.DataFrame: Anzahl, Mittelwert, Minimum und Maximum pro Gruppe.
+    """
+    return (table[[by, column]].dropna()
+            .groupby(by)[column]
+            .agg(["count", "mean", "min", "max"])
+            .reset_index())
+
+
+# Geteilte Übersichtstabelle aller Sessions
+cohort_summary = CohortSummary()
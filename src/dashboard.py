@@ -0,0 +1,122 @@
+import math
+import plotly.express as px
+import streamlit as st
+from src.cohort import METRIC_COLUMNS, METRIC_LABELS, cohort_summary, filter_tests, histogram, stats_by
+from src.instrumentation import stage
+
+
+def _range(series, default):
+    """
+    Ganzzahliger Wertebereich einer Spalte für Slider (Standardwert bei leerer Spalte).
+    """
+    values = series.dropna()
+    if values.empty:
+        return default
+    low, high = math.floor(values.min()), math.ceil(values.max())
+    return (low, high) if low < high else (low, low + 1)
+
+
+def show_dashboard_page(person_db):
+    """
+    Zeigt die Kohortenübersicht über alle Probanten und EKG-Tests.
+    """
+    st.markdown("""
+        <style>
+        .main { background-color: #f8f9fa; }
+        .big-title {
+            font-size: 2em;
+            font-weight: bold;
+            color: #1f77b4;
+            margin-bottom: 0.2em;
+        }
+        .subtitle {
+            font-size: 1.1em;
+            color: #333;
+            margin-bottom: 1.2em;
+        }
+        </style>
+    """, unsafe_allow_html=True)
+
+    st.markdown('<div class="big-title">📊 Kohortenübersicht</div>', unsafe_allow_html=True)
+    st.markdown('<div class="subtitle">Kennzahlen aller EKG-Tests filtern, sortieren und vergleichen.</div>',
+                unsafe_allow_html=True)
+    st.write("---")
+
+    with stage("cohort_table"):
+        table = cohort_summary.table(person_db)
+    if table.empty:
+        st.warning("Keine EKG-Tests verfügbar.")
+        st.button("Zurück zur Startseite", on_click=lambda: st.session_state.update(state="start"))
+        return
+
+    # --- Filter ---
+    bpm_bounds = _range(table["bpm"], (0, 200))
+    year_bounds = _range(table["birth_year"], (1900, 2025))
+    col_bpm, col_year, col_duration = st.columns(3)
+    with col_bpm:
+        bpm_range = st.slider("Herzfrequenz (bpm)", *bpm_bounds, value=bpm_bounds, key="dashboard_bpm")
+    with col_year:
+        year_range = st.slider("Geburtsjahr", *year_bounds, value=year_bounds, key="dashboard_year")
+    with col_duration:
+        min_duration = st.number_input("Mindestdauer (min)", min_value=0.0, value=0.0, step=1.0,
+                                       key="dashboard_duration")
+    persons = st.multiselect("Probanten", sorted(table["person"].unique()), key="dashboard_persons")
+
+    col_sort, col_order = st.columns([3, 1])
+    with col_sort:
+        sort_by = st.selectbox("Sortieren nach", METRIC_COLUMNS, index=METRIC_COLUMNS.index("bpm"),
+                               format_func=METRIC_LABELS.get, key="dashboard_sort")
+    with col_order:
+        descending = st.toggle("Absteigend", value=True, key="dashboard_desc")
+
+    with stage("cohort_query", rows=len(table)) as s:
+        selected = filter_tests(table, bpm_range, year_range, min_duration, persons)
+        selected = selected.sort_values(sort_by, ascending=not descending, na_position="last")
+        s.set(selected=len(selected))
+
+    # --- Kennzahlen ---
+    col_tests, col_persons, col_bpm_mean, col_rmssd = st.columns(4)
+    col_tests.metric("Tests", f"{len(selected)} / {len(table)}")
+    col_persons.metric("Probanten", selected["person_id"].nunique())
+    col_bpm_mean.metric("Ø Herzfrequenz", f"{selected['bpm'].mean():.0f} bpm" if len(selected) else "–")
+    col_rmssd.metric("Ø RMSSD", f"{selected['rmssd_ms'].mean():.0f} ms" if selected["rmssd_ms"].notna().any() else "–")
+
+    st.dataframe(
+        selected.drop(columns=["person_id"]).rename(columns={"test_id": "Test-ID", "person": "Probant",
+                                                             "birth_year": "Geburtsjahr", "date": "Datum",
+                                                             "filetype": "Format", **METRIC_LABELS}),
+        hide_index=True,
+        use_container_width=True,
+        column_config={"Geburtsjahr": st.column_config.NumberColumn(format="%d")},
+    )
+
+    # --- Verteilungen ---
+    st.markdown("### Verteilungen")
+    col_metric, col_bins = st.columns([3, 1])
+    with col_metric:
+        metric = st.selectbox("Kennzahl", METRIC_COLUMNS, index=METRIC_COLUMNS.index("bpm"),
+                              format_func=METRIC_LABELS.get, key="dashboard_metric")
+    with col_bins:
+        bins = st.number_input("Klassen", min_value=2, max_value=100, value=20, step=1, key="dashboard_bins")
+
+    # Aggregiert wird vorab mit NumPy/pandas, an den Browser gehen nur die Klassen
+    counts = histogram(selected, metric, int(bins))
+    if counts.empty:
+        st.info("Keine Werte für diese Kennzahl.")
+    else:
+        fig_hist = px.bar(counts, x="center", y="count", labels={"center": METRIC_LABELS[metric], "count": "Anzahl Tests"},
+                          title=f"Verteilung: {METRIC_LABELS[metric]}")
+        fig_hist.update_traces(width=(counts["right"] - counts["left"]).to_numpy() * 0.95)
+        st.plotly_chart(fig_hist, use_container_width=True)
+
+    by_year = stats_by(selected, metric, "birth_year")
+    if not by_year.empty:
+        fig_year = px.scatter(by_year, x="birth_year", y="mean", size="count",
+                              error_y=by_year["max"] - by_year["mean"],
+                              error_y_minus=by_year["mean"] - by_year["min"],
+                              labels={"birth_year": "Geburtsjahr", "mean": METRIC_LABELS[metric], "count": "Tests"},
+                              title=f"{METRIC_LABELS[metric]} nach Geburtsjahr (Mittelwert, Min–Max)")
+        st.plotly_chart(fig_year, use_container_width=True)
+
+    st.write("---")
+    st.button("Zurück zur Startseite", on_click=lambda: st.session_state.update(state="start"))
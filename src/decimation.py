@@ -0,0 +1,104 @@
+import numpy as np
+
+
+class MinMaxPyramid:
+    """
+    Mehrstufige Min/Max-Reduktion eines Signals für schnelles, sichtbereichsabhängiges Plotten.
+
+    Jede Stufe fasst Blöcke der vorherigen Stufe zusammen und merkt sich pro Block
+    die Indizes von Minimum und Maximum. Dadurch bleiben alle Ausschläge (z.B.
+    R-Zacken) in jeder Auflösung sichtbar, während für lange Zeitfenster nur
+    wenige tausend Punkte an den Browser gehen.
+    """
+
+    def __init__(self, voltage, base_bucket=4, factor=4):
+        """
+        Baut die Pyramide auf.
+
+        Args:
+            voltage (np.ndarray): Signal, für das die Pyramide gebaut wird.
+            base_bucket (int): Blockgröße der feinsten Stufe in Samples.
+            factor (int): Vergrößerungsfaktor der Blockgröße pro Stufe.
+        """
+        voltage = np.asarray(voltage)
+        self.voltage = voltage
+        self.n = len(voltage)
+        self.levels = []  # Liste von (Blockgröße, Min-Indizes, Max-Indizes)
+
+        n_buckets = -(-self.n // base_bucket)
+        if n_buckets < 2:
+            return
+        padded = np.empty(n_buckets * base_bucket, dtype=voltage.dtype)
+        padded[:self.n] = voltage
+        padded[self.n:] = voltage[-1]  # Wiederholen ändert Min/Max nicht
+        blocks = padded.reshape(n_buckets, base_bucket)
+        offsets = np.arange(n_buckets) * base_bucket
+        mins = np.minimum(offsets + blocks.argmin(axis=1), self.n - 1)
+        maxs = np.minimum(offsets + blocks.argmax(axis=1), self.n - 1)
+        bucket = base_bucket
+        self.levels.append((bucket, mins, maxs))
+
+        while len(mins) > 1:
+            mins = self._reduce(voltage, mins, factor, np.argmin)
+            maxs = self._reduce(voltage, maxs, factor, np.argmax)
+            bucket *= factor
+            self.levels.append((bucket, mins, maxs))
+
+    @property
+    def nbytes(self):
+        """
+        Speicherbedarf der Pyramide in Bytes.
+        """
+        # Das Signal selbst gehört dem Test und wird nicht mitgezählt
+        return sum(mins.nbytes + maxs.nbytes for _, mins, maxs in self.levels)
+
+    @staticmethod
+    def _reduce(voltage, indices, factor, arg_func):
+        """
+        Fasst jeweils factor Blöcke zusammen und wählt den extremen Index aus.
+        """
+        n_groups = -(-len(indices) // factor)
+        padded = np.empty(n_groups * factor, dtype=indices.dtype)
+        padded[:len(indices)] = indices
+        padded[len(indices):] = indices[-1]
+        groups = padded.reshape(n_groups, factor)
+        choice = arg_func(voltage[groups], axis=1)
+        return groups[np.arange(n_groups), choice]
+
+    def indices(self, start_idx, end_idx, max_points):
+        """
+        Liefert die darzustellenden Sample-Indizes für einen Ausschnitt.
+
+        Args:
+            start_idx (int): Erster Index des Ausschnitts (inklusive).
+            end_idx (int): Letzter Index des Ausschnitts (exklusive).
+            max_points (int): Maximale Anzahl an Punkten.
+
+        Returns:
+            np.ndarray: Aufsteigend sortierte Indizes; in voller Auflösung, wenn
+            der Ausschnitt klein genug ist.
+        """
+        start_idx = max(int(start_idx), 0)
+        end_idx = min(int(end_idx), self.n)
+        if end_idx - start_idx <= max_points:
+            return np.arange(start_idx, end_idx)
+        for bucket, mins, maxs in self.levels:
+            first = start_idx // bucket
+            last = -(-end_idx // bucket)
+            if 2 * (last - first) <= max_points or bucket == self.levels[-1][0]:
+                idx = np.union1d(mins[first:last], maxs[first:last])
+                idx = idx[(idx >= start_idx) & (idx < end_idx)]
+                # Angeschnittene Randblöcke direkt auswerten, damit keine Spitze verloren geht
+                edges = [self._extremes(start_idx, min((first + 1) * bucket, end_idx)),
+                         self._extremes(max((last - 1) * bucket, start_idx), end_idx)]
+                return np.union1d(idx, np.concatenate(edges))
+        return np.arange(start_idx, end_idx)
+
+    def _extremes(self, start_idx, end_idx):
+        """
+        Liefert die Indizes von Minimum und Maximum eines Rohdaten-Ausschnitts.
+        """
+        if end_idx <= start_idx:
+            return np.empty(0, dtype=np.intp)
+        segment = self.voltage[start_idx:end_idx]
+        return np.array([start_idx + segment.argmin(), start_idx + segment.argmax()], dtype=np.intp)
@@ -1,14 +1,38 @@
 import pandas as pd
 import plotly.express as px
-import os
+import plotly.graph_objects as go
 import numpy as np
+from src.signalcache import load_recording
+from src.peaks import DETECTOR_NAME, DETECTOR_VERSION, default_peak_params, detect_peaks
+from src.recordingcache import recording_cache
+from src.decimation import MinMaxPyramid
+from src.instrumentation import stage
+from src.hrv import DEFAULT_WINDOW_S, HRV_VERSION, compute_hrv
+from src.resultstore import result_store
+from src.sharedsignals import ENABLED as SHARED_SIGNALS, shared_signals
+from src.beattemplate import compute_beat_template
+
+SAMPLE_RATE_WINDOW = 1_000_000  # Zeitabstände für die Schätzung der Abtastrate
+
+
+def _bpm_from_peaks(time, peaks):
+    """
+    Herzfrequenz aus Anzahl und Zeitspanne der Peaks (0 bei weniger als zwei Peaks).
+    """
+    num_peaks = len(peaks)
+    if num_peaks > 1:
+        dauer_ms = time[peaks[-1]] - time[peaks[0]]
+        dauer_min = dauer_ms / 1000 / 60
+        return num_peaks / dauer_min if dauer_min > 0 else 0
+    return 0
+
 
 class EKGTest:
     """
     Repräsentiert einen einzelnen EKG-Test mit Methoden zur Analyse und Visualisierung.
     """
 
-    def __init__(self, test_id, date, result_link):
+    def __init__(self, test_id, date, result_link, diagnosis=None):
         """
         Initialisiert ein EKGTest-Objekt.
 
@@ -16,186 +40,435 @@ class EKGTest:
             test_id (str): Die eindeutige ID des EKG-Tests.
             date (str): Das Testdatum.
             result_link (str): Pfad zur EKG-Datendatei.
+            diagnosis (str): Gespeicherte Diagnose (optional).
         """
         self.test_id = test_id
         self.date = date
         self.result_link = result_link
+        self.diagnosis = diagnosis
         self.voltage = None
         self.time = None
         self.peaks = None
         self.filetype = None  # "txt" oder "csv"
+        self.shared_key = None  # Segment im gemeinsamen Signalspeicher (nur mit EKG_SHARED_SIGNALS=1)
+        self.derived = {}  # Abgeleitete Ergebnisse, bei Cache-Nutzung mit anderen Sessions geteilt
+
+    def to_dict(self):
+        """
+        Serialisiert den Test im Format der Personen-Datenbank.
+
+        Returns:
+            dict: Test-Daten (ohne Signal).
+        """
+        test_dict = {
+            "id": self.test_id,
+            "date": self.date,
+            "result_link": self.result_link
+        }
+        if self.diagnosis is not None:
+            test_dict["diagnosis"] = self.diagnosis
+        return test_dict
+
+    def copy(self):
+        """
+        Liefert eine Kopie der Metadaten ohne geladene Daten. Die Tests der geteilten
+        PersonDB werden so nicht von mehreren Sessions gleichzeitig analysiert und
+        halten keine Signale über die Lebensdauer im recording_cache hinaus.
+
+        Returns:
+            EKGTest: Der kopierte Test.
+        """
+        return EKGTest(self.test_id, self.date, self.result_link, self.diagnosis)
 
     def load_data(self):
         """
         Lädt die EKG-Daten aus der Datei und setzt die Zeitachse.
         Erkennt automatisch das Dateiformat (txt oder csv).
+        Die Daten werden über den binären Sidecar-Cache (siehe signalcache) geladen,
+        sodass nur der erste Aufruf die Textdatei parsen muss. Bei aufbereiteten
+        Uploads (npz, siehe ingest) werden zusätzlich die gespeicherten Peaks übernommen.
+        Mit EKG_SHARED_SIGNALS=1 werden Signal und Peaks aus dem gemeinsamen Speicher
+        aller Serverprozesse eingebunden (siehe sharedsignals).
         """
-        _, ext = os.path.splitext(self.result_link)
-        ext = ext.lower()
-        self.filetype = ext.replace('.', '')
-
-        if self.filetype == "csv":
-            df = pd.read_csv(self.result_link)
-            if df.shape[1] >= 2:
-                self.time = df.iloc[:, 0].values * 1000  # Sekunden -> ms
-                self.voltage = df.iloc[:, 1].values
+        with stage("load_data", test_id=self.test_id) as s:
+            ingested = self.result_link.lower().endswith(".npz")
+            if SHARED_SIGNALS:
+                segment = shared_signals.attach(self.result_link)
+                self.time, self.voltage, self.filetype = segment["time"], segment["voltage"], segment["filetype"]
+                self.shared_key = segment["key"]
+                if ingested:
+                    from src.ingest import read_ingested_peaks
+                    self.peaks = read_ingested_peaks(self.result_link, self.peak_params())
+                if self.peaks is None:
+                    self.peaks = shared_signals.load_peaks(self.shared_key, self.peak_params())
+            elif ingested:
+                from src.ingest import read_ingested
+                recording = read_ingested(self.result_link)
+                self.time, self.voltage = recording["time"], recording["voltage"]
+                self.filetype = recording["source_type"]
+                # Gespeicherte Peaks nur mit den aktuellen Parametern übernehmen, sonst
+                # erkennt get_peaks sie neu
+                self.peaks = recording["peaks"] if recording["peak_params"] == self.peak_params() else None
             else:
-                raise ValueError("CSV-Datei hat nicht mindestens 2 Spalten.")
-        elif self.filetype == "txt":
-            data = np.loadtxt(self.result_link, delimiter='\t')
-            self.voltage = data[:, 0]
-            self.time = np.linspace(0, len(self.voltage) * 2, len(self.voltage), dtype=int)
-        else:
-            raise ValueError("Unbekanntes Dateiformat: " + ext)
+                self.time, self.voltage, self.filetype = load_recording(self.result_link)
+            s.set(samples=len(self.voltage), mb=self.voltage.nbytes / 1024 / 1024)
+
+    def analyze(self):
+        """
+        Lädt Signal und Peaks über den prozessweiten Cache (siehe recordingcache),
+        sodass dieselbe Aufnahme nur einmal pro Serverprozess geladen wird.
 
-    def find_peaks(self, threshold=350, min_distance_ms=400):
+        Returns:
+            EKGTest: Der Test selbst.
+        """
+        recording_cache.attach(self)
+        return self
+
+    def find_peaks(self, threshold=None, min_distance_ms=None):
         """
-        Findet Peaks im EKG-Signal, die über dem Schwellwert liegen und mindestens 400 ms Abstand haben.
+        Findet Peaks im EKG-Signal, die über dem Schwellwert liegen und mindestens min_distance_ms Abstand haben.
 
         Args:
-            threshold (float): Schwellwert für die Peak-Erkennung.
-            min_distance_ms (int): Minimaler Abstand zwischen Peaks in ms.
+            threshold (float): Schwellwert für die Peak-Erkennung (Standard: peaks.DEFAULT_PEAK_PARAMS).
+            min_distance_ms (int): Minimaler Abstand zwischen Peaks in ms (Standard: peaks.DEFAULT_PEAK_PARAMS).
 
         Returns:
-            list: Indizes der gefundenen Peaks.
+            np.ndarray: Indizes der gefundenen Peaks.
         """
+        defaults = default_peak_params("txt")
+        threshold = defaults["threshold"] if threshold is None else threshold
+        min_distance_ms = defaults["min_distance_ms"] if min_distance_ms is None else min_distance_ms
         if self.voltage is None or self.time is None:
             self.load_data()
-        peak_indices = []
-        for i in range(1, len(self.voltage) - 1):
-            if (
-                self.voltage[i] >= self.voltage[i - 1]
-                and self.voltage[i] >= self.voltage[i + 1]
-                and self.voltage[i] > threshold
-            ):
-                peak_indices.append(i)
-        filtered_peaks = []
-        last_peak_time = -np.inf
-        for idx in peak_indices:
-            if self.time[idx] - last_peak_time >= min_distance_ms:
-                filtered_peaks.append(idx)
-                last_peak_time = self.time[idx]
-        self.peaks = filtered_peaks
-        return filtered_peaks
-
-    def find_peaks_csv(self, threshold=0.3, min_distance_ms=400):
+        with stage("find_peaks", test_id=self.test_id, samples=len(self.voltage)) as s:
+            self.peaks = detect_peaks(self.voltage, threshold, min_distance_ms, time=self.time)
+            s.set(peaks=len(self.peaks))
+        return self.peaks
+
+    def find_peaks_csv(self, threshold=None, min_distance_ms=None):
         """
         Findet Peaks im EKG-Signal für CSV-Dateien (mV-Bereich), die über dem Schwellwert liegen und mindestens min_distance_ms Abstand haben.
+        Ohne Angabe gelten die Standardparameter für CSV aus peaks.DEFAULT_PEAK_PARAMS.
         """
+        defaults = default_peak_params("csv")
+        threshold = defaults["threshold"] if threshold is None else threshold
+        min_distance_ms = defaults["min_distance_ms"] if min_distance_ms is None else min_distance_ms
         if self.voltage is None or self.time is None:
             self.load_data()
         if len(self.time) < 2:
             return []
         dt = np.median(np.diff(self.time))
         min_distance_samples = int(min_distance_ms / dt)
-        peaks = []
-        last_peak = -min_distance_samples
-        for i in range(1, len(self.voltage) - 1):
-            if (
-                self.voltage[i] > threshold and
-                self.voltage[i] > self.voltage[i - 1] and
-                self.voltage[i] > self.voltage[i + 1] and
-                (i - last_peak) >= min_distance_samples
-            ):
-                peaks.append(i)
-                last_peak = i
-        self.peaks = np.array(peaks)
+        with stage("find_peaks_csv", test_id=self.test_id, samples=len(self.voltage)) as s:
+            self.peaks = detect_peaks(self.voltage, threshold, min_distance_samples, strict=True)
+            s.set(peaks=len(self.peaks))
         return self.peaks
 
+    def peak_params(self):
+        """
+        Verfahren und Parameter, mit denen die Peaks dieses Tests erkannt werden.
+
+        Returns:
+            dict: Name und Version des Verfahrens sowie threshold und min_distance_ms.
+        """
+        return {"detector": DETECTOR_NAME, "version": DETECTOR_VERSION, **default_peak_params(self.filetype)}
+
+    def get_peaks(self):
+        """
+        Liefert die Peaks des Tests und erkennt sie bei Bedarf mit dem zum
+        Dateityp passenden Verfahren. Erkannte Peaks und Herzfrequenz werden im
+        Ergebnisspeicher (siehe resultstore) abgelegt und nach einem Neustart oder
+        in anderen Prozessen von dort gelesen.
+
+        Returns:
+            np.ndarray: Indizes der Peaks.
+        """
+        if self.voltage is None or self.time is None:
+            self.load_data()
+        if self.peaks is None:
+            params = default_peak_params(self.filetype)
+            stored = result_store.load(self.result_link, DETECTOR_NAME, DETECTOR_VERSION, params)
+            if stored is not None:
+                self.peaks = stored["peaks"]
+            else:
+                if self.filetype == "csv":
+                    self.find_peaks_csv(**params)
+                else:
+                    self.find_peaks(**params)
+                if self.peaks is not None:
+                    result_store.save(self.result_link, DETECTOR_NAME, DETECTOR_VERSION, params,
+                                      {"peaks": self.peaks, "bpm": _bpm_from_peaks(self.time, self.peaks)})
+            if self.shared_key is not None and self.peaks is not None:
+                shared_signals.publish_peaks(self.shared_key, self.peak_params(), self.peaks)
+        return self.peaks
+
+    def sample_rate(self):
+        """
+        Schätzt die Abtastrate aus dem Median der Zeitabstände. Bei langen Aufnahmen
+        genügen die ersten SAMPLE_RATE_WINDOW Abstände; das Ergebnis wird gecacht.
+
+        Returns:
+            float: Abtastrate in Hz (0, wenn sie nicht bestimmbar ist).
+        """
+        if self.voltage is None or self.time is None:
+            self.load_data()
+        if "sample_rate" not in self.derived:
+            if len(self.time) < 2:
+                return 0.0
+            dt = float(np.median(np.diff(self.time[:SAMPLE_RATE_WINDOW + 1])))
+            self.derived["sample_rate"] = 1000 / dt if dt > 0 else 0.0
+        return self.derived["sample_rate"]
+
     def bpm(self, threshold=350):
         """
         Berechnet die Herzfrequenz (bpm) basierend auf den gefundenen Peaks.
         """
-        if self.filetype == "csv":
-            if self.peaks is None:
-                self.find_peaks_csv()
-            peaks = self.peaks
-        else:
-            if self.peaks is None:
-                self.find_peaks()
-            peaks = self.peaks
-
-        num_peaks = len(peaks)
-        if num_peaks > 1:
-            dauer_ms = self.time[peaks[-1]] - self.time[peaks[0]]
-            dauer_min = dauer_ms / 1000 / 60
-            bpm = num_peaks / dauer_min if dauer_min > 0 else 0
-        else:
-            bpm = 0
-        return bpm
+        return _bpm_from_peaks(self.time, self.get_peaks())
+
+    def hrv(self):
+        """
+        Liefert RR-Intervalle, Herzfrequenz-Verläufe und HRV-Kennzahlen (SDNN, RMSSD,
+        pNN50) des Tests. Das Ergebnis wird mit den übrigen abgeleiteten Ergebnissen
+        gecacht und von Plot-, Vergleichs- und Batch-Auswertung gemeinsam genutzt;
+        zusätzlich liegt es dauerhaft im Ergebnisspeicher.
+
+        Returns:
+            dict: Ergebnis von hrv.compute_hrv.
+        """
+        result = self.derived.get("hrv")
+        if result is None:
+            peak_times = self.peak_times()
+            params = {"peaks": self.peak_params(), "window_s": DEFAULT_WINDOW_S}
+
+            def compute():
+                with stage("hrv", test_id=self.test_id, peaks=len(peak_times)):
+                    return compute_hrv(peak_times)
+
+            result = result_store.get_or_compute(self.result_link, "hrv", HRV_VERSION, params, compute)
+            self.derived["hrv"] = result
+            recording_cache.refresh()
+        return result
+
+    def plot_heart_rate(self):
+        """
+        Plottet die momentane Herzfrequenz und ihren gleitenden Durchschnitt.
+
+        Returns:
+            plotly.graph_objects.Figure: Der Plot.
+        """
+        result = self.hrv()
+        df_hr = pd.DataFrame({
+            'Time in s': result["rr_times_ms"] / 1000,
+            'Herzfrequenz (momentan)': result["hr_bpm"],
+            'Gleitender Durchschnitt': result["hr_rolling_bpm"]
+        })
+        fig = px.line(df_hr, x='Time in s', y=['Herzfrequenz (momentan)', 'Gleitender Durchschnitt'],
+                      title="Herzfrequenz")
+        fig.update_layout(xaxis_title="Time in s", yaxis_title="Herzfrequenz in bpm", legend_title_text="")
+        return fig
 
-    def plot(self, n=5000, threshold=350):
+    def beat_template(self, method="median"):
         """
-        Plottet das EKG-Signal mit markierten Peaks.
+        Liefert den gemittelten Herzschlag (Median oder Mittelwert mit Perzentil-Band)
+        zur Beurteilung der Morphologie, z.B. einer ST-Hebung. Das Ergebnis wird mit
+        den übrigen abgeleiteten Ergebnissen gecacht.
 
         Args:
-            n (int): Standardlänge für den Plot-Ausschnitt.
-            threshold (float): Schwellwert für die Peak-Erkennung.
+            method (str): "median" oder "mean".
 
         Returns:
-            tuple: (Plotly-Figure, Anzahl Peaks, Herzfrequenz)
+            dict: Ergebnis von beattemplate.compute_beat_template (oder None).
         """
-        import streamlit as st
+        key = f"beat_template_{method}"
+        if key not in self.derived:
+            peaks = self.get_peaks()
+            with stage("beat_template", test_id=self.test_id, peaks=len(peaks)):
+                self.derived[key] = compute_beat_template(self.voltage, peaks, self.sample_rate(), method=method)
+            recording_cache.refresh()
+        return self.derived[key]
+
+    def plot_beat_template(self, method="median"):
+        """
+        Plottet den gemittelten Herzschlag mit Perzentil-Band.
+
+        Args:
+            method (str): "median" oder "mean".
 
+        Returns:
+            plotly.graph_objects.Figure: Der Plot (None, wenn keine Schläge vorhanden sind).
+        """
+        template = self.beat_template(method)
+        if template is None:
+            return None
+        label = "Median" if method == "median" else "Mittelwert"
+        beats = f"{template['n_beats']} Schläge"
+        if template["n_available"] > template["n_beats"]:
+            # Bei langen Aufnahmen wird nur eine gleichmäßig verteilte Auswahl gemittelt
+            beats = f"{template['n_beats']} von {template['n_available']} Schlägen, gleichmäßig verteilt"
+        fig = go.Figure([
+            go.Scatter(x=template["offsets_ms"], y=template["upper"], mode='lines',
+                       line=dict(width=0), showlegend=False, hoverinfo='skip'),
+            go.Scatter(x=template["offsets_ms"], y=template["lower"], mode='lines',
+                       line=dict(width=0), fill='tonexty', fillcolor='rgba(31, 119, 180, 0.2)',
+                       name='Perzentil-Band'),
+            go.Scatter(x=template["offsets_ms"], y=template["center"], mode='lines',
+                       line=dict(color='#1f77b4'), name=label),
+        ])
+        fig.update_layout(
+            title=f"Gemittelter Herzschlag ({beats})",
+            xaxis_title="Zeit relativ zur R-Zacke in ms",
+            yaxis_title="Voltage in mV"
+        )
+        return fig
+
+    def get_pyramid(self):
+        """
+        Liefert die Min/Max-Pyramide des Signals und baut sie beim ersten Aufruf auf.
+        Die Pyramide wird mit den übrigen abgeleiteten Ergebnissen gecacht.
+
+        Returns:
+            MinMaxPyramid: Die Pyramide des Signals.
+        """
+        pyramid = self.derived.get("pyramid")
+        if pyramid is None:
+            if self.voltage is None or self.time is None:
+                self.analyze()
+            pyramid = MinMaxPyramid(self.voltage)
+            self.derived["pyramid"] = pyramid
+            recording_cache.refresh()
+        return pyramid
+
+    def peak_times(self):
+        """
+        Liefert die Zeitpunkte der Peaks in ms (aufsteigend). Sie werden einmal pro
+        Aufnahme gesammelt und gecacht, damit Fensterabfragen per Binärsuche laufen.
+
+        Returns:
+            np.ndarray: Zeitpunkte der Peaks.
+        """
+        peak_times = self.derived.get("peak_times")
+        if peak_times is None:
+            peaks = np.asarray(self.get_peaks(), dtype=np.intp)
+            peak_times = np.asarray(self.time[peaks], dtype=np.float64)
+            self.derived["peak_times"] = peak_times
+            recording_cache.refresh()
+        return peak_times
+
+    def get_window(self, start_ms, end_ms, max_points=None):
+        """
+        Liefert nur die Samples und Peaks im Zeitfenster [start_ms, end_ms].
+        Fenstergrenzen und Peaks werden per Binärsuche auf der (memory-gemappten)
+        Zeitachse bzw. den Peak-Zeitpunkten bestimmt; der Aufwand hängt daher von der
+        Fenstergröße ab, nicht von der Länge der Aufnahme.
+
+        Args:
+            start_ms (float): Beginn des Fensters in ms.
+            end_ms (float): Ende des Fensters in ms.
+            max_points (int): Optional: Fenster über die Min/Max-Pyramide auf höchstens
+                so viele Punkte reduzieren (Peaks bleiben exakt).
+
+        Returns:
+            tuple: (Zeit in ms, Spannung, Indizes der Peaks im Fenster)
+        """
         if self.voltage is None or self.time is None:
-            self.load_data()
-        if self.filetype == "csv":
-            if self.peaks is None:
-                self.find_peaks_csv()
-            # Interaktives Zeitfenster für CSV
-            total_len = len(self.voltage)
-            max_start = max(total_len - n, 0)
-            start_idx = 0
-            if max_start > 0:
-                start_idx = int(st.slider("Zeitfenster verschieben (Startindex)", 0, max_start, 0, step=100))
-            end_idx = min(start_idx + n, total_len)
-            is_peak = np.zeros_like(self.voltage, dtype=bool)
-            for idx in self.peaks:
-                if start_idx <= idx < end_idx:
-                    is_peak[idx] = True
-            df_plot = pd.DataFrame({
-                'Time in ms': self.time[start_idx:end_idx],
-                'Voltage in mV': self.voltage[start_idx:end_idx],
-                'is_peak': is_peak[start_idx:end_idx]
-            })
+            self.analyze()
+        start_idx = int(np.searchsorted(self.time, start_ms, side="left"))
+        end_idx = int(np.searchsorted(self.time, end_ms, side="right"))
+        if max_points is None or end_idx - start_idx <= max_points:
+            time_win = np.asarray(self.time[start_idx:end_idx])
+            voltage_win = np.asarray(self.voltage[start_idx:end_idx])
+        else:
+            idx = self.get_pyramid().indices(start_idx, end_idx, max_points)
+            time_win = np.asarray(self.time[idx])
+            voltage_win = np.asarray(self.voltage[idx])
+
+        peak_times = self.peak_times()
+        first = np.searchsorted(peak_times, start_ms, side="left")
+        last = np.searchsorted(peak_times, end_ms, side="right")
+        window_peaks = np.asarray(self.get_peaks(), dtype=np.intp)[first:last]
+        return time_win, voltage_win, window_peaks
+
+    def default_window(self, n=5000):
+        """
+        Bestimmt das Standard-Zeitfenster für den Plot: bei TXT die ersten fünf Peaks,
+        bei CSV die ersten n Samples.
+
+        Args:
+            n (int): Standardlänge für den Plot-Ausschnitt in Samples.
+
+        Returns:
+            tuple: (Start in ms, Ende in ms)
+        """
+        peaks = self.get_peaks()
+        if self.filetype != "csv" and len(peaks) > 0:
+            start_idx = max(peaks[0] - 200, 0)
+            end_idx = min(peaks[min(4, len(peaks) - 1)] + 200, len(self.voltage))
         else:
-            if self.peaks is None:
-                self.find_peaks()
-            # Für TXT: wie früher, immer die ersten n Werte
             start_idx = 0
             end_idx = min(n, len(self.voltage))
-            is_peak = np.zeros_like(self.voltage, dtype=bool)
-            for idx in self.peaks:
-                is_peak[idx] = True
+        return float(self.time[start_idx]), float(self.time[end_idx - 1])
+
+    def plot_window(self, start_ms, end_ms, max_points=3000):
+        """
+        Erstellt den Plot für ein Zeitfenster. Über die Min/Max-Pyramide werden
+        höchstens max_points Punkte übertragen; kurze Fenster erscheinen in voller
+        Auflösung. Peaks werden immer exakt markiert.
+
+        Args:
+            start_ms (float): Beginn des Fensters in ms.
+            end_ms (float): Ende des Fensters in ms.
+            max_points (int): Maximale Anzahl an Signalpunkten (ca. 2x Bildschirmbreite).
+
+        Returns:
+            plotly.graph_objects.Figure: Der Plot.
+        """
+        time_win, voltage_win, window_peaks = self.get_window(start_ms, end_ms, max_points)
+
+        with stage("plot_figure", test_id=self.test_id, points=len(time_win), peaks=len(window_peaks)):
             df_plot = pd.DataFrame({
-                'Time in ms': self.time,
-                'Voltage in mV': self.voltage,
-                'is_peak': is_peak
+                'Time in ms': time_win,
+                'Voltage in mV': voltage_win
             })
+            fig = px.line(df_plot, x='Time in ms', y='Voltage in mV', title="EKG Signal")
+            fig.add_scatter(
+                x=self.time[window_peaks],
+                y=self.voltage[window_peaks],
+                mode='markers',
+                name='Peaks',
+                marker=dict(color='red', size=8)
+            )
+            fig.update_layout(xaxis_title="Time in ms", yaxis_title="Voltage in mV", xaxis_range=[start_ms, end_ms])
+        return fig
 
-        df_plot_down = df_plot.iloc[::4].copy()
-        df_peaks = df_plot[df_plot['is_peak']]
+    def plot(self, n=5000, threshold=350, max_points=3000):
+        """
+        Plottet das EKG-Signal mit markierten Peaks. Das Zeitfenster wird über einen
+        Schieberegler gewählt, vom kurzen Ausschnitt bis zur gesamten Aufnahme.
 
-        fig = px.line(df_plot_down, x='Time in ms', y='Voltage in mV', title="EKG Signal")
-        fig.add_scatter(
-            x=df_peaks['Time in ms'],
-            y=df_peaks['Voltage in mV'],
-            mode='markers',
-            name='Peaks',
-            marker=dict(color='red', size=8)
-        )
-        if self.filetype != "csv":
-            # Nur für TXT: Zoom auf die ersten Peaks
-            num_peaks = len(self.peaks)
-            if num_peaks >= 5:
-                start_idx = max(self.peaks[0] - 200, 0)
-                end_idx = min(self.peaks[4] + 200, len(self.voltage))
-                x_range = [self.time[start_idx], self.time[end_idx-1]]
-                fig.update_layout(xaxis_range=x_range)
-            elif num_peaks > 0:
-                start_idx = max(self.peaks[0] - 200, 0)
-                end_idx = min(self.peaks[-1] + 200, len(self.voltage))
-                x_range = [self.time[start_idx], self.time[end_idx-1]]
-                fig.update_layout(xaxis_range=x_range)
-        fig.update_layout(xaxis_title="Time in ms", yaxis_title="Voltage in mV")
-        return fig, len(self.peaks), self.bpm()
\ No newline at end of file
+        Args:
+            n (int): Standardlänge für den Plot-Ausschnitt.
+            threshold (float): Schwellwert für die Peak-Erkennung.
+            max_points (int): Maximale Anzahl an Signalpunkten im Plot.
+
+        Returns:
+            tuple: (Plotly-Figure, Anzahl Peaks, Herzfrequenz)
+        """
+        import streamlit as st
+
+        if self.voltage is None or self.time is None:
+            self.analyze()
+        start_ms, end_ms = self.default_window(n)
+        t_min = round(float(self.time[0]) / 1000, 1)
+        t_max = round(float(self.time[-1]) / 1000, 1)
+        if t_max > t_min:
+            window = st.slider(
+                "Zeitbereich in s",
+                min_value=t_min,
+                max_value=t_max,
+                value=(max(round(start_ms / 1000, 1), t_min), min(round(end_ms / 1000, 1), t_max)),
+                step=0.1,
+                key=f"zeitbereich_{self.test_id}"
+            )
+            start_ms, end_ms = window[0] * 1000, window[1] * 1000
+        fig = self.plot_window(start_ms, end_ms, max_points)
+        return fig, len(self.peaks), self.bpm()
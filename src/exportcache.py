@@ -0,0 +1,225 @@
+import glob
+import hashlib
+import importlib.util
+import json
+import os
+import threading
+from src.signalcache import CACHE_ROOT, file_stat_key
+from src.instrumentation import stage
+
+EXPORT_CACHE_DIR = os.path.join(CACHE_ROOT, "exports")
+DEFAULT_EXPORT_CACHE_MB = float(os.environ.get("EKG_EXPORT_CACHE_MB", 200))
+
+# Schlanke HTML-Exporte laden plotly.js standardmäßig vom versionierten plotly-CDN.
+# Mit EKG_PLOTLY_JS_URL stattdessen von einer eigenen Adresse, z.B. vom Streamlit-Server
+# (static/, siehe .streamlit/config.toml): https://<host>/app/static/plotly.min.js
+STATIC_DIR = "static"
+PLOTLY_JS_NAME = "plotly.min.js"
+PLOTLY_JS_URL = os.environ.get("EKG_PLOTLY_JS_URL")
+
+FORMATS = {
+    "html": ("html", "text/html"),
+    "html_lean": ("html", "text/html"),
+    "png": ("png", "image/png"),
+}
+
+
+class ExportUnavailable(RuntimeError):
+    """
+    Das gewünschte Exportformat kann in dieser Umgebung nicht erzeugt werden.
+    """
+
+
+def png_available():
+    """
+    True, wenn kaleido für den PNG-Export installiert ist.
+    """
+    return importlib.util.find_spec("kaleido") is not None
+
+
+def lean_export_source():
+    """
+    Beschreibt, woher schlanke HTML-Exporte plotly.js laden (für die Beschriftung).
+
+    Returns:
+        str: "CDN" oder die konfigurierte URL.
+    """
+    return PLOTLY_JS_URL or "CDN"
+
+
+def ensure_plotly_js(static_dir=STATIC_DIR):
+    """
+    Legt die mit plotly ausgelieferte plotly.js einmalig im statischen Verzeichnis ab,
+    damit schlanke HTML-Exporte sie über EKG_PLOTLY_JS_URL vom Streamlit-Server laden können.
+
+    Returns:
+        str: Pfad zur Datei.
+    """
+    path = os.path.join(static_dir, PLOTLY_JS_NAME)
+    if not os.path.exists(path):
+        from plotly.offline import get_plotlyjs
+        os.makedirs(static_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(get_plotlyjs())
+        os.replace(tmp_path, path)
+    return path
+
+
+def render_export(fig, fmt):
+    """
+    Erzeugt den Inhalt eines Exports.
+
+    Args:
+        fig (plotly.graph_objects.Figure): Der Plot.
+        fmt (str): "html", "html_lean" oder "png".
+
+    Returns:
+        bytes: Inhalt der Datei.
+    """
+    if fmt == "html":
+        return fig.to_html(include_plotlyjs=True, full_html=True).encode("utf-8")
+    if fmt == "html_lean":
+        if PLOTLY_JS_URL is None:
+            return fig.to_html(include_plotlyjs="cdn", full_html=True).encode("utf-8")
+        ensure_plotly_js()
+        return fig.to_html(include_plotlyjs=PLOTLY_JS_URL, full_html=True).encode("utf-8")
+    if fmt == "png":
+        if not png_available():
+            raise ExportUnavailable("Für den PNG-Export wird das Paket kaleido benötigt.")
+        return fig.to_image(format="png")
+    raise ValueError(f"Unbekanntes Exportformat: {fmt}")
+
+
+def export_params(ekg_test, fig, **params):
+    """
+    Stellt die Parameter zusammen, die einen Export eindeutig bestimmen: Test-ID,
+    Fingerabdruck der Aufnahme, angezeigtes Zeitfenster und Figure-Parameter.
+
+    Args:
+        ekg_test (EKGTest): Der geplottete Test.
+        fig (plotly.graph_objects.Figure): Der Plot.
+        **params: Weitere Parameter (z.B. max_points).
+
+    Returns:
+        dict: Schlüsselparameter.
+    """
+    _, mtime_ns, size = file_stat_key(ekg_test.result_link)
+    window = fig.layout.xaxis.range
+    return {
+        "test_id": str(ekg_test.test_id),
+        "result_link": ekg_test.result_link,
+        "mtime_ns": mtime_ns,
+        "size": size,
+        "window": [float(x) for x in window] if window else None,
+        "title": fig.layout.title.text,
+        **params,
+    }
+
+
+class ExportCache:
+    """
+    Größenbegrenzter Datei-Cache für Plot-Exporte. Exporte werden erst bei Bedarf
+    erzeugt; bei Überschreiten des Budgets werden die am längsten nicht
+    verwendeten Dateien gelöscht (Zugriffszeit über die Änderungszeit der Datei).
+    """
+
+    def __init__(self, directory=EXPORT_CACHE_DIR, max_mb=DEFAULT_EXPORT_CACHE_MB):
+        """
+        Args:
+            directory (str): Cache-Verzeichnis.
+            max_mb (float): Speicherbudget in MB.
+        """
+        self.directory = directory
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+
+    def path_for(self, params, fmt):
+        """
+        Liefert den Dateipfad eines Exports aus dem Hash seiner Parameter.
+        """
+        extension, _ = FORMATS[fmt]
+        key = {**params, "format": fmt}
+        if fmt == "html_lean":
+            key["plotly_js"] = lean_export_source()  # Die Datei verweist auf diese Quelle
+        digest = hashlib.sha1(json.dumps(key, sort_keys=True, default=str).encode("utf-8"))
+        return os.path.join(self.directory, f"{params.get('test_id', 'plot')}-{digest.hexdigest()[:20]}.{extension}")
+
+    def get(self, fig, params, fmt):
+        """
+        Liefert einen Export aus dem Cache oder erzeugt ihn einmalig.
+
+        Args:
+            fig (plotly.graph_objects.Figure): Der Plot.
+            params (dict): Schlüsselparameter (siehe export_params).
+            fmt (str): "html", "html_lean" oder "png".
+
+        Returns:
+            bytes: Inhalt der Datei.
+        """
+        path = self.path_for(params, fmt)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # als zuletzt verwendet markieren
+            return data
+        except OSError:
+            pass
+
+        with stage("export", test_id=params.get("test_id"), format=fmt) as s:
+            data = render_export(fig, fmt)
+            s.set(kb=len(data) / 1024)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self.evict()
+        except OSError:
+            pass  # Der Download funktioniert auch ohne Cache
+        return data
+
+    def evict(self):
+        """
+        Löscht die am längsten nicht verwendeten Exporte, bis das Budget eingehalten ist.
+
+        Returns:
+            int: Anzahl der gelöschten Dateien.
+        """
+        with self._lock:
+            files = []
+            for path in glob.glob(os.path.join(self.directory, "*")):
+                if path.endswith(".tmp"):
+                    continue
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime_ns, stat.st_size, path))
+            total = sum(size for _, size, _ in files)
+            removed = 0
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                    removed += 1
+                except OSError:
+                    pass
+            return removed
+
+    def clear(self):
+        """
+        Löscht alle Exporte.
+        """
+        for path in glob.glob(os.path.join(self.directory, "*")):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+# Gemeinsamer Export-Cache des Serverprozesses
+export_cache = ExportCache()
@@ -0,0 +1,31 @@
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: kein flock, Sperren gelten dann nur innerhalb eines Prozesses
+    fcntl = None
+
+
+@contextmanager
+def file_lock(path):
+    """
+    Exklusive Sperre über Prozessgrenzen hinweg (fcntl.flock auf einer Sperrdatei).
+    Die Sperrdatei bleibt liegen; sie ist leer und wird bei jedem Aufruf wiederverwendet.
+    Ohne fcntl (Windows) wird nicht gesperrt.
+
+    Args:
+        path (str): Pfad zur Sperrdatei.
+    """
+    if fcntl is None:
+        yield
+        return
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
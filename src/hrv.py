@@ -0,0 +1,46 @@
+import numpy as np
+
+DEFAULT_WINDOW_S = 10  # Fensterbreite des gleitenden Durchschnitts
+HRV_VERSION = 1  # Erhöhen, wenn sich die Berechnung ändert (gespeicherte Ergebnisse werden ungültig)
+
+
+def compute_hrv(peak_times_ms, window_s=DEFAULT_WINDOW_S):
+    """
+    Berechnet RR-Intervalle, Herzfrequenz-Verläufe und HRV-Kennzahlen aus den
+    Zeitpunkten der R-Zacken. Alle Schritte sind vektorisiert.
+
+    Args:
+        peak_times_ms (np.ndarray): Aufsteigende Zeitpunkte der Peaks in ms.
+        window_s (float): Fensterbreite des gleitenden Durchschnitts in Sekunden.
+
+    Returns:
+        dict: Mit den Einträgen
+            rr_times_ms: Zeitpunkt jedes RR-Intervalls (Ende des Intervalls),
+            rr_ms: RR-Intervalle in ms,
+            hr_bpm: momentane Herzfrequenz je Intervall,
+            hr_rolling_bpm: gleitender Durchschnitt der Herzfrequenz,
+            sdnn_ms, rmssd_ms, pnn50: HRV-Kennzahlen (NaN, wenn zu wenige Schläge).
+    """
+    times = np.asarray(peak_times_ms, dtype=np.float64)
+    rr = np.diff(times)
+    rr_times = times[1:]
+    valid = rr > 0
+    rr, rr_times = rr[valid], rr_times[valid]
+    hr = 60000 / rr
+
+    # Gleitender Durchschnitt über alle Intervalle der letzten window_s Sekunden
+    cumsum = np.concatenate([[0.0], np.cumsum(hr)])
+    end = np.arange(1, len(hr) + 1)
+    start = np.searchsorted(rr_times, rr_times - window_s * 1000, side="left")
+    hr_rolling = (cumsum[end] - cumsum[start]) / (end - start) if len(hr) else np.empty(0)
+
+    successive = np.diff(rr)
+    return {
+        "rr_times_ms": rr_times,
+        "rr_ms": rr,
+        "hr_bpm": hr,
+        "hr_rolling_bpm": hr_rolling,
+        "sdnn_ms": float(np.std(rr, ddof=1)) if len(rr) > 1 else float("nan"),
+        "rmssd_ms": float(np.sqrt(np.mean(successive ** 2))) if len(successive) else float("nan"),
+        "pnn50": float(np.mean(np.abs(successive) > 50) * 100) if len(successive) else float("nan"),
+    }
@@ -0,0 +1,231 @@
+import hashlib
+import io
+import json
+import os
+import numpy as np
+from src.signalcache import parse_recording, txt_time_axis
+
+# Aufbereitete Uploads liegen neben den bisherigen Rohdateien
+INGEST_DIR = "data/ekg/"
+FORMAT_VERSION = 2  # ab 2 mit den Parametern der gespeicherten Peaks
+MIN_SAMPLE_RATE_HZ = 50
+MAX_SAMPLE_RATE_HZ = 10000
+MIN_SAMPLES = 2
+
+
+class IngestError(ValueError):
+    """
+    Fehler beim Einlesen oder Prüfen einer hochgeladenen EKG-Datei.
+    """
+
+
+def parse_upload(data, filename):
+    """
+    Parst eine hochgeladene EKG-Datei im Speicher, ohne sie vorher abzulegen.
+
+    Args:
+        data (bytes): Inhalt der Datei.
+        filename (str): Originaler Dateiname (bestimmt das Format).
+
+    Returns:
+        tuple: (Zeit in ms, Spannung, Dateityp)
+    """
+    source_type = os.path.splitext(filename)[1].lower().replace('.', '')
+    if source_type not in ("txt", "csv"):
+        raise IngestError(f"Unbekanntes Dateiformat: {filename}")
+    try:
+        time, voltage = parse_recording(io.BytesIO(data), source_type)
+    except ValueError as e:
+        # z.B. falsche Spaltenanzahl oder nicht-numerische Werte
+        raise IngestError(f"Datei konnte nicht gelesen werden: {e}") from e
+    return np.asarray(time), np.asarray(voltage, dtype=np.float64), source_type
+
+
+def validate_recording(time, voltage):
+    """
+    Prüft eine eingelesene Aufnahme auf Plausibilität.
+
+    Args:
+        time (np.ndarray): Zeit in ms.
+        voltage (np.ndarray): Spannung.
+
+    Returns:
+        float: Abtastrate in Hz.
+
+    Raises:
+        IngestError: Wenn die Aufnahme zu kurz ist, ungültige Werte enthält, die
+            Zeitachse nicht streng monoton steigt oder die Abtastrate unplausibel ist.
+    """
+    if len(voltage) < MIN_SAMPLES:
+        raise IngestError(f"Die Aufnahme enthält weniger als {MIN_SAMPLES} Messwerte.")
+    if not np.all(np.isfinite(voltage)) or not np.all(np.isfinite(time)):
+        raise IngestError("Die Aufnahme enthält fehlende oder ungültige Werte.")
+    intervals = np.diff(time)
+    if np.any(intervals <= 0):
+        raise IngestError("Die Zeitachse ist nicht streng monoton steigend.")
+    sample_rate = 1000 / float(np.median(intervals))
+    if not MIN_SAMPLE_RATE_HZ <= sample_rate <= MAX_SAMPLE_RATE_HZ:
+        raise IngestError(
+            f"Unplausible Abtastrate von {sample_rate:.1f} Hz "
+            f"(erlaubt: {MIN_SAMPLE_RATE_HZ}–{MAX_SAMPLE_RATE_HZ} Hz)."
+        )
+    return sample_rate
+
+
+def _uniform_time(t0, sample_rate, n_samples):
+    """
+    Rekonstruiert eine gleichmäßig abgetastete Zeitachse in ms.
+    """
+    return t0 + np.arange(n_samples) * (1000 / sample_rate)
+
+
+def write_ingested(path, time, voltage, source_type, peaks, sample_rate, peak_params):
+    """
+    Speichert eine Aufnahme im kompakten npz-Format: Spannung als float32, Abtastrate
+    und Startzeit als Metadaten und die vorab berechneten Peaks samt Verfahren und
+    Parametern, mit denen sie erkannt wurden. Die Zeitachse wird nur gespeichert,
+    wenn sie sich nicht exakt aus den Metadaten rekonstruieren lässt.
+
+    Args:
+        path (str): Zieldatei (.npz).
+        time (np.ndarray): Zeit in ms.
+        voltage (np.ndarray): Spannung.
+        source_type (str): Ursprüngliches Format ("txt" oder "csv").
+        peaks (np.ndarray): Indizes der Peaks.
+        sample_rate (float): Abtastrate in Hz.
+        peak_params (dict): Verfahren und Parameter der Peaks (EKGTest.peak_params).
+    """
+    arrays = {
+        "version": np.int32(FORMAT_VERSION),
+        "source_type": np.str_(source_type),
+        "sample_rate_hz": np.float64(sample_rate),
+        "t0_ms": np.float64(time[0]),
+        "voltage": np.asarray(voltage, dtype=np.float32),
+        "peaks": np.asarray(peaks, dtype=np.int64),
+        "peak_params": np.str_(json.dumps(peak_params, sort_keys=True)),
+    }
+    if source_type != "txt" and not np.array_equal(_uniform_time(float(time[0]), sample_rate, len(time)), time):
+        arrays["time"] = np.asarray(time)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+def read_ingested(path):
+    """
+    Liest eine aufbereitete Aufnahme.
+
+    Args:
+        path (str): Pfad zur npz-Datei.
+
+    Returns:
+        dict: time, voltage, source_type, sample_rate_hz, peaks und peak_params
+            (None bei Dateien ohne gespeicherte Parameter).
+    """
+    with np.load(path) as data:
+        source_type = str(data["source_type"])
+        voltage = data["voltage"]
+        sample_rate = float(data["sample_rate_hz"])
+        if "time" in data:
+            time = data["time"]
+        elif source_type == "txt":
+            time = txt_time_axis(len(voltage))
+        else:
+            time = _uniform_time(float(data["t0_ms"]), sample_rate, len(voltage))
+        peaks = data["peaks"]
+        peak_params = _stored_peak_params(data)
+    return {
+        "time": time,
+        "voltage": voltage,
+        "source_type": source_type,
+        "sample_rate_hz": sample_rate,
+        "peaks": peaks,
+        "peak_params": peak_params,
+    }
+
+
+def _stored_peak_params(data):
+    """
+    Liest Verfahren und Parameter der gespeicherten Peaks (None bei älteren Dateien).
+    """
+    return json.loads(str(data["peak_params"])) if "peak_params" in data else None
+
+
+def read_ingested_peaks(path, peak_params):
+    """
+    Liest nur die gespeicherten Peaks einer aufbereiteten Aufnahme (ohne das Signal
+    zu dekomprimieren), sofern sie mit den angegebenen Parametern erkannt wurden.
+
+    Args:
+        path (str): Pfad zur npz-Datei.
+        peak_params (dict): Aktuelle Parameter (EKGTest.peak_params).
+
+    Returns:
+        np.ndarray: Indizes der Peaks oder None, wenn sie mit anderen Parametern
+            bzw. einer anderen Version des Verfahrens erkannt wurden.
+    """
+    with np.load(path) as data:
+        if _stored_peak_params(data) != peak_params:
+            return None
+        return data["peaks"]
+
+
+def ingested_path(data, filename, folder=INGEST_DIR):
+    """
+    Zieldatei eines Uploads: Dateiname plus Präfix des SHA-256 des Inhalts. Gleich
+    benannte Uploads mit anderem Inhalt (z.B. "Ruhe.txt" zweier Personen)
+    überschreiben sich so nicht; identische Uploads landen in derselben Datei.
+
+    Args:
+        data (bytes): Inhalt der hochgeladenen Datei.
+        filename (str): Originaler Dateiname.
+        folder (str): Zielordner.
+
+    Returns:
+        str: Pfad zur npz-Datei.
+    """
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    return os.path.join(folder, f"{stem}-{digest}.npz")
+
+
+def ingest_upload(data, filename, folder=INGEST_DIR):
+    """
+    Verarbeitet einen Upload vollständig: parsen, prüfen, Peaks, bpm und Dauer
+    einmalig berechnen und im kompakten Format ablegen.
+
+    Args:
+        data (bytes): Inhalt der hochgeladenen Datei.
+        filename (str): Originaler Dateiname.
+        folder (str): Zielordner.
+
+    Returns:
+        EKGTest: Ein analysierter Test (ID und Datum leer) mit result_link auf die
+            neue npz-Datei; Signal und Peaks sind bereits gesetzt.
+
+    Raises:
+        IngestError: Wenn die Datei ungültig ist.
+    """
+    from src.ekg import EKGTest
+
+    time, voltage, source_type = parse_upload(data, filename)
+    sample_rate = validate_recording(time, voltage)
+
+    path = ingested_path(data, filename, folder)
+    ekg_test = EKGTest(None, None, os.path.normpath(path).replace("\\", "/"))
+    ekg_test.time = time
+    # Peaks auf dem float32-Signal erkennen, das auch gespeichert und später geladen wird
+    ekg_test.voltage = np.asarray(voltage, dtype=np.float32)
+    ekg_test.filetype = source_type
+    # Direkt auf dem dekodierten Signal erkennen: get_peaks() würde den Ergebnisspeicher
+    # über die Datei am Zielpfad befragen, die noch nicht (oder noch alt) geschrieben ist
+    if source_type == "csv":
+        peaks = ekg_test.find_peaks_csv()
+    else:
+        peaks = ekg_test.find_peaks()
+    write_ingested(path, time, ekg_test.voltage, source_type, peaks, sample_rate, ekg_test.peak_params())
+    return ekg_test
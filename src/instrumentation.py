@@ -0,0 +1,178 @@
+import json
+import os
+import threading
+import time
+import uuid
+
+# Messung nur bei EKG_PROFILE=1 aktiv; sonst kostet jeder Messpunkt nur eine Abfrage
+ENABLED = os.environ.get("EKG_PROFILE", "0") == "1"
+LOG_PATH = os.environ.get("EKG_PROFILE_LOG", "data/logs/timings.jsonl")
+
+_local = threading.local()  # Streamlit führt jede Session in einem eigenen Thread aus
+_log_lock = threading.Lock()
+
+
+class _NullStage:
+    """
+    Platzhalter, wenn die Messung deaktiviert ist.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **sizes):
+        """
+        Ignoriert Größenangaben.
+        """
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """
+    Misst die Dauer eines Verarbeitungsschritts und hängt sie an den aktuellen Durchlauf.
+    """
+
+    def __init__(self, name, sizes):
+        self.name = name
+        self.sizes = sizes
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed_ms = (time.perf_counter() - self.start) * 1000
+        run = getattr(_local, "run", None)
+        if run is not None:
+            run["stages"].append({"stage": self.name, "ms": elapsed_ms, **self.sizes})
+        return False
+
+    def set(self, **sizes):
+        """
+        Ergänzt Größenangaben (z.B. Anzahl Samples), die erst während des Schritts bekannt werden.
+        """
+        self.sizes.update(sizes)
+
+
+def stage(name, **sizes):
+    """
+    Kontextmanager, der einen Verarbeitungsschritt misst.
+
+    Beispiel::
+
+        with stage("load_data", test_id=1) as s:
+            ...
+            s.set(samples=len(voltage))
+
+    Args:
+        name (str): Name des Schritts.
+        **sizes: Zusätzliche Angaben zum Schritt (Größen, IDs).
+
+    Returns:
+        Kontextmanager mit der Methode set(**sizes).
+    """
+    if not ENABLED:
+        return _NULL_STAGE
+    return _Stage(name, dict(sizes))
+
+
+def start_run(page):
+    """
+    Beginnt die Messung eines Streamlit-Durchlaufs (Rerun).
+
+    Args:
+        page (str): Aktuelle Seite.
+    """
+    if not ENABLED:
+        return
+    _local.run = {
+        "run_id": uuid.uuid4().hex,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "page": page,
+        "start": time.perf_counter(),
+        "stages": [],
+    }
+
+
+def current_run():
+    """
+    Liefert den laufenden Durchlauf oder None.
+    """
+    return getattr(_local, "run", None) if ENABLED else None
+
+
+def bind_run(func):
+    """
+    Bindet eine Funktion an den laufenden Durchlauf, damit Schritte, die in einem
+    Worker-Thread ausgeführt werden, ebenfalls gemessen werden.
+
+    Args:
+        func (callable): Die auszuführende Funktion.
+
+    Returns:
+        callable: Die gebundene Funktion (bzw. func selbst, wenn nicht gemessen wird).
+    """
+    run = current_run()
+    if run is None:
+        return func
+
+    def bound(*args, **kwargs):
+        _local.run = run
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.run = None
+    return bound
+
+
+def finish_run():
+    """
+    Schließt den Durchlauf ab und hängt ihn als JSON-Zeile an die Log-Datei an.
+    """
+    run = current_run()
+    if run is None:
+        return
+    _local.run = None
+    record = {
+        "run_id": run["run_id"],
+        "timestamp": run["timestamp"],
+        "page": run["page"],
+        "total_ms": (time.perf_counter() - run["start"]) * 1000,
+        "stages": run["stages"],
+    }
+    try:
+        directory = os.path.dirname(LOG_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with _log_lock, open(LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+    except OSError:
+        pass  # Logging darf die App nicht stören
+
+
+def render_sidebar():
+    """
+    Zeigt die Messwerte des aktuellen Durchlaufs in der Seitenleiste an.
+    """
+    run = current_run()
+    if run is None:
+        return
+    import streamlit as st
+    from src.recordingcache import recording_cache
+
+    with st.sidebar.expander("⏱️ Laufzeiten dieses Durchlaufs", expanded=False):
+        total_ms = (time.perf_counter() - run["start"]) * 1000
+        st.markdown(f"**Gesamt:** {total_ms:.1f} ms")
+        if run["stages"]:
+            st.dataframe(run["stages"], use_container_width=True)
+        stats = recording_cache.stats()
+        st.caption(
+            f"Aufnahme-Cache: {stats['hits']} Treffer, {stats['misses']} Fehlzugriffe, "
+            f"{stats['evictions']} Verdrängungen, {stats['used_mb']:.1f} / {stats['max_mb']:.0f} MB"
+        )
@@ -0,0 +1,320 @@
+import collections
+import os
+import socket
+import time
+import numpy as np
+from src.peaks import DEFAULT_PEAK_PARAMS
+from src.streaming import StreamingPeakDetector
+
+# Protokoll der Live-Quellen: eine Zeile pro Sample "<Zeitstempel in ms>\t<Spannung>\n",
+# der Zeitstempel ist die Wanduhrzeit (Unix-Zeit in ms) der Aufnahme des Samples.
+LIVE_DIR = "data/live"
+DEFAULT_LIVE_FILE = os.path.join(LIVE_DIR, "live.txt")
+DEFAULT_PORT = 5555
+DEFAULT_WINDOW_S = 10  # Sichtbares Fenster = Größe des Ringpuffers
+DEFAULT_SAMPLE_RATE_HZ = 500
+DEFAULT_BPM_WINDOW_S = 10
+
+
+def now_ms():
+    """
+    Aktuelle Wanduhrzeit in ms.
+    """
+    return time.time() * 1000
+
+
+class RingBuffer:
+    """
+    Ringpuffer fester Größe für Zeit und Spannung. Neue Blöcke überschreiben die
+    ältesten Samples; der Speicherbedarf bleibt unabhängig von der Laufzeit konstant.
+    """
+
+    def __init__(self, capacity):
+        """
+        Args:
+            capacity (int): Anzahl der Samples im Puffer.
+        """
+        self.capacity = int(capacity)
+        self.time = np.zeros(self.capacity)
+        self.voltage = np.zeros(self.capacity)
+        self.total = 0  # Anzahl aller jemals geschriebenen Samples
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def append(self, time, voltage):
+        """
+        Schreibt einen Block in den Puffer (vektorisiert, auch über das Pufferende hinweg).
+
+        Args:
+            time (np.ndarray): Zeitstempel in ms.
+            voltage (np.ndarray): Spannung.
+        """
+        n = len(voltage)
+        if n == 0:
+            return
+        if n > self.capacity:
+            # Nur die neuesten Samples passen in den Puffer
+            skipped = n - self.capacity
+            time, voltage = time[skipped:], voltage[skipped:]
+            self.total += skipped
+            n = self.capacity
+        start = self.total % self.capacity
+        first = min(n, self.capacity - start)
+        self.time[start:start + first] = time[:first]
+        self.voltage[start:start + first] = voltage[:first]
+        self.time[:n - first] = time[first:]
+        self.voltage[:n - first] = voltage[first:]
+        self.total += n
+
+    def snapshot(self):
+        """
+        Liefert den Pufferinhalt in zeitlicher Reihenfolge (Kopie).
+
+        Returns:
+            tuple: (Zeit in ms, Spannung)
+        """
+        if self.total <= self.capacity:
+            return self.time[:self.total].copy(), self.voltage[:self.total].copy()
+        start = self.total % self.capacity
+        return np.roll(self.time, -start), np.roll(self.voltage, -start)
+
+
+class _LineParser:
+    """
+    Zerlegt einen Bytestrom in vollständige Zeilen "<Zeit>\\t<Spannung>" und hält
+    angefangene Zeilen bis zum nächsten Aufruf zurück.
+    """
+
+    def __init__(self):
+        self._rest = b""
+
+    def parse(self, data):
+        """
+        Args:
+            data (bytes): Neu gelesene Bytes.
+
+        Returns:
+            tuple: (Zeit in ms, Spannung) der vollständigen Zeilen.
+        """
+        data = self._rest + data
+        end = data.rfind(b"\n")
+        if end < 0:
+            self._rest = data
+            return np.empty(0), np.empty(0)
+        self._rest = data[end + 1:]
+        values = np.array(data[:end].split(), dtype=np.float64)
+        if len(values) % 2:
+            raise ValueError("Ungültige Zeile im Live-Datenstrom.")
+        values = values.reshape(-1, 2)
+        return values[:, 0], values[:, 1]
+
+
+class FileTailSource:
+    """
+    Liest neue Samples aus einer wachsenden Datei (wie ``tail -f``).
+    """
+
+    def __init__(self, path=DEFAULT_LIVE_FILE, from_start=False):
+        """
+        Args:
+            path (str): Pfad zur Datei, in die das Gerät (oder der Simulator) schreibt.
+            from_start (bool): Bereits vorhandene Daten mitlesen statt am Ende zu beginnen.
+        """
+        self.path = path
+        self._parser = _LineParser()
+        self._position = 0
+        if not from_start and os.path.exists(path):
+            self._position = os.path.getsize(path)
+
+    def read(self):
+        """
+        Liest alle seit dem letzten Aufruf hinzugekommenen Samples.
+
+        Returns:
+            tuple: (Zeit in ms, Spannung)
+        """
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return np.empty(0), np.empty(0)
+        if size < self._position:
+            # Datei wurde neu angelegt (z.B. Simulator neu gestartet)
+            self._position = 0
+            self._parser = _LineParser()
+        if size == self._position:
+            return np.empty(0), np.empty(0)
+        with open(self.path, "rb") as f:
+            f.seek(self._position)
+            data = f.read(size - self._position)
+        self._position += len(data)
+        return self._parser.parse(data)
+
+    def close(self):
+        """
+        Nichts zu schließen (Datei wird pro Lesevorgang geöffnet).
+        """
+
+
+class SocketSource:
+    """
+    Liest Samples von einem lokalen TCP-Socket (z.B. dem Simulator).
+    """
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, timeout=2.0):
+        """
+        Args:
+            host (str): Adresse des Geräts.
+            port (int): Port.
+            timeout (float): Timeout für den Verbindungsaufbau in Sekunden.
+        """
+        self._parser = _LineParser()
+        self._socket = socket.create_connection((host, port), timeout=timeout)
+        self._socket.setblocking(False)
+
+    def read(self):
+        """
+        Liest alle aktuell verfügbaren Samples, ohne zu blockieren.
+
+        Returns:
+            tuple: (Zeit in ms, Spannung)
+        """
+        blocks = []
+        while True:
+            try:
+                data = self._socket.recv(1 << 16)
+            except (BlockingIOError, InterruptedError):
+                break
+            if not data:
+                raise ConnectionError("Die Verbindung zum Gerät wurde beendet.")
+            blocks.append(data)
+        return self._parser.parse(b"".join(blocks))
+
+    def close(self):
+        """
+        Schließt die Verbindung.
+        """
+        self._socket.close()
+
+
+class LiveMonitor:
+    """
+    Verarbeitet einen Live-Datenstrom: neue Samples landen im Ringpuffer, Peaks
+    werden pro Block inkrementell erkannt (StreamingPeakDetector) und die gleitende
+    Herzfrequenz wird aus den letzten Schlägen berechnet. Bereits verarbeitete
+    Daten werden nie erneut analysiert.
+    """
+
+    def __init__(self, source, window_s=DEFAULT_WINDOW_S, sample_rate=DEFAULT_SAMPLE_RATE_HZ,
+                 threshold=DEFAULT_PEAK_PARAMS["txt"]["threshold"],
+                 min_distance_ms=DEFAULT_PEAK_PARAMS["txt"]["min_distance_ms"], bpm_window_s=DEFAULT_BPM_WINDOW_S):
+        """
+        Args:
+            source (FileTailSource | SocketSource): Datenquelle.
+            window_s (float): Länge des Ringpuffers in Sekunden.
+            sample_rate (float): Erwartete Abtastrate in Hz.
+            threshold (float): Schwellwert der Peak-Erkennung.
+            min_distance_ms (float): Minimaler Peak-Abstand in ms.
+            bpm_window_s (float): Zeitfenster der gleitenden Herzfrequenz in Sekunden.
+        """
+        self.source = source
+        self.buffer = RingBuffer(window_s * sample_rate)
+        self.detector = StreamingPeakDetector(threshold, min_distance_ms, keep_peaks=False)
+        self.bpm_window_ms = bpm_window_s * 1000
+        # Peaks der letzten Minuten als (Zeitpunkt, Spannung); ältere werden verworfen
+        self.peak_times = collections.deque(maxlen=1000)
+        self.peak_voltages = collections.deque(maxlen=1000)
+        self._undisplayed = []  # Peaks, die noch nicht angezeigt wurden
+        self.latencies_ms = collections.deque(maxlen=200)
+
+    def poll(self):
+        """
+        Holt neue Samples von der Quelle und verarbeitet nur diesen Block.
+
+        Returns:
+            int: Anzahl der neuen Samples.
+        """
+        time_block, voltage_block = self.source.read()
+        if len(voltage_block) == 0:
+            return 0
+        _, new_times = self.detector.feed(time_block, voltage_block)
+        if len(new_times):
+            positions = np.searchsorted(time_block, new_times)
+            new_voltages = voltage_block[np.minimum(positions, len(voltage_block) - 1)]
+            # Peaks aus den zwei Samples des Vorgängerblocks liegen nicht in time_block
+            from_tail = new_times < time_block[0]
+            if np.any(from_tail):
+                tail_time, tail_voltage = self.buffer.snapshot()
+                tail_positions = np.searchsorted(tail_time, new_times[from_tail])
+                new_voltages[from_tail] = tail_voltage[np.minimum(tail_positions, len(tail_voltage) - 1)]
+            self.peak_times.extend(new_times.tolist())
+            self.peak_voltages.extend(new_voltages.tolist())
+            self._undisplayed.extend(new_times.tolist())
+        self.buffer.append(time_block, voltage_block)
+        return len(voltage_block)
+
+    def rolling_bpm(self):
+        """
+        Herzfrequenz aus den Schlägen der letzten bpm_window_s Sekunden.
+
+        Returns:
+            float: Herzfrequenz in bpm (0, wenn zu wenige Schläge vorliegen).
+        """
+        if len(self.peak_times) < 2:
+            return 0.0
+        times = np.fromiter(self.peak_times, dtype=np.float64)
+        recent = times[times >= times[-1] - self.bpm_window_ms]
+        if len(recent) < 2 or recent[-1] <= recent[0]:
+            return 0.0
+        return 60000 * (len(recent) - 1) / (recent[-1] - recent[0])
+
+    def visible_peaks(self):
+        """
+        Peaks, die im aktuellen Pufferfenster liegen.
+
+        Returns:
+            tuple: (Zeitpunkte in ms, Spannungen)
+        """
+        if not self.peak_times or len(self.buffer) == 0:
+            return np.empty(0), np.empty(0)
+        times = np.fromiter(self.peak_times, dtype=np.float64)
+        voltages = np.fromiter(self.peak_voltages, dtype=np.float64)
+        oldest = self.buffer.time[self.buffer.total % self.buffer.capacity] \
+            if self.buffer.total > self.buffer.capacity else self.buffer.time[0]
+        visible = times >= oldest
+        return times[visible], voltages[visible]
+
+    def mark_displayed(self, displayed_at_ms=None):
+        """
+        Misst für alle neu angezeigten Peaks die Latenz von der Aufnahme des Samples
+        bis zur Anzeige.
+
+        Args:
+            displayed_at_ms (float): Zeitpunkt der Anzeige (Standard: jetzt).
+        """
+        displayed_at_ms = now_ms() if displayed_at_ms is None else displayed_at_ms
+        for peak_time in self._undisplayed:
+            self.latencies_ms.append(displayed_at_ms - peak_time)
+        self._undisplayed = []
+
+    def latency_stats(self):
+        """
+        Kennzahlen der gemessenen Latenzen.
+
+        Returns:
+            dict: Median, 95. Perzentil und Maximum in ms (None ohne Messwerte).
+        """
+        if not self.latencies_ms:
+            return None
+        values = np.fromiter(self.latencies_ms, dtype=np.float64)
+        return {
+            "median_ms": float(np.median(values)),
+            "p95_ms": float(np.percentile(values, 95)),
+            "max_ms": float(values.max()),
+        }
+
+    def close(self):
+        """
+        Schließt die Datenquelle.
+        """
+        self.source.close()
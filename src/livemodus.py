@@ -0,0 +1,111 @@
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+from src.live import DEFAULT_LIVE_FILE, DEFAULT_PORT, FileTailSource, LiveMonitor, SocketSource
+
+
+def _stop_monitor():
+    """
+    Beendet die laufende Live-Aufnahme der Session.
+    """
+    monitor = st.session_state.pop("live_monitor", None)
+    if monitor is not None:
+        monitor.close()
+
+
+def _render_live_view():
+    """
+    Aktualisiert die Live-Ansicht. Wird als Fragment periodisch neu ausgeführt und
+    verarbeitet dabei nur die seit dem letzten Durchlauf eingetroffenen Samples.
+    """
+    monitor = st.session_state.get("live_monitor")
+    if monitor is None:
+        return
+    try:
+        monitor.poll()
+    except (OSError, ValueError) as e:
+        st.error(f"Fehler beim Lesen der Live-Daten: {e}")
+        return
+
+    time_ms, voltage = monitor.buffer.snapshot()
+    if len(time_ms) == 0:
+        st.info("Warte auf Daten ... (läuft der Simulator?)")
+        return
+    latest = time_ms[-1]
+    peak_times, peak_voltages = monitor.visible_peaks()
+
+    df_live = pd.DataFrame({'Time in s': (time_ms - latest) / 1000, 'Voltage in mV': voltage})
+    fig = px.line(df_live, x='Time in s', y='Voltage in mV', title="Live-EKG")
+    fig.add_scatter(
+        x=(peak_times - latest) / 1000,
+        y=peak_voltages,
+        mode='markers',
+        name='Peaks',
+        marker=dict(color='red', size=8)
+    )
+    fig.update_layout(xaxis_title="Zeit relativ zum neuesten Sample in s", yaxis_title="Voltage in mV")
+    st.plotly_chart(fig, use_container_width=True, key="live_plot")
+    monitor.mark_displayed()
+
+    col_bpm, col_peaks, col_latency = st.columns(3)
+    col_bpm.metric("Herzfrequenz (gleitend)", f"{monitor.rolling_bpm():.0f} bpm")
+    col_peaks.metric("Erkannte Schläge", monitor.detector.num_peaks)
+    stats = monitor.latency_stats()
+    col_latency.metric("Latenz Sample → Anzeige", f"{stats['median_ms']:.0f} ms" if stats else "–")
+    if stats:
+        st.caption(f"Latenz: Median {stats['median_ms']:.0f} ms, 95 % {stats['p95_ms']:.0f} ms, "
+                   f"Maximum {stats['max_ms']:.0f} ms · {monitor.buffer.total} Samples empfangen")
+
+
+def show_live_page():
+    """
+    Zeigt die Live-Ansicht eines laufend aufgezeichneten EKGs (Datei oder Socket).
+    """
+    st.markdown("""
+        <style>
+        .main { background-color: #f8f9fa; }
+        .big-title {
+            font-size: 2em;
+            font-weight: bold;
+            color: #1f77b4;
+            margin-bottom: 0.2em;
+        }
+        .subtitle {
+            font-size: 1.1em;
+            color: #333;
+            margin-bottom: 1.2em;
+        }
+        </style>
+    """, unsafe_allow_html=True)
+
+    st.markdown('<div class="big-title">📡 Live-Modus</div>', unsafe_allow_html=True)
+    st.markdown('<div class="subtitle">Verfolgen Sie ein EKG während der Aufnahme. Zum Testen kann der '
+                'Simulator mit <code>python -m src.simulator --file</code> oder '
+                '<code>python -m src.simulator --port 5555</code> gestartet werden.</div>',
+                unsafe_allow_html=True)
+    st.write("---")
+
+    running = "live_monitor" in st.session_state
+    source_type = st.radio("Quelle", ["Datei", "Socket"], horizontal=True, key="live_source", disabled=running)
+    if source_type == "Datei":
+        path = st.text_input("Datei", value=DEFAULT_LIVE_FILE, key="live_path", disabled=running)
+    else:
+        port = st.number_input("Port", value=DEFAULT_PORT, min_value=1, max_value=65535, step=1,
+                               key="live_port", disabled=running)
+    refresh_s = st.slider("Aktualisierung alle (s)", min_value=0.1, max_value=2.0, value=0.5, step=0.1,
+                          key="live_refresh")
+
+    if not running:
+        if st.button("▶️ Live-Aufnahme starten"):
+            try:
+                source = FileTailSource(path) if source_type == "Datei" else SocketSource(port=int(port))
+                st.session_state.live_monitor = LiveMonitor(source)
+                st.rerun()
+            except OSError as e:
+                st.error(f"Verbindung fehlgeschlagen: {e}")
+    else:
+        st.button("⏹️ Live-Aufnahme beenden", on_click=_stop_monitor)
+        st.fragment(_render_live_view, run_every=refresh_s)()
+
+    st.write("---")
+    st.button("Zurück zur Startseite", on_click=lambda: (_stop_monitor(), st.session_state.update(state="start")))
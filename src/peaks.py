@@ -0,0 +1,109 @@
+import numpy as np
+
+# Kennung der Peak-Erkennung für gespeicherte Ergebnisse (siehe resultstore).
+# DETECTOR_VERSION erhöhen, wenn sich das Verfahren ändert.
+DETECTOR_NAME = "threshold"
+DETECTOR_VERSION = 1
+# Standardparameter je Dateityp: TXT-Rohwerte bzw. CSV-Werte im mV-Bereich
+DEFAULT_PEAK_PARAMS = {
+    "txt": {"threshold": 350, "min_distance_ms": 400},
+    "csv": {"threshold": 0.3, "min_distance_ms": 400},
+}
+
+
+def default_peak_params(filetype):
+    """
+    Standardparameter der Peak-Erkennung für einen Dateityp (TXT, falls unbekannt).
+
+    Args:
+        filetype (str): "txt" oder "csv".
+
+    Returns:
+        dict: threshold und min_distance_ms.
+    """
+    return dict(DEFAULT_PEAK_PARAMS.get(filetype, DEFAULT_PEAK_PARAMS["txt"]))
+
+
+def find_candidates(voltage, threshold, strict=False):
+    """
+    Findet alle lokalen Maxima oberhalb des Schwellwerts (vektorisiert).
+
+    Args:
+        voltage (np.ndarray): EKG-Signal.
+        threshold (float): Schwellwert, der überschritten werden muss.
+        strict (bool): True verlangt echte Maxima (> beide Nachbarn),
+            False lässt Plateaus zu (>= beide Nachbarn).
+
+    Returns:
+        np.ndarray: Indizes der Kandidaten, aufsteigend sortiert.
+    """
+    v = np.asarray(voltage)
+    if len(v) < 3:
+        return np.empty(0, dtype=np.intp)
+    mid = v[1:-1]
+    if strict:
+        mask = (mid > v[:-2]) & (mid > v[2:])
+    else:
+        mask = (mid >= v[:-2]) & (mid >= v[2:])
+    mask &= mid > threshold
+    return np.flatnonzero(mask) + 1
+
+
+def suppress_close(positions, min_distance):
+    """
+    Wählt gierig Kandidaten aus, die mindestens min_distance Abstand zum zuletzt
+    akzeptierten Kandidaten haben.
+
+    Statt jeden Kandidaten einzeln zu prüfen, springt die Suche per binärer Suche
+    direkt zum nächsten zulässigen Kandidaten. Die Schleife läuft damit nur
+    einmal pro akzeptiertem Peak.
+
+    Args:
+        positions (np.ndarray): Aufsteigend sortierte Positionen (Zeit oder Index).
+        min_distance (float): Minimaler Abstand in der Einheit von positions.
+
+    Returns:
+        np.ndarray: Indizes in positions der akzeptierten Kandidaten.
+    """
+    positions = np.asarray(positions)
+    n = len(positions)
+    if n == 0:
+        return np.empty(0, dtype=np.intp)
+    # Schneller Pfad: alle Kandidaten liegen ohnehin weit genug auseinander
+    if n == 1 or np.all(np.diff(positions) >= min_distance):
+        return np.arange(n)
+
+    keep = []
+    j = 0
+    while j < n:
+        keep.append(j)
+        last = positions[j]
+        k = int(np.searchsorted(positions, last + min_distance, side="left"))
+        # Rundungsfehler von last + min_distance ausgleichen, damit exakt
+        # dieselbe Bedingung wie "positions[k] - last >= min_distance" gilt
+        while k > j + 1 and positions[k - 1] - last >= min_distance:
+            k -= 1
+        while k < n and positions[k] - last < min_distance:
+            k += 1
+        j = max(k, j + 1)
+    return np.asarray(keep, dtype=np.intp)
+
+
+def detect_peaks(voltage, threshold, min_distance, time=None, strict=False):
+    """
+    Gemeinsame, vektorisierte Peak-Erkennung für alle Dateitypen.
+
+    Args:
+        voltage (np.ndarray): EKG-Signal.
+        threshold (float): Schwellwert für die Peak-Erkennung.
+        min_distance (float): Minimaler Peak-Abstand. In ms, wenn time angegeben
+            ist, sonst in Samples.
+        time (np.ndarray): Optionale, monoton steigende Zeitachse in ms.
+        strict (bool): Siehe find_candidates.
+
+    Returns:
+        np.ndarray: Indizes der gefundenen Peaks.
+    """
+    candidates = find_candidates(voltage, threshold, strict=strict)
+    positions = candidates if time is None else np.asarray(time)[candidates]
+    return candidates[suppress_close(positions, min_distance)]
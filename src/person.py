@@ -20,6 +20,30 @@ class Person:
         self.picture_path = person_dict.get('picture_path')
         self.fixed = person_dict.get('fixed', False)  # <--- NEU
         self.ekg_tests = [
-            EKGTest(test['id'], test['date'], test['result_link'])
+            EKGTest(test['id'], test['date'], test['result_link'], test.get('diagnosis'))
             for test in person_dict.get('ekg_tests', [])
-        ]
\ No newline at end of file
+        ]
+
+    @property
+    def name(self):
+        """
+        Anzeigename im Format "Vorname Nachname".
+        """
+        return f"{self.firstname} {self.lastname}"
+
+    def to_dict(self):
+        """
+        Serialisiert die Person samt EKG-Tests im Format der Personen-Datenbank.
+
+        Returns:
+            dict: Personendaten.
+        """
+        return {
+            "id": self.id,
+            "firstname": self.firstname,
+            "lastname": self.lastname,
+            "date_of_birth": self.date_of_birth,
+            "picture_path": self.picture_path,
+            "ekg_tests": [t.to_dict() for t in self.ekg_tests],
+            "fixed": self.fixed
+        }
\ No newline at end of file
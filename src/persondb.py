@@ -1,19 +1,183 @@
-
+import threading
 from src.person import Person
+from src.ekg import EKGTest
+
+
+def _numeric_id(value):
+    """
+    Wandelt eine ID in eine Zahl um, falls sie numerisch ist, sonst None.
+    """
+    text = str(value)
+    return int(text) if text.isdigit() else None
+
+
+def _name_of(entry):
+    """
+    Anzeigename einer Person, egal ob sie schon als Person-Objekt erzeugt wurde.
+    """
+    if isinstance(entry, dict):
+        return f"{entry['firstname']} {entry['lastname']}"
+    return entry.name
+
+
+def _fixed_of(entry):
+    """
+    True, wenn eine Person fixiert ist, egal ob sie schon als Person-Objekt erzeugt wurde.
+    """
+    if isinstance(entry, dict):
+        return bool(entry.get("fixed", False))
+    return bool(getattr(entry, "fixed", False))
+
+
+def _tests_of(entry):
+    """
+    Test-IDs einer Person, egal ob sie schon als Person-Objekt erzeugt wurde.
+    """
+    if isinstance(entry, dict):
+        return [test["id"] for test in entry.get("ekg_tests", [])]
+    return [test.test_id for test in entry.ekg_tests]
+
 
 class PersonDB:
     """
     Datenbank-Klasse für die Verwaltung mehrerer Personen und deren EKG-Tests.
+
+    Personen und Tests sind über Hash-Indizes nach ID und Anzeigename erreichbar.
+    Person- und EKGTest-Objekte werden erst beim ersten Zugriff erzeugt; bis dahin
+    liegen nur die Rohdaten vor. Änderungen werden vorgemerkt und erst mit save()
+    in einem Schritt gespeichert. Alle Zugriffe sind threadsicher, da eine Instanz
+    von allen Sessions geteilt wird (siehe get_shared_person_db).
     """
 
-    def __init__(self, persons_list):
+    def __init__(self, persons_list, store=None):
         """
         Initialisiert die PersonDB mit einer Liste von Personen.
 
         Args:
             persons_list (list): Liste von Dictionaries mit Personendaten.
+            store (JSONPersonStore | SQLitePersonStore): Speicher für save() (optional).
+        """
+        self.store = store
+        self.stat_key = None  # Stand des Speichers, aus dem die Daten stammen
+        self.content_hash = None
+        self._lock = threading.RLock()
+        self._entries = {}  # Personen-ID -> Rohdaten (dict) oder Person
+        self._by_name = {}  # Anzeigename -> Liste von Personen-IDs
+        self._tests = {}  # Test-ID -> Personen-ID
+        self._next_person_id = 1
+        self._next_test_id = 1
+        self._structure_dirty = False
+        self._dirty_diagnoses = set()
+        self.revision = 0  # Wird bei jeder Änderung an Personen oder Tests erhöht
+        for p in persons_list:
+            self._index_person(p)
+
+    @classmethod
+    def from_store(cls, store):
+        """
+        Lädt die PersonDB aus einem Speicher-Backend.
+
+        Args:
+            store (JSONPersonStore | SQLitePersonStore): Das Backend.
+
+        Returns:
+            PersonDB: Die geladene Datenbank.
+        """
+        return cls(store.load(), store=store)
+
+    @property
+    def persons(self):
+        """
+        Alle Personen in Einfügereihenfolge.
+
+        Returns:
+            list: Liste der Person-Objekte.
+        """
+        with self._lock:
+            return [self._person(person_id) for person_id in self._entries]
+
+    @property
+    def is_dirty(self):
+        """
+        True, wenn es ungespeicherte Änderungen gibt.
+        """
+        return self._structure_dirty or bool(self._dirty_diagnoses)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _person(self, person_id):
+        """
+        Liefert das Person-Objekt zu einer ID und erzeugt es beim ersten Zugriff.
+        """
+        entry = self._entries[person_id]
+        if isinstance(entry, dict):
+            entry = Person(entry)
+            self._entries[person_id] = entry
+        return entry
+
+    def _index_person(self, entry):
+        """
+        Nimmt eine Person (Rohdaten oder Person-Objekt) in alle Indizes auf und
+        aktualisiert die nächsten freien IDs.
         """
-        self.persons = [Person(p) for p in persons_list]
+        person_id = str(entry["id"] if isinstance(entry, dict) else entry.id)
+        self._entries[person_id] = entry
+        self._by_name.setdefault(_name_of(entry), []).append(person_id)
+        person_number = _numeric_id(person_id)
+        if person_number is not None:
+            self._next_person_id = max(self._next_person_id, person_number + 1)
+        for test_id in _tests_of(entry):
+            self._index_test(person_id, test_id)
+
+    def _index_test(self, person_id, test_id):
+        """
+        Nimmt einen Test in den Test-Index auf.
+        """
+        self._tests[str(test_id)] = person_id
+        test_number = _numeric_id(test_id)
+        if test_number is not None:
+            self._next_test_id = max(self._next_test_id, test_number + 1)
+
+    def _find_test(self, test_id):
+        """
+        Liefert (Person, EKGTest) zu einer Test-ID oder (None, None).
+        """
+        person_id = self._tests.get(str(test_id))
+        if person_id is None:
+            return None, None
+        person = self._person(person_id)
+        test = next((t for t in person.ekg_tests if str(t.test_id) == str(test_id)), None)
+        return person, test
+
+    def test_records(self):
+        """
+        Alle Tests mit den Angaben ihrer Person als flache Datensätze, ohne
+        Person- oder EKGTest-Objekte zu erzeugen.
+
+        Returns:
+            list: Ein Dictionary pro Test (test_id, person_id, person,
+                date_of_birth, date, result_link).
+        """
+        with self._lock:
+            records = []
+            for person_id, entry in self._entries.items():
+                if isinstance(entry, dict):
+                    date_of_birth = entry.get("date_of_birth")
+                    tests = [(t["id"], t.get("date"), t.get("result_link")) for t in entry.get("ekg_tests", [])]
+                else:
+                    date_of_birth = entry.date_of_birth
+                    tests = [(t.test_id, t.date, t.result_link) for t in entry.ekg_tests]
+                for test_id, date, result_link in tests:
+                    records.append({
+                        "test_id": str(test_id),
+                        "person_id": person_id,
+                        "person": _name_of(entry),
+                        "date_of_birth": date_of_birth,
+                        "date": date,
+                        "result_link": result_link,
+                    })
+            return records
 
     def get_names(self):
         """
@@ -22,7 +186,19 @@ class PersonDB:
         Returns:
             list: Liste der Namen.
         """
-        return [f"{p.firstname} {p.lastname}" for p in self.persons]
+        with self._lock:
+            return [_name_of(entry) for entry in self._entries.values()]
+
+    def get_deletable_names(self):
+        """
+        Namen aller nicht fixierten Personen nach ID, ohne Person-Objekte zu erzeugen.
+
+        Returns:
+            dict: Personen-ID -> Name (Vorname Nachname).
+        """
+        with self._lock:
+            return {person_id: _name_of(entry) for person_id, entry in self._entries.items()
+                    if not _fixed_of(entry)}
 
     def get_person_by_name(self, name):
         """
@@ -34,7 +210,9 @@ class PersonDB:
         Returns:
             Person: Das gefundene Person-Objekt oder None.
         """
-        return next((p for p in self.persons if f"{p.firstname} {p.lastname}" == name), None)
+        with self._lock:
+            matches = self._by_name.get(name)
+            return self._person(matches[0]) if matches else None
 
     def get_person_by_id(self, person_id):
         """
@@ -46,4 +224,192 @@ class PersonDB:
         Returns:
             Person: Das gefundene Person-Objekt oder None.
         """
-        return next((p for p in self.persons if p.id == person_id), None)
\ No newline at end of file
+        with self._lock:
+            if str(person_id) not in self._entries:
+                return None
+            return self._person(str(person_id))
+
+    def get_test(self, test_id):
+        """
+        Sucht einen EKG-Test anhand seiner ID.
+
+        Args:
+            test_id (str): Die Test-ID.
+
+        Returns:
+            EKGTest: Der gefundene Test oder None.
+        """
+        with self._lock:
+            return self._find_test(test_id)[1]
+
+    def add_person(self, firstname, lastname, date_of_birth, picture_path="", fixed=False):
+        """
+        Legt eine neue Person mit der nächsten freien ID an.
+
+        Args:
+            firstname (str): Vorname.
+            lastname (str): Nachname.
+            date_of_birth (str): Geburtsjahr.
+            picture_path (str): Pfad zum Bild.
+            fixed (bool): Fixierte Personen können nicht gelöscht werden.
+
+        Returns:
+            Person: Die neue Person.
+        """
+        with self._lock:
+            person = Person({
+                "id": str(self._next_person_id),
+                "firstname": firstname,
+                "lastname": lastname,
+                "date_of_birth": date_of_birth,
+                "picture_path": picture_path,
+                "ekg_tests": [],
+                "fixed": fixed
+            })
+            self._index_person(person)
+            self._structure_dirty = True
+            self.revision += 1
+            return person
+
+    def remove_person(self, person_id):
+        """
+        Entfernt eine Person samt ihrer Tests.
+
+        Args:
+            person_id (str): ID der Person.
+
+        Returns:
+            Person: Die entfernte Person oder None.
+        """
+        with self._lock:
+            if str(person_id) not in self._entries:
+                return None
+            person = self._person(str(person_id))
+            del self._entries[str(person_id)]
+            same_name = self._by_name.get(person.name, [])
+            if str(person_id) in same_name:
+                same_name.remove(str(person_id))
+            if not same_name:
+                self._by_name.pop(person.name, None)
+            for test in person.ekg_tests:
+                self._tests.pop(str(test.test_id), None)
+                self._dirty_diagnoses.discard(str(test.test_id))
+            self._structure_dirty = True
+            self.revision += 1
+            return person
+
+    def add_test(self, person_id, date, result_link):
+        """
+        Fügt einer Person einen EKG-Test mit der nächsten freien Test-ID hinzu.
+
+        Args:
+            person_id (str): ID der Person.
+            date (str): Testdatum.
+            result_link (str): Pfad zur EKG-Datei.
+
+        Returns:
+            EKGTest: Der neue Test.
+        """
+        with self._lock:
+            person = self._person(str(person_id))
+            test = EKGTest(str(self._next_test_id), date, result_link)
+            person.ekg_tests.append(test)
+            self._index_test(str(person.id), test.test_id)
+            self._structure_dirty = True
+            self.revision += 1
+            return test
+
+    def set_diagnosis(self, test_id, diagnosis):
+        """
+        Setzt die Diagnose eines Tests und merkt sie zum Speichern vor.
+
+        Args:
+            test_id (str): ID des EKG-Tests.
+            diagnosis (str): Neue Diagnose (leer zum Löschen).
+        """
+        with self._lock:
+            _, test = self._find_test(test_id)
+            if test is None:
+                raise KeyError(test_id)
+            test.diagnosis = diagnosis
+            self._dirty_diagnoses.add(str(test_id))
+
+    def to_list(self):
+        """
+        Serialisiert die gesamte Datenbank im Format der JSON-Datei. Nicht
+        angefasste Personen werden unverändert aus den Rohdaten übernommen.
+
+        Returns:
+            list: Liste von Dictionaries mit Personendaten.
+        """
+        with self._lock:
+            return [entry if isinstance(entry, dict) else entry.to_dict() for entry in self._entries.values()]
+
+    def save(self):
+        """
+        Speichert vorgemerkte Änderungen. Strukturänderungen (Personen, Tests)
+        schreiben die Datenbank einmal vollständig; reine Diagnoseänderungen
+        werden einzeln über den Speicher geschrieben.
+
+        Returns:
+            bool: True, wenn etwas geschrieben wurde.
+        """
+        with self._lock:
+            if not self.is_dirty:
+                return False
+            if self.store is None:
+                raise ValueError("PersonDB hat keinen Speicher zum Sichern.")
+            if self._structure_dirty:
+                self.store.save(self.to_list())
+            else:
+                for test_id in self._dirty_diagnoses:
+                    person, test = self._find_test(test_id)
+                    self.store.set_diagnosis(person.id, test.test_id, test.diagnosis or "")
+            self._structure_dirty = False
+            self._dirty_diagnoses.clear()
+            # Eigene Änderungen sollen kein erneutes Laden auslösen
+            if hasattr(self.store, "stat_key"):
+                self.stat_key = self.store.stat_key()
+                self.content_hash = self.store.content_hash()
+            return True
+
+
+_shared_dbs = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_person_db(store=None):
+    """
+    Liefert die prozessweit geteilte PersonDB eines Speichers. Sie wird nur neu
+    geladen, wenn sich Änderungszeit oder Größe der Datei geändert haben und der
+    Inhalt tatsächlich ein anderer ist (Hash-Vergleich). Im Normalfall kostet ein
+    Streamlit-Durchlauf damit nur einen stat-Aufruf.
+
+    Args:
+        store (JSONPersonStore | SQLitePersonStore): Speicher (Standard: storage.get_store()).
+
+    Returns:
+        PersonDB: Die geteilte Datenbank.
+    """
+    if store is None:
+        from src.storage import get_store
+        store = get_store()
+    with _shared_lock:
+        db = _shared_dbs.get(id(store))
+        stat_key = store.stat_key()
+        if db is not None and db.store is store:
+            if db.stat_key == stat_key:
+                return db
+            content_hash = store.content_hash()
+            if db.content_hash == content_hash:
+                db.stat_key = stat_key
+                return db
+        else:
+            content_hash = store.content_hash()
+        # Stand vor dem Laden merken: Ändert sich die Datei währenddessen, wird beim
+        # nächsten Aufruf erneut geladen
+        db = PersonDB.from_store(store)
+        db.stat_key = stat_key
+        db.content_hash = content_hash
+        _shared_dbs[id(store)] = db
+        return db
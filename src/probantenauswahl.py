@@ -1,8 +1,8 @@
 import streamlit as st
-import json
-import io
 import os
-from src.persondb import PersonDB
+from src.recordingindex import recording_index
+from src.thumbnails import get_thumbnail
+from src.exportcache import FORMATS, export_cache, export_params, lean_export_source, png_available
 import numpy as np
 
 def show_probantenauswahl(person_db):
@@ -53,7 +53,7 @@ def show_probantenauswahl(person_db):
     st.markdown('<div class="subtitle">Wählen Sie einen Probanten aus und sehen Sie sich die EKG-Tests an.</div>', unsafe_allow_html=True)
 
     st.write("---")
-    if not person_db.persons:
+    if len(person_db) == 0:
         st.warning("Keine Probanten verfügbar.")
         return
 
@@ -67,7 +67,8 @@ def show_probantenauswahl(person_db):
             if person.picture_path:
                 image_path = os.path.normpath(person.picture_path)
                 if os.path.exists(image_path):
-                    st.image(image_path, caption="Probantenbild", width=150)
+                    # Verkleinertes Vorschaubild statt des Originals ausliefern
+                    st.image(get_thumbnail(image_path), caption="Probantenbild", width=150)
                 else:
                     st.warning(f"⚠️ Bild nicht gefunden: {image_path}")
         with col2:
@@ -76,16 +77,19 @@ def show_probantenauswahl(person_db):
             st.markdown(f"**Geburtsjahr:** {person.date_of_birth}")
             st.markdown("### EKG-Tests:")
             for ekg_test in person.ekg_tests:
+                # Dauer aus dem Metadaten-Index, ohne das Signal zu laden; fehlende
+                # Einträge werden im Hintergrund berechnet, statt die Seite zu blockieren
                 try:
-                    ekg_test.load_data()
-                    ms = ekg_test.time[-1] - ekg_test.time[0]
-                    minuten = ms / 1000 / 60
+                    entry = recording_index.get(ekg_test, wait=False)
+                    minuten = entry["duration_min"] if entry else None
                 except Exception:
                     minuten = None
 
                 button_label = f"Ergebnis anzeigen (ID: {ekg_test.test_id}) - {ekg_test.date}"
                 if minuten is not None:
                     button_label += f" | Dauer: {minuten:.1f} min"
+                elif recording_index.is_pending(ekg_test.result_link):
+                    button_label += " | Dauer: wird berechnet"
                 else:
                     button_label += " | Dauer: unbekannt"
 
@@ -134,22 +138,13 @@ def show_plot_page(person_db):
         st.warning("Kein Test ausgewählt.")
         return
 
-    # Diagnose immer aus JSON laden, damit sie aktuell ist
-    with open("data/person_db.json", "r", encoding="utf-8") as f:
-        persons_list = json.load(f)
-
-    diagnosis = ""
-    for p in persons_list:
-        if str(p["id"]) == str(person_id):
-            for test in p.get("ekg_tests", []):
-                if str(test["id"]) == str(ekg_id):
-                    diagnosis = test.get("diagnosis", "")
-
-    person = person_db.get_person_by_id(person_id)
-    ekg_test = next((e for e in person.ekg_tests if str(e.test_id) == str(ekg_id)), None)
+    ekg_test = person_db.get_test(ekg_id)
     if not ekg_test:
         st.warning("Kein EKG gefunden.")
         return
+    # Eigene Kopie analysieren, der Test der geteilten PersonDB bleibt ohne Signal
+    ekg_test = ekg_test.copy()
+    diagnosis = ekg_test.diagnosis or ""
 
     st.markdown(f"**Test-ID:** {ekg_test.test_id}")
     st.markdown(f"**Datum:** {ekg_test.date}")
@@ -160,15 +155,40 @@ def show_plot_page(person_db):
         st.markdown(f"**Anzahl der Peaks:** {num_peaks}")
         st.markdown(f"**Herzfrequenz:** {int(round(bpm))} bpm")
 
-        # Download-Button für den Plot als PNG
-        buf = io.StringIO()
-        fig.write_html(buf)
-        st.download_button(
-            label="Plot als HTML herunterladen",
-            data=buf.getvalue(),
-            file_name=f"ekg_plot_{ekg_test.test_id}.html",
-            mime="text/html"
+        hrv = ekg_test.hrv()
+        st.markdown(
+            f"**HRV:** SDNN {hrv['sdnn_ms']:.1f} ms · RMSSD {hrv['rmssd_ms']:.1f} ms · "
+            f"pNN50 {hrv['pnn50']:.1f} %"
         )
+        st.plotly_chart(ekg_test.plot_heart_rate(), use_container_width=True)
+        fig_beat = ekg_test.plot_beat_template()
+        if fig_beat is not None:
+            st.plotly_chart(fig_beat, use_container_width=True)
+
+        # Exporte erst auf Anforderung erzeugen und auf der Platte cachen. Der Download
+        # bekommt fertige Bytes, da Streamlit 1.45 keine Funktionen als data annimmt.
+        params = export_params(ekg_test, fig)
+        formats = {"HTML": "html", f"Schlanke HTML (plotly.js von {lean_export_source()})": "html_lean"}
+        if png_available():
+            formats["PNG"] = "png"
+        col_format, col_prepare = st.columns([3, 1])
+        with col_format:
+            fmt = formats[st.selectbox("Exportformat", list(formats), key=f"export_format_{ekg_id}")]
+        with col_prepare:
+            if st.button("Export vorbereiten", key=f"export_prepare_{ekg_id}"):
+                st.session_state[f"export_{ekg_id}"] = (fmt, params)
+        if st.session_state.get(f"export_{ekg_id}") == (fmt, params):
+            extension, mime = FORMATS[fmt]
+            suffix = "_lean" if fmt == "html_lean" else ""
+            st.download_button(
+                label=f"Plot als {extension.upper()} herunterladen",
+                data=export_cache.get(fig, params, fmt),
+                file_name=f"ekg_plot_{ekg_test.test_id}{suffix}.{extension}",
+                mime=mime,
+                on_click="ignore"
+            )
+        if not png_available():
+            st.caption("PNG-Export benötigt das Paket kaleido.")
 
     except Exception as e:
         st.error(f"Fehler beim Laden oder Plotten der EKG-Daten: {e}")
@@ -184,14 +204,8 @@ def show_plot_page(person_db):
     )
 
     if st.button("Diagnose speichern", key=f"save_diag_{ekg_id}"):
-        # Diagnose in JSON speichern
-        for p in persons_list:
-            if str(p["id"]) == str(person_id):
-                for test in p.get("ekg_tests", []):
-                    if str(test["id"]) == str(ekg_id):
-                        test["diagnosis"] = new_diagnosis
-        with open("data/person_db.json", "w", encoding="utf-8") as f:
-            json.dump(persons_list, f, ensure_ascii=False, indent=2)
+        person_db.set_diagnosis(ekg_id, new_diagnosis)
+        person_db.save()
         st.success("Diagnose gespeichert!")
         st.rerun()
 
@@ -204,14 +218,8 @@ def show_plot_page(person_db):
             unsafe_allow_html=True
         )
         if st.button("Diagnose löschen", key=f"del_diag_{ekg_id}"):
-            # Diagnose in JSON löschen
-            for p in persons_list:
-                if str(p["id"]) == str(person_id):
-                    for test in p.get("ekg_tests", []):
-                        if str(test["id"]) == str(ekg_id):
-                            test["diagnosis"] = ""
-            with open("data/person_db.json", "w", encoding="utf-8") as f:
-                json.dump(persons_list, f, ensure_ascii=False, indent=2)
+            person_db.set_diagnosis(ekg_id, "")
+            person_db.save()
             st.success("Diagnose gelöscht!")
             st.rerun()
 
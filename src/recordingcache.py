@@ -0,0 +1,198 @@
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+from src.signalcache import file_stat_key
+
+# Speicherbudget des prozessweiten Caches in MB
+DEFAULT_CACHE_MB = float(os.environ.get("EKG_CACHE_MB", "512"))
+
+
+def _nbytes(value):
+    """
+    Summiert die Größe aller NumPy-Arrays in einem Wert (auch in Listen, Tupeln und Dicts).
+    """
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_nbytes(v) for v in value)
+    return getattr(value, "nbytes", 0)
+
+
+class CachedRecording:
+    """
+    Geladene und analysierte Aufnahme im Cache: Signal, Peaks und abgeleitete Ergebnisse.
+    """
+
+    def __init__(self, time, voltage, peaks, filetype):
+        """
+        Initialisiert einen Cache-Eintrag.
+
+        Args:
+            time (np.ndarray): Zeitachse in ms.
+            voltage (np.ndarray): EKG-Signal.
+            peaks (np.ndarray): Indizes der Peaks.
+            filetype (str): Dateityp der Aufnahme.
+        """
+        self.time = time
+        self.voltage = voltage
+        self.peaks = peaks
+        self.filetype = filetype
+        self.derived = {}  # Abgeleitete Ergebnisse, z.B. Plot-Pyramide
+
+    @property
+    def nbytes(self):
+        """
+        Speicherbedarf des Eintrags in Bytes.
+        """
+        return _nbytes([self.time, self.voltage, self.peaks]) + _nbytes(self.derived)
+
+
+class RecordingCache:
+    """
+    Prozessweiter LRU-Cache für geladene und analysierte EKG-Aufnahmen.
+
+    Alle Streamlit-Sessions eines Serverprozesses teilen sich diesen Cache. Der
+    Schlüssel besteht aus Test-ID und Datei-Fingerabdruck (Pfad, mtime, Größe),
+    sodass geänderte Dateien automatisch neu geladen werden.
+    """
+
+    def __init__(self, max_mb=DEFAULT_CACHE_MB):
+        """
+        Initialisiert einen leeren Cache.
+
+        Args:
+            max_mb (float): Speicherbudget in MB.
+        """
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading = {}  # Schlüssel -> Lock, damit jede Aufnahme nur einmal geladen wird
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key_for(ekg_test):
+        """
+        Bildet den Cache-Schlüssel eines Tests.
+
+        Args:
+            ekg_test (EKGTest): Der Test.
+
+        Returns:
+            tuple: (Test-ID, Datei-Fingerabdruck)
+        """
+        return str(ekg_test.test_id), file_stat_key(ekg_test.result_link)
+
+    def _lookup(self, key):
+        """
+        Sucht einen Eintrag und markiert ihn als zuletzt verwendet.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _insert(self, key, entry):
+        """
+        Fügt einen Eintrag ein und verdrängt die am längsten unbenutzten Einträge.
+        """
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def _evict(self):
+        """
+        Verdrängt Einträge, bis das Speicherbudget eingehalten wird. Der neueste
+        Eintrag bleibt immer erhalten. Muss unter dem Lock aufgerufen werden.
+        """
+        total = sum(e.nbytes for e in self._entries.values())
+        while total > self.max_bytes and len(self._entries) > 1:
+            _, old = self._entries.popitem(last=False)
+            total -= old.nbytes
+            self.evictions += 1
+
+    def attach(self, ekg_test):
+        """
+        Versorgt einen Test mit Signal und Peaks aus dem Cache. Bei einem Fehlzugriff
+        wird die Aufnahme genau einmal geladen und analysiert, auch wenn mehrere
+        Sessions gleichzeitig danach fragen.
+
+        Args:
+            ekg_test (EKGTest): Der zu versorgende Test.
+
+        Returns:
+            CachedRecording: Der verwendete Cache-Eintrag.
+        """
+        key = self.key_for(ekg_test)
+        entry = self._lookup(key)
+        if entry is None:
+            with self._lock:
+                load_lock = self._loading.setdefault(key, threading.Lock())
+            with load_lock:
+                entry = self._lookup(key)
+                if entry is None:
+                    try:
+                        ekg_test.peaks = None
+                        ekg_test.load_data()
+                        peaks = ekg_test.get_peaks()
+                        entry = CachedRecording(ekg_test.time, ekg_test.voltage, peaks, ekg_test.filetype)
+                        self._insert(key, entry)
+                    finally:
+                        with self._lock:
+                            self._loading.pop(key, None)
+                    with self._lock:
+                        self.misses += 1
+                    ekg_test.derived = entry.derived
+                    return entry
+        with self._lock:
+            self.hits += 1
+        ekg_test.time = entry.time
+        ekg_test.voltage = entry.voltage
+        ekg_test.peaks = entry.peaks
+        ekg_test.filetype = entry.filetype
+        ekg_test.derived = entry.derived
+        return entry
+
+    def refresh(self):
+        """
+        Prüft das Speicherbudget erneut, z.B. nachdem abgeleitete Ergebnisse
+        zu einem Eintrag hinzugekommen sind.
+        """
+        with self._lock:
+            self._evict()
+
+    def stats(self):
+        """
+        Liefert die Zähler und die aktuelle Belegung des Caches.
+
+        Returns:
+            dict: Treffer, Fehlzugriffe, Verdrängungen, Einträge und Belegung in MB.
+        """
+        with self._lock:
+            used = sum(e.nbytes for e in self._entries.values())
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "used_mb": used / 1024 / 1024,
+                "max_mb": self.max_bytes / 1024 / 1024,
+            }
+
+    def clear(self):
+        """
+        Leert den Cache und setzt die Zähler zurück.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+# Gemeinsame Instanz für den ganzen Prozess (Module werden nur einmal importiert)
+recording_cache = RecordingCache()
@@ -0,0 +1,273 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from src.filelock import file_lock
+
+# Der Index liegt neben der Personen-Datenbank
+INDEX_PATH = "data/recording_index.json"
+ENTRY_VERSION = 2  # Erhöhen, wenn neue Felder hinzukommen; ältere Einträge werden neu berechnet
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """
+    Berechnet den SHA-256-Hash einer Datei blockweise.
+
+    Args:
+        path (str): Pfad zur Datei.
+        chunk_size (int): Blockgröße in Bytes.
+
+    Returns:
+        str: Hexadezimaler Hash.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _finite_or_none(value):
+    """
+    Wandelt NaN in None um, damit der Index gültiges JSON bleibt.
+    """
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+def _index_key(result_link):
+    """
+    Normalisiert einen Dateipfad zum Schlüssel im Index.
+    """
+    return os.path.normpath(result_link).replace("\\", "/")
+
+
+class RecordingIndex:
+    """
+    Metadaten-Index aller EKG-Aufnahmen (Länge, Abtastrate, Dauer, Wertebereich,
+    Datei-Hash, Herzfrequenz und HRV), damit Übersichtsseiten die Signaldateien
+    nicht laden müssen. Die geteilte Instanz recording_index wird von allen
+    Sessions des Serverprozesses verwendet.
+
+    Fehlende Einträge können im Hintergrund berechnet werden (get mit wait=False),
+    damit eine Seite nicht auf die Analyse wartet. Beim Speichern wird die Datei
+    unter einer Dateisperre neu eingelesen und mit den eigenen Änderungen
+    zusammengeführt, sodass sich mehrere Serverprozesse nicht gegenseitig
+    Einträge überschreiben.
+    """
+
+    def __init__(self, path=INDEX_PATH):
+        """
+        Lädt den Index aus der JSON-Datei, falls vorhanden.
+
+        Args:
+            path (str): Pfad zur Index-Datei.
+        """
+        self.path = path
+        self.entries = {}
+        self._lock = threading.RLock()
+        self._changed = set()  # Seit dem letzten Speichern geänderte Schlüssel
+        self._removed = set()  # Seit dem letzten Speichern entfernte Schlüssel
+        self._file_key = None  # (mtime_ns, Größe) der zuletzt eingelesenen Datei
+        self._pending = set()  # Schlüssel, die gerade im Hintergrund berechnet werden
+        self._executor = None
+        self.reload()
+
+    def _read_file(self):
+        """
+        Liest die Index-Datei.
+
+        Returns:
+            tuple: (Einträge, (mtime_ns, Größe)) bzw. ({}, None), wenn sie fehlt oder defekt ist.
+        """
+        try:
+            stat = os.stat(self.path)
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f), (stat.st_mtime_ns, stat.st_size)
+        except (OSError, ValueError):
+            return {}, None
+
+    def _merge(self, entries, file_key):
+        """
+        Übernimmt die Einträge der Datei; eigene ungespeicherte Änderungen und
+        Löschungen haben Vorrang. Muss unter dem Lock aufgerufen werden.
+        """
+        merged = {key: entry for key, entry in entries.items() if key not in self._removed}
+        for key in self._changed:
+            merged[key] = self.entries[key]
+        self.entries = merged
+        self._file_key = file_key
+
+    def reload(self):
+        """
+        Liest Einträge anderer Prozesse ein, wenn sich die Index-Datei seit dem
+        letzten Einlesen geändert hat.
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return
+        if self._file_key == (stat.st_mtime_ns, stat.st_size):
+            return
+        entries, file_key = self._read_file()
+        with self._lock:
+            self._merge(entries, file_key)
+
+    def save(self):
+        """
+        Führt die eigenen Änderungen mit dem aktuellen Stand der Datei zusammen und
+        schreibt den Index atomar zurück. Die Dateisperre verhindert, dass ein
+        anderer Prozess dazwischen speichert.
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with file_lock(f"{self.path}.lock"), self._lock:
+            self._merge(*self._read_file())
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+            stat = os.stat(self.path)
+            self._file_key = (stat.st_mtime_ns, stat.st_size)
+            self._changed.clear()
+            self._removed.clear()
+
+    def is_current(self, result_link):
+        """
+        Prüft, ob der Eintrag einer Aufnahme zur aktuellen Datei passt.
+
+        Args:
+            result_link (str): Pfad zur EKG-Datei.
+
+        Returns:
+            bool: True, wenn ein aktueller Eintrag existiert und Größe und Änderungszeit übereinstimmen.
+        """
+        entry = self.entries.get(_index_key(result_link))
+        if entry is None or entry.get("version", 1) < ENTRY_VERSION:
+            return False
+        try:
+            stat = os.stat(result_link)
+        except OSError:
+            return False
+        return entry.get("mtime_ns") == stat.st_mtime_ns and entry.get("size") == stat.st_size
+
+    def is_pending(self, result_link):
+        """
+        True, wenn der Eintrag einer Aufnahme gerade im Hintergrund berechnet wird.
+        """
+        return _index_key(result_link) in self._pending
+
+    def update(self, ekg_test, save=True):
+        """
+        Analysiert eine Aufnahme und legt ihren Eintrag neu an. Tests der geteilten
+        PersonDB als Kopie übergeben (EKGTest.copy), sonst behalten sie das Signal.
+
+        Args:
+            ekg_test (EKGTest): Der zu indizierende Test.
+            save (bool): Index direkt speichern.
+
+        Returns:
+            dict: Der neue Eintrag.
+        """
+        from src.resultstore import result_store
+
+        stat = os.stat(ekg_test.result_link)
+        if ekg_test.voltage is None or ekg_test.time is None:
+            ekg_test.load_data()
+        peaks = ekg_test.get_peaks()
+        hrv = ekg_test.hrv()
+        time = ekg_test.time
+        voltage = ekg_test.voltage
+        n_samples = int(len(voltage))
+        duration_ms = float(time[-1] - time[0]) if n_samples > 1 else 0.0
+        entry = {
+            "n_samples": n_samples,
+            "sample_rate_hz": ekg_test.sample_rate(),
+            "duration_min": duration_ms / 1000 / 60,
+            "voltage_min": float(np.min(voltage)) if n_samples else None,
+            "voltage_max": float(np.max(voltage)) if n_samples else None,
+            "filetype": ekg_test.filetype,
+            "sha256": result_store.content_hash(ekg_test.result_link),  # bereits beim Peak-Lookup gemerkt
+            "num_peaks": int(len(peaks)),
+            "bpm": float(ekg_test.bpm()),
+            "sdnn_ms": _finite_or_none(hrv["sdnn_ms"]),
+            "rmssd_ms": _finite_or_none(hrv["rmssd_ms"]),
+            "pnn50": _finite_or_none(hrv["pnn50"]),
+            "version": ENTRY_VERSION,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+        }
+        key = _index_key(ekg_test.result_link)
+        with self._lock:
+            self.entries[key] = entry
+            self._changed.add(key)
+            self._removed.discard(key)
+        if save:
+            self.save()
+        return entry
+
+    def _update_in_background(self, ekg_test, key):
+        """
+        Berechnet einen Eintrag im Hintergrund-Thread. Fehler werden ignoriert; die
+        Seite zeigt die Werte dann als unbekannt und versucht es beim nächsten Aufruf erneut.
+        """
+        try:
+            self.update(ekg_test)
+        except Exception:
+            pass
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def get(self, ekg_test, wait=True):
+        """
+        Liefert die Metadaten einer Aufnahme. Fehlt der Eintrag oder ist die Datei
+        seitdem verändert worden, wird er einmalig neu berechnet, sofern ihn nicht
+        schon ein anderer Prozess gespeichert hat. Das Signal wird dabei in eine
+        Kopie des Tests geladen, der übergebene Test bleibt unverändert.
+
+        Args:
+            ekg_test (EKGTest): Der gesuchte Test.
+            wait (bool): Bei False wird ein fehlender Eintrag im Hintergrund
+                berechnet und sofort None geliefert.
+
+        Returns:
+            dict: Metadaten der Aufnahme (None, wenn wait=False und er noch fehlt).
+        """
+        key = _index_key(ekg_test.result_link)
+        if not self.is_current(ekg_test.result_link):
+            self.reload()
+        if self.is_current(ekg_test.result_link):
+            return self.entries[key]
+        if wait:
+            return self.update(ekg_test.copy())
+        with self._lock:
+            if key not in self._pending:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recording-index")
+                self._pending.add(key)
+                self._executor.submit(self._update_in_background, ekg_test.copy(), key)
+        return None
+
+    def remove(self, result_link, save=True):
+        """
+        Entfernt den Eintrag einer Aufnahme aus dem Index.
+
+        Args:
+            result_link (str): Pfad zur EKG-Datei.
+            save (bool): Index direkt speichern.
+        """
+        key = _index_key(result_link)
+        with self._lock:
+            removed = self.entries.pop(key, None) is not None
+            self._changed.discard(key)
+            self._removed.add(key)
+        if removed and save:
+            self.save()
+
+
+# Geteilter Index aller Sessions (wird einmal pro Prozess eingelesen)
+recording_index = RecordingIndex()
@@ -0,0 +1,274 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+import numpy as np
+from src.signalcache import CACHE_ROOT, file_stat_key
+from src.recordingindex import file_sha256
+
+RESULT_DIR = os.path.join(CACHE_ROOT, "results")
+HASHES_FILE = "hashes.json"  # Merkt sich den Inhalts-Hash je (Pfad, Änderungszeit, Größe)
+
+
+def params_digest(params):
+    """
+    Stabiler Hash der Parameter eines Verfahrens (unabhängig von der Reihenfolge).
+
+    Args:
+        params (dict): JSON-serialisierbare Parameter.
+
+    Returns:
+        str: Die ersten 16 Zeichen des SHA-256.
+    """
+    text = json.dumps(params, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+class ResultStore:
+    """
+    Dauerhafter Speicher für Analyseergebnisse (Peaks, Herzfrequenz, abgeleitete
+    Verläufe) auf der Festplatte.
+
+    Ein Ergebnis wird über den Inhalts-Hash der Aufnahme sowie Name, Version und
+    Parameter des Verfahrens adressiert. Es wird dadurch über Sessions, Prozesse
+    und Neustarts hinweg wiederverwendet und ist genau dann ungültig, wenn sich die
+    Daten oder die Parameter ändern. Jedes Ergebnis liegt als eigene .npz-Datei vor.
+    """
+
+    def __init__(self, directory=RESULT_DIR):
+        """
+        Args:
+            directory (str): Verzeichnis der Ergebnisse.
+        """
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._hashes = None  # absoluter Pfad -> {"mtime_ns", "size", "sha256"}
+
+    def _load_hashes(self):
+        """
+        Liest die gemerkten Inhalts-Hashes einmal pro Prozess ein.
+        """
+        if self._hashes is None:
+            try:
+                with open(os.path.join(self.directory, HASHES_FILE), "r", encoding="utf-8") as f:
+                    self._hashes = json.load(f)
+            except (OSError, ValueError):
+                self._hashes = {}
+        return self._hashes
+
+    def _save_hashes(self):
+        """
+        Schreibt die gemerkten Inhalts-Hashes atomar zurück.
+        """
+        path = os.path.join(self.directory, HASHES_FILE)
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._hashes, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def content_hash(self, result_link):
+        """
+        SHA-256 einer Aufnahme. Der Hash wird pro Datei (Pfad, Änderungszeit, Größe)
+        nur einmal berechnet und auf der Festplatte gemerkt.
+
+        Args:
+            result_link (str): Pfad zur EKG-Datei.
+
+        Returns:
+            str: Hexadezimaler Hash.
+        """
+        path, mtime_ns, size = file_stat_key(result_link)
+        with self._lock:
+            known = self._load_hashes().get(path)
+        if known and known["mtime_ns"] == mtime_ns and known["size"] == size:
+            return known["sha256"]
+        digest = file_sha256(result_link)
+        with self._lock:
+            self._hashes[path] = {"mtime_ns": mtime_ns, "size": size, "sha256": digest}
+            try:
+                self._save_hashes()
+            except OSError:
+                pass  # Dann wird beim nächsten Prozessstart erneut gehasht
+        return digest
+
+    def path_for(self, content_hash, name, version, params):
+        """
+        Pfad der Ergebnisdatei.
+
+        Args:
+            content_hash (str): SHA-256 der Aufnahme.
+            name (str): Name des Verfahrens (z.B. "threshold" oder "hrv").
+            version (int): Version des Verfahrens.
+            params (dict): Parameter des Verfahrens.
+
+        Returns:
+            str: Pfad zur .npz-Datei.
+        """
+        return os.path.join(self.directory, f"{content_hash[:32]}-{name}-v{version}-{params_digest(params)}.npz")
+
+    def load(self, result_link, name, version, params):
+        """
+        Liest ein gespeichertes Ergebnis.
+
+        Args:
+            result_link (str): Pfad zur EKG-Datei.
+            name (str): Name des Verfahrens.
+            version (int): Version des Verfahrens.
+            params (dict): Parameter des Verfahrens.
+
+        Returns:
+            dict: Die gespeicherten Werte (Skalare als Python-Zahlen) oder None.
+        """
+        try:
+            path = self.path_for(self.content_hash(result_link), name, version, params)
+            with np.load(path, allow_pickle=False) as data:
+                result = {key: data[key] for key in data.files if key != "_meta"}
+            os.utime(path)  # als zuletzt verwendet markieren
+        except (OSError, ValueError, KeyError):
+            return None
+        return {key: value.item() if value.ndim == 0 else value for key, value in result.items()}
+
+    def save(self, result_link, name, version, params, values):
+        """
+        Speichert ein Ergebnis atomar. Fehler beim Schreiben werden ignoriert, die
+        Analyse funktioniert auch ohne Speicher.
+
+        Args:
+            result_link (str): Pfad zur EKG-Datei.
+            name (str): Name des Verfahrens.
+            version (int): Version des Verfahrens.
+            params (dict): Parameter des Verfahrens.
+            values (dict): Arrays und Skalare.
+
+        Returns:
+            str: Pfad der Ergebnisdatei (None, wenn nicht geschrieben werden konnte).
+        """
+        meta = {
+            "source": os.path.normpath(result_link).replace("\\", "/"),
+            "name": name,
+            "version": version,
+            "params": params,
+            "created": time.time(),
+        }
+        try:
+            path = self.path_for(self.content_hash(result_link), name, version, params)
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.savez(f, _meta=np.array(json.dumps(meta)), **{k: np.asarray(v) for k, v in values.items()})
+            os.replace(tmp_path, path)
+        except OSError:
+            return None
+        return path
+
+    def get_or_compute(self, result_link, name, version, params, compute):
+        """
+        Liefert ein gespeichertes Ergebnis oder berechnet und speichert es.
+
+        Args:
+            result_link (str): Pfad zur EKG-Datei.
+            name (str): Name des Verfahrens.
+            version (int): Version des Verfahrens.
+            params (dict): Parameter des Verfahrens.
+            compute (callable): Berechnet das Ergebnis als dict, wenn es fehlt.
+
+        Returns:
+            dict: Das Ergebnis.
+        """
+        result = self.load(result_link, name, version, params)
+        if result is None:
+            result = compute()
+            self.save(result_link, name, version, params, result)
+        return result
+
+    def entries(self):
+        """
+        Beschreibt alle gespeicherten Ergebnisse.
+
+        Returns:
+            list: Ein dict pro Datei mit Pfad, Größe, letztem Zugriff und den
+                Metadaten (Quelle, Verfahren, Version, Parameter).
+        """
+        result = []
+        for path in sorted(glob.glob(os.path.join(self.directory, "*.npz"))):
+            try:
+                with np.load(path, allow_pickle=False) as data:
+                    meta = json.loads(str(data["_meta"]))
+                stat = os.stat(path)
+            except (OSError, ValueError, KeyError):
+                meta, stat = {}, None
+            result.append({
+                "path": path,
+                "size": stat.st_size if stat else 0,
+                "last_used": stat.st_mtime if stat else 0,
+                **meta,
+            })
+        return result
+
+    def purge(self, older_than_days=None, orphaned=False, name=None):
+        """
+        Löscht gespeicherte Ergebnisse. Ohne Kriterien wird alles gelöscht.
+
+        Args:
+            older_than_days (float): Nur Ergebnisse, die so lange nicht verwendet wurden.
+            orphaned (bool): Nur Ergebnisse, deren Aufnahme nicht mehr existiert.
+            name (str): Nur Ergebnisse dieses Verfahrens.
+
+        Returns:
+            int: Anzahl der gelöschten Dateien.
+        """
+        cutoff = time.time() - older_than_days * 86400 if older_than_days is not None else None
+        removed = 0
+        for entry in self.entries():
+            if cutoff is not None and entry["last_used"] >= cutoff:
+                continue
+            if orphaned and entry.get("source") and os.path.exists(entry["source"]):
+                continue
+            if name is not None and entry.get("name") != name:
+                continue
+            try:
+                os.remove(entry["path"])
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+
+# Geteilter Ergebnisspeicher aller Sessions
+result_store = ResultStore()
+
+
+def main():
+    """
+    Kommandozeilen-Einstieg: gespeicherte Analyseergebnisse anzeigen oder löschen.
+    """
+    parser = argparse.ArgumentParser(description="Zeigt oder löscht gespeicherte Analyseergebnisse.")
+    parser.add_argument("--dir", default=RESULT_DIR, help="Verzeichnis der Ergebnisse")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="Alle Ergebnisse auflisten")
+    purge = commands.add_parser("purge", help="Ergebnisse löschen (ohne Optionen: alle)")
+    purge.add_argument("--older-than", type=float, metavar="TAGE", help="Nur länger nicht verwendete Ergebnisse")
+    purge.add_argument("--orphaned", action="store_true", help="Nur Ergebnisse gelöschter Aufnahmen")
+    purge.add_argument("--name", help="Nur Ergebnisse dieses Verfahrens (z.B. threshold, hrv)")
+    args = parser.parse_args()
+
+    store = ResultStore(args.dir)
+    if args.command == "list":
+        entries = store.entries()
+        for entry in entries:
+            params = json.dumps(entry.get("params", {}), sort_keys=True)
+            print(f"{entry.get('source', '?')}  {entry.get('name', '?')} v{entry.get('version', '?')}  "
+                  f"{params}  {entry['size'] / 1024:.1f} KB")
+        total = sum(entry["size"] for entry in entries)
+        print(f"{len(entries)} Ergebnisse, {total / 1024 / 1024:.2f} MB in {args.dir}")
+    else:
+        removed = store.purge(args.older_than, args.orphaned, args.name)
+        print(f"{removed} Ergebnisse gelöscht.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from contextlib import contextmanager
+import numpy as np
+from src.filelock import file_lock
+from src.signalcache import file_stat_key, load_recording
+
+# Gemeinsamer Signalspeicher für mehrere Serverprozesse auf einem Host (nur mit EKG_SHARED_SIGNALS=1)
+ENABLED = os.environ.get("EKG_SHARED_SIGNALS", "0") == "1"
+DEFAULT_SHARED_DIR = os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "ekg-signals")
+SHARED_DIR = os.environ.get("EKG_SHARED_DIR", DEFAULT_SHARED_DIR)
+REFS_DIR = "refs"
+META_FILE = "meta.json"
+
+
+def _process_token(pid):
+    """
+    Kennung eines Prozesses aus PID und Startzeit, damit eine wiederverwendete PID
+    nicht als der ursprüngliche Prozess gilt. Ohne /proc wird nur die PID verwendet.
+    """
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            fields = f.read().rsplit(b")", 1)[1].split()
+        return f"{pid}.{int(fields[19])}"  # Feld 22 (starttime), gezählt ab dem Zustand
+    except (OSError, IndexError, ValueError):
+        return str(pid)
+
+
+def _is_alive(token):
+    """
+    True, wenn der Prozess einer Referenzdatei noch läuft.
+    """
+    pid = int(token.split(".", 1)[0])
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Prozess existiert, gehört aber einem anderen Benutzer
+    return "." not in token or _process_token(pid) == token
+
+
+def segment_key(result_link):
+    """
+    Schlüssel des Segments einer Aufnahme aus Pfad, Änderungszeit und Größe.
+
+    Args:
+        result_link (str): Pfad zur EKG-Datei.
+
+    Returns:
+        str: Verzeichnisname des Segments.
+    """
+    abs_path, mtime_ns, size = file_stat_key(result_link)
+    name = os.path.splitext(os.path.basename(abs_path))[0]
+    digest = hashlib.sha1(f"{abs_path}|{mtime_ns}|{size}".encode("utf-8")).hexdigest()[:20]
+    return f"{name}-{digest}"
+
+
+def _peaks_name(peak_params):
+    """
+    Dateiname der Peaks für bestimmte Erkennungsparameter.
+    """
+    text = json.dumps(peak_params, sort_keys=True, separators=(",", ":"))
+    return f"peaks-{hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]}.npy"
+
+
+def _save_npy(path, array):
+    """
+    Schreibt ein Array atomar als .npy-Datei.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, np.ascontiguousarray(array))
+    os.replace(tmp_path, path)
+
+
+class SharedSignals:
+    """
+    Veröffentlicht dekodierte Signale (Zeit, Spannung) und Peaks einmal pro Host als
+    .npy-Dateien in einem gemeinsamen Speicher (Standard: /dev/shm, also im RAM).
+    Jeder Serverprozess bindet sie per Memory-Map ohne Kopie ein, der Speicherbedarf
+    wächst daher nicht mit der Anzahl der Prozesse.
+
+    Pro Segment (= Aufnahme) legt jeder nutzende Prozess eine Referenzdatei an.
+    Jedes attach() wird genau einmal freigegeben, sobald das eingebundene
+    Spannungs-Array nicht mehr verwendet wird, egal ob es in einem EKGTest, im
+    recording_cache oder nur in einer Batch-Auswertung lag. Wird die letzte
+    Referenz freigegeben oder ist ihr Prozess beendet, wird das Segment gelöscht.
+    Bereits eingebundene Arrays bleiben dabei gültig. Anlegen von Segment und
+    Referenz sowie die Prüfung auf die letzte Referenz samt Löschen laufen unter
+    einer Dateisperre pro Segment, damit kein Prozess ein Segment einbindet, das
+    ein anderer gerade löscht.
+    """
+
+    def __init__(self, directory=SHARED_DIR):
+        """
+        Args:
+            directory (str): Verzeichnis der Segmente (möglichst auf einem tmpfs).
+        """
+        self.directory = directory
+        self.token = _process_token(os.getpid())
+        self._lock = threading.Lock()
+        self._attached = {}  # Segment -> Anzahl der Nutzer in diesem Prozess
+        self._pending = []  # Freizugebende Segmente, deren Arrays nicht mehr verwendet werden
+        atexit.register(self.release_all)
+
+    def _segment(self, key):
+        return os.path.join(self.directory, key)
+
+    def _ref_path(self, key):
+        return os.path.join(self._segment(key), REFS_DIR, self.token)
+
+    def _segment_lock(self, key):
+        """
+        Dateisperre eines Segments über Prozessgrenzen. Die Sperrdatei liegt neben dem
+        Segment (mit Punkt, damit cleanup und status sie überspringen) und bleibt bestehen.
+        """
+        return file_lock(os.path.join(self.directory, f".{key}.lock"))
+
+    @contextmanager
+    def _locked(self):
+        """
+        Hält den Lock des Prozesses und gibt danach die Segmente frei, deren Arrays
+        währenddessen verworfen wurden (siehe _release_later).
+        """
+        self._lock.acquire()
+        try:
+            yield
+        finally:
+            self._lock.release()
+            self._drain()
+
+    def _publish(self, key, result_link):
+        """
+        Dekodiert eine Aufnahme und legt ihr Segment an. Das Segment wird in einem
+        temporären Verzeichnis aufgebaut und erst vollständig (inkl. eigener
+        Referenz) umbenannt; verliert der Prozess ein Rennen, wird das fertige
+        Segment des anderen Prozesses verwendet.
+        """
+        time, voltage, filetype = load_recording(result_link)
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=f".{key}.", dir=self.directory)
+        try:
+            _save_npy(os.path.join(tmp_dir, "time.npy"), time)
+            _save_npy(os.path.join(tmp_dir, "voltage.npy"), voltage)
+            with open(os.path.join(tmp_dir, META_FILE), "w", encoding="utf-8") as f:
+                json.dump({"source": os.path.abspath(result_link), "filetype": filetype}, f)
+            os.makedirs(os.path.join(tmp_dir, REFS_DIR))
+            open(os.path.join(tmp_dir, REFS_DIR, self.token), "w").close()
+            os.rename(tmp_dir, self._segment(key))
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not os.path.isdir(self._segment(key)):
+                raise
+
+    def attach(self, result_link):
+        """
+        Bindet das Segment einer Aufnahme ein und legt es beim ersten Zugriff an.
+        Die Nutzung wird automatisch freigegeben, sobald das zurückgegebene
+        Spannungs-Array (samt Ansichten davon) nicht mehr referenziert wird,
+        spätestens beim Beenden des Prozesses.
+
+        Args:
+            result_link (str): Pfad zur EKG-Datei.
+
+        Returns:
+            dict: key (Segment), time, voltage und filetype.
+        """
+        key = segment_key(result_link)
+        segment = self._segment(key)
+        with self._locked():
+            if not os.path.isdir(segment):
+                self.cleanup()  # vor der Segmentsperre, cleanup sperrt jedes Segment selbst
+            with self._segment_lock(key):
+                for attempt in range(2):
+                    if not os.path.isdir(segment):
+                        self._publish(key, result_link)
+                    try:
+                        # Referenz unter der Segmentsperre anlegen: kein anderer Prozess kann das
+                        # Segment zwischen Prüfung und Einbinden löschen
+                        open(self._ref_path(key), "w").close()
+                        time = np.load(os.path.join(segment, "time.npy"), mmap_mode="r")
+                        voltage = np.load(os.path.join(segment, "voltage.npy"), mmap_mode="r")
+                        with open(os.path.join(segment, META_FILE), "r", encoding="utf-8") as f:
+                            meta = json.load(f)
+                        break
+                    except (OSError, ValueError):
+                        if attempt:
+                            raise
+                        shutil.rmtree(segment, ignore_errors=True)  # Unvollständiges Segment neu anlegen
+            self._attached[key] = self._attached.get(key, 0) + 1
+            weakref.finalize(voltage, self._release_later, key)
+        return {"key": key, "time": time, "voltage": voltage, "filetype": meta["filetype"]}
+
+    def load_peaks(self, key, peak_params):
+        """
+        Bindet die veröffentlichten Peaks eines Segments ein.
+
+        Args:
+            key (str): Segment (aus attach).
+            peak_params (dict): Parameter der Peak-Erkennung.
+
+        Returns:
+            np.ndarray: Indizes der Peaks oder None, wenn noch keine veröffentlicht sind.
+        """
+        try:
+            return np.load(os.path.join(self._segment(key), _peaks_name(peak_params)), mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+
+    def publish_peaks(self, key, peak_params, peaks):
+        """
+        Legt die Peaks eines Segments ab, damit andere Prozesse sie nicht erneut erkennen müssen.
+
+        Args:
+            key (str): Segment (aus attach).
+            peak_params (dict): Parameter der Peak-Erkennung.
+            peaks (np.ndarray): Indizes der Peaks.
+        """
+        path = os.path.join(self._segment(key), _peaks_name(peak_params))
+        if os.path.exists(path):
+            return
+        try:
+            _save_npy(path, np.asarray(peaks, dtype=np.int64))
+        except OSError:
+            pass  # Segment wurde inzwischen entfernt; die Peaks bleiben prozesslokal
+
+    def _release_later(self, key):
+        """
+        Merkt ein Segment zur Freigabe vor (aufgerufen, wenn ein eingebundenes Array
+        verworfen wird). Da das auch während eines anderen Aufrufs unter dem Lock
+        geschehen kann, wird nicht blockierend freigegeben; sonst übernimmt es der
+        Inhaber des Locks direkt nach dem Freigeben (siehe _locked).
+        """
+        self._pending.append(key)
+        self._drain()
+
+    def _drain(self):
+        """
+        Gibt alle vorgemerkten Segmente frei, wenn der Lock frei ist.
+        """
+        while self._pending and self._lock.acquire(blocking=False):
+            try:
+                while self._pending:
+                    self._release(self._pending.pop())
+            finally:
+                self._lock.release()
+
+    def _release(self, key):
+        """
+        Gibt eine Nutzung des Segments frei. Nach der letzten Nutzung im Prozess
+        wird die Referenz entfernt und das Segment gelöscht, wenn kein anderer
+        Prozess es mehr verwendet. Muss unter dem Lock aufgerufen werden.
+
+        Args:
+            key (str): Segment (aus attach).
+        """
+        count = self._attached.get(key, 0) - 1
+        if count > 0:
+            self._attached[key] = count
+            return
+        self._attached.pop(key, None)
+        try:
+            os.remove(self._ref_path(key))
+        except OSError:
+            pass
+        self._remove_if_unused(key)
+
+    def release_all(self):
+        """
+        Gibt alle Segmente dieses Prozesses frei (wird beim Beenden aufgerufen).
+        """
+        with self._locked():
+            self._pending.clear()
+            for key in list(self._attached):
+                self._attached[key] = 1
+                self._release(key)
+
+    def _remove_if_unused(self, key):
+        """
+        Entfernt Referenzen beendeter Prozesse und löscht das Segment, wenn keine übrig ist.
+        Prüfung und Löschen laufen unter der Segmentsperre, damit kein anderer Prozess
+        dazwischen eine neue Referenz anlegt.
+
+        Returns:
+            bool: True, wenn das Segment gelöscht wurde.
+        """
+        refs_dir = os.path.join(self._segment(key), REFS_DIR)
+        with self._segment_lock(key):
+            try:
+                tokens = os.listdir(refs_dir)
+            except OSError:
+                return False
+            alive = 0
+            for token in tokens:
+                if _is_alive(token):
+                    alive += 1
+                else:
+                    try:
+                        os.remove(os.path.join(refs_dir, token))
+                    except OSError:
+                        pass
+            if alive:
+                return False
+            shutil.rmtree(self._segment(key), ignore_errors=True)
+            return True
+
+    def cleanup(self):
+        """
+        Löscht alle Segmente, die von keinem laufenden Prozess mehr verwendet werden.
+
+        Returns:
+            int: Anzahl der gelöschten Segmente.
+        """
+        try:
+            keys = [name for name in os.listdir(self.directory) if not name.startswith(".")]
+        except OSError:
+            return 0
+        return sum(self._remove_if_unused(key) for key in keys)
+
+    def status(self):
+        """
+        Beschreibt alle Segmente.
+
+        Returns:
+            list: Ein dict pro Segment mit Quelle, Größe in MB und Anzahl laufender Nutzer.
+        """
+        result = []
+        try:
+            keys = sorted(name for name in os.listdir(self.directory) if not name.startswith("."))
+        except OSError:
+            return result
+        for key in keys:
+            segment = self._segment(key)
+            try:
+                with open(os.path.join(segment, META_FILE), "r", encoding="utf-8") as f:
+                    source = json.load(f)["source"]
+                size = sum(os.path.getsize(os.path.join(segment, name))
+                           for name in os.listdir(segment) if name.endswith(".npy"))
+                tokens = os.listdir(os.path.join(segment, REFS_DIR))
+            except (OSError, ValueError, KeyError):
+                continue
+            result.append({
+                "key": key,
+                "source": source,
+                "mb": size / 1024 / 1024,
+                "processes": sum(_is_alive(token) for token in tokens),
+            })
+        return result
+
+
+# Geteilte Instanz des Prozesses (nur im Modus EKG_SHARED_SIGNALS=1 verwendet)
+shared_signals = SharedSignals()
+
+
+def main():
+    """
+    Kommandozeilen-Einstieg: Segmente anzeigen oder verwaiste Segmente löschen.
+    """
+    parser = argparse.ArgumentParser(description="Verwaltet die gemeinsam genutzten Signale.")
+    parser.add_argument("command", choices=["status", "cleanup"], help="Segmente anzeigen bzw. verwaiste löschen")
+    parser.add_argument("--dir", default=SHARED_DIR, help="Verzeichnis der Segmente")
+    args = parser.parse_args()
+
+    store = SharedSignals(args.dir)
+    if args.command == "status":
+        segments = store.status()
+        for segment in segments:
+            print(f"{segment['source']}  {segment['mb']:.1f} MB  {segment['processes']} Prozess(e)")
+        print(f"{len(segments)} Segmente, {sum(s['mb'] for s in segments):.1f} MB in {args.dir}")
+    else:
+        print(f"{store.cleanup()} Segmente gelöscht.")
+
+
+if __name__ == "__main__":
+    main()
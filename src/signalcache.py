@@ -0,0 +1,189 @@
+import glob
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+
+# Wurzelverzeichnis für alle abgeleiteten Dateien (Caches, Indizes, ...)
+CACHE_ROOT = os.environ.get("EKG_CACHE_DIR", "data/cache")
+SIGNAL_CACHE_DIR = os.path.join(CACHE_ROOT, "signals")
+
+
+def file_stat_key(path):
+    """
+    Liefert einen günstigen Fingerabdruck einer Datei aus Pfad, Änderungszeit und Größe.
+
+    Args:
+        path (str): Pfad zur Datei.
+
+    Returns:
+        tuple: (absoluter Pfad, mtime in ns, Größe in Bytes)
+    """
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+
+def txt_time_axis(n_samples, start=0, stop=None):
+    """
+    Erzeugt die Zeitachse einer TXT-Aufnahme (2 ms Abtastintervall), entspricht
+    np.linspace(0, n_samples * 2, n_samples, dtype=int). Mit start/stop wird nur ein
+    Ausschnitt berechnet, der exakt mit der vollständigen Achse übereinstimmt
+    (z.B. für die blockweise Analyse in streaming).
+
+    Args:
+        n_samples (int): Anzahl der Samples der gesamten Aufnahme.
+        start (int): Erster Index des Ausschnitts.
+        stop (int): Index hinter dem Ausschnitt (Standard: n_samples).
+
+    Returns:
+        np.ndarray: Zeit in ms.
+    """
+    stop = n_samples if stop is None else stop
+    index = np.arange(start, stop, dtype=np.float64)
+    if n_samples > 1:
+        time = index * (n_samples * 2 / (n_samples - 1))
+        time[index == n_samples - 1] = n_samples * 2  # Endpunkt exakt wie bei linspace
+    else:
+        time = index * 0.0
+    return np.floor(time).astype(int)
+
+
+def parse_recording(source, filetype):
+    """
+    Parst eine EKG-Aufnahme aus einer Datei oder einem dateiähnlichen Objekt.
+
+    Args:
+        source (str | file): Pfad oder geöffnete Datei (z.B. io.BytesIO eines Uploads).
+        filetype (str): "txt" oder "csv".
+
+    Returns:
+        tuple: (Zeit in ms, Spannung)
+    """
+    if filetype == "csv":
+        df = pd.read_csv(source)
+        if df.shape[1] < 2:
+            raise ValueError("CSV-Datei hat nicht mindestens 2 Spalten.")
+        time = df.iloc[:, 0].values * 1000  # Sekunden -> ms
+        voltage = df.iloc[:, 1].values
+    elif filetype == "txt":
+        data = np.loadtxt(source, delimiter='\t', ndmin=2)
+        voltage = data[:, 0]
+        time = txt_time_axis(len(voltage))
+    else:
+        raise ValueError("Unbekanntes Dateiformat: " + filetype)
+    return time, voltage
+
+
+def read_recording(path):
+    """
+    Liest eine EKG-Datei (txt, csv, aufbereitetes npz oder Blockformat ekgc) vollständig ein.
+
+    Args:
+        path (str): Pfad zur EKG-Datei.
+
+    Returns:
+        tuple: (Zeit in ms, Spannung, Dateityp)
+    """
+    _, ext = os.path.splitext(path)
+    ext = ext.lower()
+    filetype = ext.replace('.', '')
+
+    if filetype == "npz":
+        from src.ingest import read_ingested
+        recording = read_ingested(path)
+        return recording["time"], recording["voltage"], recording["source_type"]
+    if filetype == "ekgc":
+        from src.chunkstore import ChunkedRecording
+        recording = ChunkedRecording(path)
+        time, voltage = recording.read_all()
+        return time, voltage, recording.source_type
+    if filetype not in ("txt", "csv"):
+        raise ValueError("Unbekanntes Dateiformat: " + ext)
+    time, voltage = parse_recording(path, filetype)
+    return time, voltage, filetype
+
+
+def _sidecar_prefix(abs_path):
+    """
+    Liefert den Dateipräfix aller Sidecars einer Quelldatei im Cache-Verzeichnis.
+    """
+    name = os.path.splitext(os.path.basename(abs_path))[0]
+    digest = hashlib.sha1(abs_path.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(SIGNAL_CACHE_DIR, f"{name}-{digest}")
+
+
+def _save_npy(path, array):
+    """
+    Schreibt ein Array atomar als .npy-Datei (erst temporär, dann umbenennen).
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, np.ascontiguousarray(array))
+    os.replace(tmp_path, path)
+
+
+def load_recording(path, use_cache=True):
+    """
+    Lädt eine EKG-Aufnahme über den binären Sidecar-Cache.
+
+    Beim ersten Laden wird die Textdatei geparst und Zeit und Spannung werden als
+    .npy-Dateien unter ``data/cache/signals`` abgelegt. Der Schlüssel besteht aus
+    Pfad, Änderungszeit und Größe der Quelldatei; spätere Aufrufe mappen die
+    Sidecars per Memory-Map, statt den Text erneut zu parsen. Ändert sich die
+    Quelldatei, werden die veralteten Sidecars verworfen und neu erzeugt.
+    Blockdateien (ekgc, siehe chunkstore) werden ebenso nur einmal entpackt.
+
+    Args:
+        path (str): Pfad zur EKG-Datei.
+        use_cache (bool): Bei False wird immer direkt aus der Textdatei gelesen.
+
+    Returns:
+        tuple: (Zeit in ms, Spannung, Dateityp)
+    """
+    if not use_cache or path.lower().endswith(".npz"):
+        return read_recording(path)  # Aufbereitete Aufnahmen sind bereits binär
+
+    abs_path, mtime_ns, size = file_stat_key(path)
+    filetype = os.path.splitext(path)[1].lower().replace('.', '')
+    if filetype == "ekgc":
+        from src.chunkstore import ChunkedRecording
+        filetype = ChunkedRecording(path).source_type
+    prefix = _sidecar_prefix(abs_path)
+    stem = f"{prefix}-{mtime_ns:x}-{size:x}"
+    time_path = stem + ".time.npy"
+    voltage_path = stem + ".voltage.npy"
+
+    if os.path.exists(time_path) and os.path.exists(voltage_path):
+        try:
+            time = np.load(time_path, mmap_mode="r")
+            voltage = np.load(voltage_path, mmap_mode="r")
+            return time, voltage, filetype
+        except (OSError, ValueError):
+            pass  # Defekter Sidecar -> neu erzeugen
+
+    time, voltage, filetype = read_recording(path)
+    try:
+        os.makedirs(SIGNAL_CACHE_DIR, exist_ok=True)
+        # Veraltete Sidecars derselben Quelldatei entfernen
+        for stale in glob.glob(glob.escape(prefix) + "-*.npy"):
+            if not stale.startswith(stem):
+                os.remove(stale)
+        _save_npy(voltage_path, voltage)
+        _save_npy(time_path, time)
+    except OSError:
+        pass  # Cache ist optional, z.B. bei schreibgeschütztem Verzeichnis
+    return time, voltage, filetype
+
+
+def clear_signal_cache():
+    """
+    Löscht alle Sidecar-Dateien des Signal-Caches.
+
+    Returns:
+        int: Anzahl der gelöschten Dateien.
+    """
+    removed = 0
+    for path in glob.glob(os.path.join(SIGNAL_CACHE_DIR, "*.npy")):
+        os.remove(path)
+        removed += 1
+    return removed
@@ -0,0 +1,118 @@
+import argparse
+import glob
+import os
+import socket
+import time
+import numpy as np
+from src.live import DEFAULT_LIVE_FILE, DEFAULT_PORT, now_ms
+from src.signalcache import read_recording
+
+DEFAULT_SOURCES = "data/ekg_data/0*.txt"
+DEFAULT_RATE_HZ = 500
+DEFAULT_BLOCK_MS = 20  # Das Gerät sendet alle 20 ms einen Block (10 Samples bei 500 Hz)
+
+
+def replay_blocks(paths, rate_hz=DEFAULT_RATE_HZ, block_ms=DEFAULT_BLOCK_MS, loop=True):
+    """
+    Spielt Aufnahmen in Echtzeit ab und versieht jedes Sample mit der Wanduhrzeit.
+
+    Args:
+        paths (list): EKG-Dateien, die nacheinander abgespielt werden.
+        rate_hz (float): Abtastrate in Hz.
+        block_ms (float): Blocklänge in ms.
+        loop (bool): Nach der letzten Datei wieder von vorne beginnen.
+
+    Yields:
+        bytes: Ein Block im Live-Protokoll ("<Zeit in ms>\\t<Spannung>\\n" pro Sample).
+    """
+    interval_ms = 1000 / rate_hz
+    block_size = max(1, int(round(block_ms / interval_ms)))
+    start = now_ms()
+    sent = 0
+    while True:
+        for path in paths:
+            _, voltage, _ = read_recording(path)
+            for offset in range(0, len(voltage), block_size):
+                block = np.asarray(voltage[offset:offset + block_size])
+                timestamps = start + (sent + np.arange(len(block))) * interval_ms
+                # Warten, bis das letzte Sample des Blocks "aufgenommen" ist
+                delay = (timestamps[-1] - now_ms()) / 1000
+                if delay > 0:
+                    time.sleep(delay)
+                sent += len(block)
+                lines = "".join(f"{t:.1f}\t{v:g}\n" for t, v in zip(timestamps, block))
+                yield lines.encode("ascii")
+        if not loop:
+            return
+
+
+def run_file_simulator(output=DEFAULT_LIVE_FILE, sources=DEFAULT_SOURCES, rate_hz=DEFAULT_RATE_HZ, loop=True):
+    """
+    Schreibt den Live-Datenstrom fortlaufend in eine Datei.
+
+    Args:
+        output (str): Zieldatei (wird neu angelegt).
+        sources (str): Glob-Muster der abzuspielenden Aufnahmen.
+        rate_hz (float): Abtastrate in Hz.
+        loop (bool): Endlos wiederholen.
+    """
+    paths = sorted(glob.glob(sources))
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output, "wb") as f:
+        for block in replay_blocks(paths, rate_hz, loop=loop):
+            f.write(block)
+            f.flush()
+
+
+def run_socket_simulator(port=DEFAULT_PORT, sources=DEFAULT_SOURCES, rate_hz=DEFAULT_RATE_HZ, loop=True):
+    """
+    Sendet den Live-Datenstrom über einen lokalen TCP-Socket. Verbindet sich ein
+    neuer Client, beginnt die Wiedergabe für ihn von vorne.
+
+    Args:
+        port (int): Port auf 127.0.0.1.
+        sources (str): Glob-Muster der abzuspielenden Aufnahmen.
+        rate_hz (float): Abtastrate in Hz.
+        loop (bool): Endlos wiederholen.
+    """
+    paths = sorted(glob.glob(sources))
+    with socket.create_server(("127.0.0.1", port)) as server:
+        print(f"Simulator wartet auf 127.0.0.1:{port} ...")
+        while True:
+            connection, address = server.accept()
+            print(f"Verbunden mit {address[0]}:{address[1]}")
+            with connection:
+                try:
+                    for block in replay_blocks(paths, rate_hz, loop=loop):
+                        connection.sendall(block)
+                except (BrokenPipeError, ConnectionResetError):
+                    print("Verbindung getrennt.")
+
+
+def main():
+    """
+    Kommandozeilen-Einstieg des EKG-Simulators.
+    """
+    parser = argparse.ArgumentParser(description="Simuliert ein EKG-Gerät durch Echtzeit-Wiedergabe von Aufnahmen.")
+    parser.add_argument("--file", nargs="?", const=DEFAULT_LIVE_FILE, help="In eine wachsende Datei schreiben")
+    parser.add_argument("--port", type=int, help="Über einen lokalen TCP-Socket senden")
+    parser.add_argument("--sources", default=DEFAULT_SOURCES, help="Glob-Muster der Aufnahmen")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE_HZ, help="Abtastrate in Hz")
+    parser.add_argument("--once", action="store_true", help="Aufnahmen nur einmal abspielen")
+    args = parser.parse_args()
+
+    try:
+        if args.port is not None:
+            run_socket_simulator(args.port, args.sources, args.rate, loop=not args.once)
+        else:
+            output = args.file or DEFAULT_LIVE_FILE
+            print(f"Simulator schreibt nach {output} ...")
+            run_file_simulator(output, args.sources, args.rate, loop=not args.once)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+import argparse
+import json
+import os
+import sqlite3
+from src.storage import files_content_hash, files_stat_key
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS persons (
+    id TEXT PRIMARY KEY,
+    firstname TEXT NOT NULL,
+    lastname TEXT NOT NULL,
+    date_of_birth TEXT,
+    picture_path TEXT,
+    fixed INTEGER NOT NULL DEFAULT 0,
+    position INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS ekg_tests (
+    id TEXT PRIMARY KEY,
+    person_id TEXT NOT NULL REFERENCES persons(id) ON DELETE CASCADE,
+    date TEXT,
+    result_link TEXT,
+    position INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS diagnoses (
+    test_id TEXT PRIMARY KEY REFERENCES ekg_tests(id) ON DELETE CASCADE,
+    diagnosis TEXT NOT NULL DEFAULT '',
+    updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+CREATE INDEX IF NOT EXISTS idx_ekg_tests_person ON ekg_tests(person_id);
+"""
+# PRAGMA user_version ab dieser Version: die JSON-Datei wurde bereits übernommen
+MIGRATED_VERSION = 1
+
+
+def _restore_id(value):
+    """
+    Stellt numerische IDs wieder als int her, damit das Ergebnis der JSON-Datei entspricht.
+    """
+    return int(value) if isinstance(value, str) and value.isdigit() else value
+
+
+class SQLitePersonStore:
+    """
+    Speichert die Personen-Datenbank in SQLite mit Tabellen für Personen, EKG-Tests
+    und Diagnosen. Diagnosen werden als einzelne Zeile transaktional geschrieben,
+    statt die ganze Datenbank neu zu schreiben.
+    """
+
+    def __init__(self, path, json_path=None):
+        """
+        Öffnet bzw. erzeugt die Datenbank. Beim ersten Öffnen wird die JSON-Datei,
+        falls vorhanden, einmalig übernommen; danach ist das in PRAGMA user_version
+        vermerkt, sodass eine später geleerte Datenbank nicht erneut befüllt wird.
+
+        Args:
+            path (str): Pfad zur SQLite-Datei.
+            json_path (str): Pfad zur JSON-Datei für die einmalige Migration.
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            migrated = conn.execute("PRAGMA user_version").fetchone()[0] >= MIGRATED_VERSION
+            is_empty = conn.execute("SELECT COUNT(*) FROM persons").fetchone()[0] == 0
+        if not migrated:
+            if is_empty and json_path and os.path.exists(json_path):
+                self.migrate_from_json(json_path)
+            else:
+                self._mark_migrated()
+
+    def stat_key(self):
+        """
+        Fingerabdruck der Datenbank aus Änderungszeit und Größe von Datei und WAL.
+        """
+        return files_stat_key([self.path, self.path + "-wal"])
+
+    def content_hash(self):
+        """
+        Hash des Inhalts von Datenbankdatei und WAL.
+        """
+        return files_content_hash([self.path, self.path + "-wal"])
+
+    def _connect(self):
+        """
+        Öffnet eine Verbindung mit aktivierten Fremdschlüsseln.
+        """
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def migrate_from_json(self, json_path):
+        """
+        Übernimmt alle Personen, Tests und Diagnosen aus der JSON-Datei.
+
+        Args:
+            json_path (str): Pfad zur JSON-Datei.
+
+        Returns:
+            int: Anzahl der übernommenen Personen.
+        """
+        with open(json_path, "r", encoding="utf-8") as f:
+            persons_list = json.load(f)
+        self.save(persons_list)
+        self._mark_migrated()
+        return len(persons_list)
+
+    def _mark_migrated(self):
+        """
+        Vermerkt in PRAGMA user_version, dass die JSON-Datei übernommen wurde.
+        """
+        conn = self._connect()
+        try:
+            conn.execute(f"PRAGMA user_version = {MIGRATED_VERSION}")
+        finally:
+            conn.close()
+
+    def load(self):
+        """
+        Lädt alle Personen im Format der JSON-Datei.
+
+        Returns:
+            list: Liste von Dictionaries mit Personendaten.
+        """
+        conn = self._connect()
+        try:
+            persons = conn.execute(
+                "SELECT id, firstname, lastname, date_of_birth, picture_path, fixed "
+                "FROM persons ORDER BY position"
+            ).fetchall()
+            tests = conn.execute(
+                "SELECT t.id, t.person_id, t.date, t.result_link, d.diagnosis "
+                "FROM ekg_tests t LEFT JOIN diagnoses d ON d.test_id = t.id "
+                "ORDER BY t.person_id, t.position"
+            ).fetchall()
+        finally:
+            conn.close()
+
+        tests_by_person = {}
+        for test_id, person_id, date, result_link, diagnosis in tests:
+            test = {"id": _restore_id(test_id), "date": date, "result_link": result_link}
+            if diagnosis is not None:
+                test["diagnosis"] = diagnosis
+            tests_by_person.setdefault(person_id, []).append(test)
+
+        return [
+            {
+                "id": _restore_id(person_id),
+                "firstname": firstname,
+                "lastname": lastname,
+                "date_of_birth": _restore_id(date_of_birth),
+                "picture_path": picture_path,
+                "ekg_tests": tests_by_person.get(person_id, []),
+                "fixed": bool(fixed),
+            }
+            for person_id, firstname, lastname, date_of_birth, picture_path, fixed in persons
+        ]
+
+    def save(self, persons_list):
+        """
+        Gleicht die Datenbank in einer Transaktion mit der übergebenen Personenliste ab.
+        Diagnosen werden nur überschrieben, wenn ein Test sie mitbringt.
+
+        Args:
+            persons_list (list): Liste von Dictionaries mit Personendaten.
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                person_ids = []
+                test_ids = []
+                for position, p in enumerate(persons_list):
+                    person_id = str(p["id"])
+                    person_ids.append(person_id)
+                    conn.execute(
+                        "INSERT INTO persons (id, firstname, lastname, date_of_birth, picture_path, fixed, position) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET "
+                        "firstname=excluded.firstname, lastname=excluded.lastname, "
+                        "date_of_birth=excluded.date_of_birth, picture_path=excluded.picture_path, "
+                        "fixed=excluded.fixed, position=excluded.position",
+                        (person_id, p["firstname"], p["lastname"], str(p["date_of_birth"]),
+                         p.get("picture_path"), int(bool(p.get("fixed", False))), position)
+                    )
+                    for test_position, test in enumerate(p.get("ekg_tests", [])):
+                        test_id = str(test["id"])
+                        test_ids.append(test_id)
+                        conn.execute(
+                            "INSERT INTO ekg_tests (id, person_id, date, result_link, position) "
+                            "VALUES (?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET "
+                            "person_id=excluded.person_id, date=excluded.date, "
+                            "result_link=excluded.result_link, position=excluded.position",
+                            (test_id, person_id, test.get("date"), test.get("result_link"), test_position)
+                        )
+                        if "diagnosis" in test:
+                            self._upsert_diagnosis(conn, test_id, test["diagnosis"])
+                self._delete_missing(conn, "ekg_tests", test_ids)
+                self._delete_missing(conn, "persons", person_ids)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _delete_missing(conn, table, keep_ids):
+        """
+        Löscht alle Zeilen einer Tabelle, deren ID nicht in keep_ids vorkommt.
+        """
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS keep_ids (id TEXT PRIMARY KEY)")
+        conn.execute("DELETE FROM keep_ids")
+        conn.executemany("INSERT OR IGNORE INTO keep_ids (id) VALUES (?)", [(i,) for i in keep_ids])
+        conn.execute(f"DELETE FROM {table} WHERE id NOT IN (SELECT id FROM keep_ids)")
+
+    @staticmethod
+    def _upsert_diagnosis(conn, test_id, diagnosis):
+        """
+        Schreibt eine einzelne Diagnosezeile.
+        """
+        conn.execute(
+            "INSERT INTO diagnoses (test_id, diagnosis, updated_at) VALUES (?, ?, datetime('now')) "
+            "ON CONFLICT(test_id) DO UPDATE SET diagnosis=excluded.diagnosis, updated_at=excluded.updated_at",
+            (str(test_id), diagnosis or "")
+        )
+
+    def set_diagnosis(self, person_id, test_id, diagnosis):
+        """
+        Speichert die Diagnose eines EKG-Tests als einzelne indizierte Zeile in einer Transaktion.
+
+        Args:
+            person_id (str): ID der Person (nur aus Kompatibilität zum JSON-Speicher).
+            test_id (str): ID des EKG-Tests.
+            diagnosis (str): Neue Diagnose (leer zum Löschen).
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                self._upsert_diagnosis(conn, test_id, diagnosis)
+        finally:
+            conn.close()
+
+
+if __name__ == "__main__":
+    from src.storage import DB_PATH, SQLITE_PATH
+
+    parser = argparse.ArgumentParser(description="Überträgt data/person_db.json in die SQLite-Datenbank.")
+    parser.add_argument("--json", default=DB_PATH, help="Pfad zur JSON-Datei")
+    parser.add_argument("--db", default=SQLITE_PATH, help="Pfad zur SQLite-Datei")
+    args = parser.parse_args()
+    store = SQLitePersonStore(args.db)
+    count = store.migrate_from_json(args.json)
+    print(f"{count} Personen nach {args.db} übertragen.")
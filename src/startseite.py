@@ -57,5 +57,15 @@ def show_start_page():
             st.session_state.state = "vergl"
             st.rerun()
 
+    col4, spacer3, col5, spacer4, col6 = st.columns([2, 1, 2, 1, 2])
+    with col4:
+        if st.button("📡 Live-Modus"):
+            st.session_state.state = "live"
+            st.rerun()
+    with col5:
+        if st.button("📊 Kohortenübersicht"):
+            st.session_state.state = "dashboard"
+            st.rerun()
+
     st.write("---")
     st.markdown("**Tipp:** Nutzen Sie die Navigation oben, um zwischen den Funktionen zu wechseln.")
\ No newline at end of file
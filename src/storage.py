@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+
+# Pfade der Personen-Datenbank
+DB_PATH = "data/person_db.json"
+SQLITE_PATH = "data/person_db.sqlite"
+# Speicher-Backend: "json" (Standard) oder "sqlite"
+STORAGE_BACKEND = os.environ.get("EKG_STORAGE", "json")
+
+
+def files_stat_key(paths):
+    """
+    Günstiger Fingerabdruck mehrerer Dateien aus Änderungszeit und Größe.
+
+    Args:
+        paths (list): Pfade der Dateien (fehlende Dateien werden als None geführt).
+
+    Returns:
+        tuple: Ein (mtime in ns, Größe)-Paar pro Datei.
+    """
+    key = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            key.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            key.append(None)
+    return tuple(key)
+
+
+def files_content_hash(paths):
+    """
+    SHA-256 über den Inhalt mehrerer Dateien (fehlende Dateien werden übersprungen).
+
+    Args:
+        paths (list): Pfade der Dateien.
+
+    Returns:
+        str: Hexadezimaler Hash.
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+        except OSError:
+            continue
+    return digest.hexdigest()
+
+
+class JSONPersonStore:
+    """
+    Speichert die Personen-Datenbank als JSON-Datei (data/person_db.json).
+    """
+
+    def __init__(self, path=DB_PATH):
+        """
+        Initialisiert den JSON-Speicher.
+
+        Args:
+            path (str): Pfad zur JSON-Datei.
+        """
+        self.path = path
+
+    def stat_key(self):
+        """
+        Fingerabdruck der JSON-Datei aus Änderungszeit und Größe (siehe files_stat_key).
+        """
+        return files_stat_key([self.path])
+
+    def content_hash(self):
+        """
+        Hash des Inhalts der JSON-Datei.
+        """
+        return files_content_hash([self.path])
+
+    def load(self):
+        """
+        Lädt alle Personen.
+
+        Returns:
+            list: Liste von Dictionaries mit Personendaten.
+        """
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save(self, persons_list):
+        """
+        Schreibt alle Personen atomar in die JSON-Datei.
+
+        Args:
+            persons_list (list): Liste von Dictionaries mit Personendaten.
+        """
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(persons_list, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def set_diagnosis(self, person_id, test_id, diagnosis):
+        """
+        Speichert die Diagnose eines EKG-Tests. Im JSON-Format muss dafür die
+        ganze Datei neu geschrieben werden.
+
+        Args:
+            person_id (str): ID der Person.
+            test_id (str): ID des EKG-Tests.
+            diagnosis (str): Neue Diagnose (leer zum Löschen).
+        """
+        persons_list = self.load()
+        for p in persons_list:
+            if str(p["id"]) == str(person_id):
+                for test in p.get("ekg_tests", []):
+                    if str(test["id"]) == str(test_id):
+                        test["diagnosis"] = diagnosis
+        self.save(persons_list)
+
+
+_stores = {}
+
+
+def get_store(backend=None):
+    """
+    Liefert das konfigurierte Speicher-Backend (einmal pro Prozess erzeugt).
+
+    Args:
+        backend (str): "json" oder "sqlite"; Standard aus der Umgebungsvariable EKG_STORAGE.
+
+    Returns:
+        JSONPersonStore | SQLitePersonStore: Das Backend.
+    """
+    backend = backend or STORAGE_BACKEND
+    if backend not in _stores:
+        if backend == "sqlite":
+            from src.sqlitestore import SQLitePersonStore
+            _stores[backend] = SQLitePersonStore(SQLITE_PATH, json_path=DB_PATH)
+        elif backend == "json":
+            _stores[backend] = JSONPersonStore(DB_PATH)
+        else:
+            raise ValueError("Unbekanntes Speicher-Backend: " + backend)
+    return _stores[backend]
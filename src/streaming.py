@@ -0,0 +1,244 @@
+import argparse
+import os
+import numpy as np
+import pandas as pd
+from src.peaks import DEFAULT_PEAK_PARAMS, find_candidates, suppress_close
+from src.signalcache import txt_time_axis
+
+# Standardschwellwerte der Peak-Erkennung je Dateityp (wie in EKGTest)
+DEFAULT_THRESHOLDS = {filetype: params["threshold"] for filetype, params in DEFAULT_PEAK_PARAMS.items()}
+DEFAULT_MIN_DISTANCE_MS = DEFAULT_PEAK_PARAMS["txt"]["min_distance_ms"]
+DEFAULT_CHUNK_SIZE = 500_000
+COUNT_BLOCK_BYTES = 1 << 24
+WHITESPACE_BYTES = np.frombuffer(b" \t\r\v\f", dtype=np.uint8)
+
+
+def count_txt_samples(path):
+    """
+    Zählt die Samples einer TXT-Aufnahme blockweise, ohne sie zu parsen. Wie bei
+    np.loadtxt zählen nur Zeilen, deren erstes Zeichen außer Leerraum (auch \\r bei
+    CRLF) kein Kommentarzeichen "#" ist.
+
+    Args:
+        path (str): Pfad zur TXT-Datei.
+
+    Returns:
+        int: Anzahl der Samples.
+    """
+    count = 0
+    line_start = True  # Noch kein relevantes Zeichen in der aktuellen Zeile
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(COUNT_BLOCK_BYTES), b""):
+            data = np.frombuffer(block, dtype=np.uint8)
+            # Nur Zeilenumbrüche und Zeichen außer Leerraum sind relevant
+            relevant = data[~np.isin(data, WHITESPACE_BYTES)]
+            if len(relevant) == 0:
+                continue
+            newline = relevant == 10
+            # Ein Zeichen beginnt eine Zeile, wenn davor ein Zeilenumbruch (bzw. Blockanfang
+            # am Zeilenanfang) steht; die Zeile zählt, wenn dieses Zeichen kein "#" ist
+            first = ~newline & np.concatenate([[line_start], newline[:-1]])
+            count += int(np.count_nonzero(first & (relevant != 35)))
+            line_start = bool(newline[-1])
+    return count
+
+
+def iter_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Liest eine EKG-Datei blockweise ein, ohne sie vollständig in den Speicher zu laden.
+
+    Bei TXT-Dateien wird die Zeitachse mit signalcache.txt_time_axis gebildet, also
+    exakt wie beim vollständigen Laden; dafür wird die Anzahl der Samples vorab
+    gezählt. Bei CSV-Dateien stammt sie aus der ersten Spalte.
+
+    Args:
+        path (str): Pfad zur EKG-Datei.
+        chunk_size (int): Anzahl der Samples pro Block.
+
+    Yields:
+        tuple: (Zeit in ms, Spannung) des jeweiligen Blocks.
+    """
+    filetype = os.path.splitext(path)[1].lower().replace('.', '')
+    if filetype == "txt":
+        offset = 0
+        n_samples = count_txt_samples(path)
+        reader = pd.read_csv(path, sep="\t", header=None, usecols=[0], comment="#",
+                             dtype=np.float64, chunksize=chunk_size)
+        for chunk in reader:
+            voltage = chunk.iloc[:, 0].to_numpy()
+            time = txt_time_axis(n_samples, offset, offset + len(voltage))
+            offset += len(voltage)
+            yield time, voltage
+    elif filetype == "csv":
+        for chunk in pd.read_csv(path, chunksize=chunk_size):
+            if chunk.shape[1] < 2:
+                raise ValueError("CSV-Datei hat nicht mindestens 2 Spalten.")
+            yield chunk.iloc[:, 0].to_numpy() * 1000, chunk.iloc[:, 1].to_numpy()
+    else:
+        raise ValueError("Unbekanntes Dateiformat: " + filetype)
+
+
+class StreamingPeakDetector:
+    """
+    Inkrementelle Peak-Erkennung über aufeinanderfolgende Signalblöcke.
+
+    Der Detektor merkt sich die letzten zwei Samples und den zuletzt akzeptierten
+    Peak. Dadurch liefert er über Blockgrenzen hinweg dieselben Peaks wie die
+    Erkennung auf dem vollständigen Signal, ohne Schläge zu verlieren oder doppelt
+    zu zählen.
+    """
+
+    def __init__(self, threshold, min_distance, strict=False, distance_in_samples=False, keep_peaks=True):
+        """
+        Initialisiert den Detektor.
+
+        Args:
+            threshold (float): Schwellwert für die Peak-Erkennung.
+            min_distance (float): Minimaler Peak-Abstand, in ms oder in Samples.
+            strict (bool): Siehe peaks.find_candidates.
+            distance_in_samples (bool): True, wenn min_distance in Samples angegeben ist.
+            keep_peaks (bool): Alle Peak-Indizes sammeln. Bei False werden nur
+                Zähler geführt und der Speicherbedarf bleibt konstant.
+        """
+        self.threshold = threshold
+        self.min_distance = min_distance
+        self.strict = strict
+        self.distance_in_samples = distance_in_samples
+        self.keep_peaks = keep_peaks
+        self.n_samples = 0
+        self.first_time = None
+        self.last_time = None
+        self.num_peaks = 0
+        self.first_peak_time = None
+        self.last_peak_time = None
+        self._tail_time = np.empty(0)
+        self._tail_voltage = np.empty(0)
+        self._last_position = None  # Position (ms oder Index) des letzten Peaks
+        self._peak_blocks = []
+
+    def feed(self, time, voltage):
+        """
+        Verarbeitet den nächsten Signalblock.
+
+        Args:
+            time (np.ndarray): Zeitachse des Blocks in ms.
+            voltage (np.ndarray): Signal des Blocks.
+
+        Returns:
+            tuple: (Indizes, Zeitpunkte in ms) der in diesem Block neu gefundenen Peaks.
+        """
+        time = np.asarray(time)
+        voltage = np.asarray(voltage)
+        if len(voltage) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        if self.first_time is None:
+            self.first_time = float(time[0])
+
+        # Die letzten zwei Samples des Vorgängerblocks voranstellen, damit auch
+        # das letzte Sample des vorherigen Blocks mit seinem Nachfolger geprüft wird
+        ext_time = np.concatenate([self._tail_time, time])
+        ext_voltage = np.concatenate([self._tail_voltage, voltage])
+        ext_start = self.n_samples - len(self._tail_voltage)
+
+        candidates = find_candidates(ext_voltage, self.threshold, strict=self.strict)
+        indices = ext_start + candidates
+        positions = indices if self.distance_in_samples else ext_time[candidates]
+        if self._last_position is not None:
+            positions = np.concatenate([[self._last_position], positions])
+            accepted = suppress_close(positions, self.min_distance)[1:] - 1
+        else:
+            accepted = suppress_close(positions, self.min_distance)
+        new_indices = indices[accepted]
+        new_times = ext_time[candidates[accepted]]
+
+        if len(new_indices):
+            self._last_position = new_indices[-1] if self.distance_in_samples else new_times[-1]
+            if self.first_peak_time is None:
+                self.first_peak_time = float(new_times[0])
+            self.last_peak_time = float(new_times[-1])
+            self.num_peaks += len(new_indices)
+            if self.keep_peaks:
+                self._peak_blocks.append(new_indices.astype(np.int64))
+
+        self.n_samples += len(voltage)
+        self.last_time = float(time[-1])
+        self._tail_time = ext_time[-2:].copy()
+        self._tail_voltage = ext_voltage[-2:].copy()
+        return new_indices, new_times
+
+    @property
+    def peaks(self):
+        """
+        Alle bisher gefundenen Peak-Indizes (nur mit keep_peaks=True).
+        """
+        if not self._peak_blocks:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(self._peak_blocks)
+
+    def bpm(self):
+        """
+        Berechnet die Herzfrequenz wie EKGTest.bpm aus Anzahl und Zeitspanne der Peaks.
+
+        Returns:
+            float: Herzfrequenz in bpm.
+        """
+        if self.num_peaks > 1:
+            dauer_min = (self.last_peak_time - self.first_peak_time) / 1000 / 60
+            return self.num_peaks / dauer_min if dauer_min > 0 else 0
+        return 0
+
+
+def stream_summary(path, chunk_size=DEFAULT_CHUNK_SIZE, threshold=None, min_distance_ms=DEFAULT_MIN_DISTANCE_MS,
+                   keep_peaks=False):
+    """
+    Analysiert eine Aufnahme blockweise mit begrenztem Speicherbedarf, z.B. eine
+    24-Stunden-Holter-Aufnahme.
+
+    Args:
+        path (str): Pfad zur EKG-Datei.
+        chunk_size (int): Anzahl der Samples pro Block.
+        threshold (float): Schwellwert; Standard je nach Dateityp.
+        min_distance_ms (float): Minimaler Peak-Abstand in ms.
+        keep_peaks (bool): Peak-Indizes im Ergebnis mitliefern.
+
+    Returns:
+        dict: Samples, Dauer in Minuten, Anzahl Peaks, bpm (und ggf. Peaks).
+    """
+    filetype = os.path.splitext(path)[1].lower().replace('.', '')
+    if threshold is None:
+        threshold = DEFAULT_THRESHOLDS.get(filetype, DEFAULT_THRESHOLDS["txt"])
+    detector = None
+    for time, voltage in iter_chunks(path, chunk_size):
+        if detector is None:
+            if filetype == "csv":
+                # Wie find_peaks_csv: Abstand in Samples aus dem Median-Abtastintervall
+                dt = np.median(np.diff(time)) if len(time) > 1 else 1.0
+                detector = StreamingPeakDetector(threshold, int(min_distance_ms / dt), strict=True,
+                                                 distance_in_samples=True, keep_peaks=keep_peaks)
+            else:
+                detector = StreamingPeakDetector(threshold, min_distance_ms, keep_peaks=keep_peaks)
+        detector.feed(time, voltage)
+
+    if detector is None:
+        return {"n_samples": 0, "duration_min": 0.0, "num_peaks": 0, "bpm": 0}
+    summary = {
+        "n_samples": detector.n_samples,
+        "duration_min": (detector.last_time - detector.first_time) / 1000 / 60,
+        "num_peaks": detector.num_peaks,
+        "bpm": detector.bpm(),
+    }
+    if keep_peaks:
+        summary["peaks"] = detector.peaks
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analysiert eine EKG-Aufnahme blockweise.")
+    parser.add_argument("path", help="Pfad zur EKG-Datei (.txt oder .csv)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Samples pro Block")
+    args = parser.parse_args()
+    result = stream_summary(args.path, chunk_size=args.chunk_size)
+    print(f"Samples: {result['n_samples']}")
+    print(f"Dauer: {result['duration_min']:.1f} min")
+    print(f"Peaks: {result['num_peaks']}")
+    print(f"Herzfrequenz: {result['bpm']:.1f} bpm")
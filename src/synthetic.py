@@ -0,0 +1,112 @@
+import argparse
+import os
+import numpy as np
+
+# Eigenschaften der mitgelieferten Aufnahmen (siehe data/ekg_data/ReadMe.txt)
+SAMPLE_RATE_HZ = 500
+
+
+def synthetic_signal(start_idx, end_idx, beat_times_ms, sample_rate=SAMPLE_RATE_HZ,
+                     baseline=300.0, amplitude=80.0, width_ms=12.0):
+    """
+    Erzeugt einen Ausschnitt eines synthetischen EKG-Signals mit einer R-Zacke pro Schlag.
+
+    Args:
+        start_idx (int): Erstes Sample des Ausschnitts.
+        end_idx (int): Sample nach dem Ausschnitt.
+        beat_times_ms (np.ndarray): Aufsteigende Zeitpunkte der Schläge in ms.
+        sample_rate (float): Abtastrate in Hz.
+        baseline (float): Grundlinie des Signals.
+        amplitude (float): Höhe der R-Zacken.
+        width_ms (float): Breite der R-Zacken in ms.
+
+    Returns:
+        np.ndarray: Signalwerte des Ausschnitts.
+    """
+    t = np.arange(start_idx, end_idx) * (1000 / sample_rate)
+    if len(beat_times_ms) == 0:
+        return np.full(len(t), baseline)
+    nearest = np.searchsorted(beat_times_ms, t)
+    left = beat_times_ms[np.clip(nearest - 1, 0, len(beat_times_ms) - 1)]
+    right = beat_times_ms[np.clip(nearest, 0, len(beat_times_ms) - 1)]
+    distance = np.minimum(np.abs(t - left), np.abs(t - right))
+    return baseline + amplitude * np.exp(-(distance / width_ms) ** 2)
+
+
+def beat_times(duration_ms, bpm=75.0, jitter=0.05, seed=0):
+    """
+    Erzeugt zufällig schwankende Schlagzeitpunkte für eine Aufnahme.
+
+    Args:
+        duration_ms (float): Dauer der Aufnahme in ms.
+        bpm (float): Mittlere Herzfrequenz.
+        jitter (float): Relative Schwankung der RR-Intervalle.
+        seed (int): Startwert des Zufallsgenerators.
+
+    Returns:
+        np.ndarray: Schlagzeitpunkte in ms.
+    """
+    rng = np.random.default_rng(seed)
+    mean_rr = 60000 / bpm
+    n_beats = int(duration_ms / mean_rr) + 2
+    rr = mean_rr * (1 + jitter * rng.standard_normal(n_beats))
+    times = 200 + np.cumsum(rr)
+    return times[times < duration_ms]
+
+
+def write_synthetic_recording(path, minutes, bpm=75.0, sample_rate=SAMPLE_RATE_HZ,
+                              chunk_size=1_000_000, seed=0):
+    """
+    Schreibt eine synthetische Aufnahme im Format der mitgelieferten Dateien.
+    Das Signal wird blockweise erzeugt, sodass auch 24-Stunden-Dateien mit
+    wenig Speicher entstehen.
+
+    TXT: Messwert und Zeit in ms, tabulatorgetrennt (wie data/ekg_data).
+    CSV: Kopfzeile, Zeit in s und Spannung in mV (wie data/ekg).
+
+    Args:
+        path (str): Zieldatei (.txt oder .csv).
+        minutes (float): Dauer der Aufnahme in Minuten.
+        bpm (float): Mittlere Herzfrequenz.
+        sample_rate (float): Abtastrate in Hz.
+        chunk_size (int): Anzahl der Samples pro geschriebenem Block.
+        seed (int): Startwert des Zufallsgenerators.
+
+    Returns:
+        int: Anzahl der geschriebenen Samples.
+    """
+    filetype = os.path.splitext(path)[1].lower().replace('.', '')
+    if filetype not in ("txt", "csv"):
+        raise ValueError("Unbekanntes Dateiformat: " + filetype)
+    n_samples = int(minutes * 60 * sample_rate)
+    beats = beat_times(n_samples * 1000 / sample_rate, bpm=bpm, seed=seed)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(path, "w", encoding="utf-8") as f:
+        if filetype == "csv":
+            f.write("time (s),lead_II (mV)\n")
+        for start in range(0, n_samples, chunk_size):
+            end = min(start + chunk_size, n_samples)
+            signal = synthetic_signal(start, end, beats, sample_rate=sample_rate)
+            t_ms = np.arange(start, end) * (1000 / sample_rate)
+            if filetype == "txt":
+                block = np.column_stack([np.round(signal), t_ms])
+                np.savetxt(f, block, fmt="%d", delimiter="\t")
+            else:
+                # Auf mV skalieren, damit die CSV-Schwellwerte passen
+                block = np.column_stack([t_ms / 1000, (signal - 300.0) / 80.0])
+                np.savetxt(f, block, fmt="%.6f", delimiter=",")
+    return n_samples
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Erzeugt eine synthetische EKG-Aufnahme.")
+    parser.add_argument("path", help="Zieldatei (.txt oder .csv)")
+    parser.add_argument("--minutes", type=float, default=10, help="Dauer in Minuten (24 h = 1440)")
+    parser.add_argument("--bpm", type=float, default=75, help="Mittlere Herzfrequenz")
+    parser.add_argument("--seed", type=int, default=0, help="Startwert des Zufallsgenerators")
+    args = parser.parse_args()
+    n = write_synthetic_recording(args.path, args.minutes, bpm=args.bpm, seed=args.seed)
+    print(f"{n} Samples nach {args.path} geschrieben.")
@@ -0,0 +1,171 @@
+import argparse
+import hashlib
+import importlib.util
+import io
+import os
+import threading
+from src.signalcache import CACHE_ROOT, file_stat_key
+from src.instrumentation import stage
+
+THUMB_DIR = os.path.join(CACHE_ROOT, "thumbs")
+THUMB_SIZE_PX = 300  # Doppelte Anzeigebreite (150 px), damit Bilder auch auf HiDPI-Displays scharf sind
+JPEG_QUALITY = 85
+ORIENTATION_TAG = 0x0112  # EXIF-Ausrichtung
+
+_digests = {}  # (Pfad, mtime, Größe) -> SHA-256 des Inhalts
+_lock = threading.Lock()
+
+
+def pillow_available():
+    """
+    True, wenn Pillow zum Verkleinern der Bilder installiert ist.
+    """
+    return importlib.util.find_spec("PIL") is not None
+
+
+def content_digest(path):
+    """
+    SHA-256 des Dateiinhalts. Pro Prozess wird jede Datei (Pfad, Änderungszeit,
+    Größe) nur einmal gehasht.
+
+    Args:
+        path (str): Pfad zur Datei.
+
+    Returns:
+        str: Hexadezimaler Hash.
+    """
+    key = file_stat_key(path)
+    with _lock:
+        digest = _digests.get(key)
+    if digest is None:
+        hasher = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                hasher.update(block)
+        digest = hasher.hexdigest()
+        with _lock:
+            _digests[key] = digest
+    return digest
+
+
+def thumbnail_path(digest, size=THUMB_SIZE_PX, directory=THUMB_DIR):
+    """
+    Pfad des Vorschaubilds im inhaltsadressierten Cache.
+
+    Args:
+        digest (str): SHA-256 des Originals.
+        size (int): Maximale Kantenlänge in Pixeln.
+        directory (str): Cache-Verzeichnis.
+
+    Returns:
+        str: Pfad zur JPEG-Datei.
+    """
+    return os.path.join(directory, f"{digest}-{size}.jpg")
+
+
+def render_thumbnail(source, size=THUMB_SIZE_PX):
+    """
+    Verkleinert ein Bild auf die maximale Kantenlänge und kodiert es als JPEG.
+    Die EXIF-Ausrichtung wird übernommen, bei animierten Bildern das erste Bild
+    verwendet und Transparenz auf weißem Hintergrund geglättet. Kleine JPEGs
+    werden unverändert übernommen, wenn sie kompakter als die Neukodierung sind.
+
+    Args:
+        source (str | io.BytesIO): Pfad oder Inhalt des Originals.
+        size (int): Maximale Kantenlänge in Pixeln.
+
+    Returns:
+        bytes: Das Vorschaubild.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as image:
+        # Kleine JPEGs ohne Drehung können unverändert übernommen werden
+        keep_original = (image.format == "JPEG" and max(image.size) <= size
+                         and not image.getexif().get(ORIENTATION_TAG))
+        image.draft("RGB", (size, size))  # JPEGs direkt verkleinert dekodieren
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((size, size), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, "white")
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    data = buffer.getvalue()
+    if keep_original:
+        if isinstance(source, str):
+            with open(source, "rb") as f:
+                original = f.read()
+        else:
+            original = source.getvalue()
+        if len(original) <= len(data):
+            return original
+    return data
+
+
+def get_thumbnail(path, size=THUMB_SIZE_PX, directory=THUMB_DIR):
+    """
+    Liefert das Vorschaubild eines Bildes und erzeugt es beim ersten Aufruf.
+    Gleiche Bilder teilen sich über den Inhalts-Hash ein Vorschaubild.
+
+    Ohne Pillow oder bei nicht lesbaren Bildern wird der Pfad des Originals
+    zurückgegeben, damit die Anzeige weiter funktioniert.
+
+    Args:
+        path (str): Pfad zum Original.
+        size (int): Maximale Kantenlänge in Pixeln.
+        directory (str): Cache-Verzeichnis.
+
+    Returns:
+        str: Pfad zum Vorschaubild (bzw. zum Original).
+    """
+    if not pillow_available():
+        return path
+    digest = content_digest(path)
+    thumb = thumbnail_path(digest, size, directory)
+    if os.path.exists(thumb):
+        return thumb
+
+    from PIL import UnidentifiedImageError
+
+    with stage("thumbnail", size=size) as s:
+        try:
+            data = render_thumbnail(path, size)
+        except (UnidentifiedImageError, OSError, ValueError):
+            return path
+        s.set(kb_in=os.path.getsize(path) / 1024, kb_out=len(data) / 1024)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{thumb}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, thumb)
+    except OSError:
+        return path  # Ohne beschreibbaren Cache wird das Original angezeigt
+    return thumb
+
+
+def main():
+    """
+    Erzeugt die Vorschaubilder aller Personen der Datenbank vorab.
+    """
+    from src.storage import get_store
+
+    parser = argparse.ArgumentParser(description="Erzeugt Vorschaubilder der Probantenbilder.")
+    parser.add_argument("--size", type=int, default=THUMB_SIZE_PX, help="Maximale Kantenlänge in Pixeln")
+    args = parser.parse_args()
+
+    for person in get_store().load():
+        path = person.get("picture_path")
+        if not path or not os.path.exists(path):
+            continue
+        thumb = get_thumbnail(path, args.size)
+        print(f"{path}: {os.path.getsize(path) / 1024:.0f} KB -> {thumb} ({os.path.getsize(thumb) / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,43 @@
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
-import json
+from src.alignment import plot_overlay
+from src.instrumentation import bind_run, stage
+
+
+def _prepare_test(ekg_test):
+    """
+    Lädt und analysiert einen Test vollständig (Signal, Peaks, Plot-Pyramide, HRV,
+    gemittelter Herzschlag), damit das anschließende Rendern nur noch gecachte
+    Ergebnisse nutzt.
+    Läuft in einem Worker-Thread und ruft daher kein Streamlit auf.
+    """
+    ekg_test.analyze()
+    ekg_test.get_pyramid()
+    ekg_test.hrv()
+    ekg_test.beat_template()
+    return ekg_test
+
+
+def prepare_tests(ekg_tests):
+    """
+    Bereitet mehrere Tests gleichzeitig vor. Threads genügen, da NumPy und das
+    Einlesen die meiste Zeit ohne GIL laufen und der Aufnahme-Cache im Prozess liegt.
+
+    Args:
+        ekg_tests (list): Die Tests (None-Einträge werden übersprungen).
+
+    Returns:
+        list: Pro Test None oder die aufgetretene Exception.
+    """
+    errors = [None] * len(ekg_tests)
+    jobs = [(i, t) for i, t in enumerate(ekg_tests) if t is not None]
+    if not jobs:
+        return errors
+    with stage("prepare_tests", tests=len(jobs)), ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        futures = [(i, pool.submit(bind_run(_prepare_test), t)) for i, t in jobs]
+        for i, future in futures:
+            errors[i] = future.exception()
+    return errors
 
 def show_vergleich_page(person_db):
     """
@@ -54,7 +92,7 @@ def show_vergleich_page(person_db):
     st.markdown('<div class="subtitle">Vergleichen Sie zwei Probanten und deren EKGs.</div>', unsafe_allow_html=True)
     st.write("---")
 
-    if not person_db.persons or len(person_db.persons) < 2:
+    if len(person_db) < 2:
         st.warning("Mindestens zwei Probanten werden benötigt.")
         return
 
@@ -70,7 +108,7 @@ def show_vergleich_page(person_db):
             ekg1_options = [f"{e.test_id}: {e.date}" for e in person1.ekg_tests]
             ekg1_sel = st.selectbox("EKG von Probant 1 auswählen", ekg1_options, key="vergleich_ekg1")
             ekg1_id = ekg1_sel.split(":")[0]
-            ekg1 = next((e for e in person1.ekg_tests if str(e.test_id) == ekg1_id), None)
+            ekg1 = next((e.copy() for e in person1.ekg_tests if str(e.test_id) == ekg1_id), None)
 
     with col_div:
         st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
@@ -86,42 +124,43 @@ def show_vergleich_page(person_db):
             ekg2_options = [f"{e.test_id}: {e.date}" for e in person2.ekg_tests]
             ekg2_sel = st.selectbox("EKG von Probant 2 auswählen", ekg2_options, key="vergleich_ekg2")
             ekg2_id = ekg2_sel.split(":")[0]
-            ekg2 = next((e for e in person2.ekg_tests if str(e.test_id) == ekg2_id), None)
+            ekg2 = next((e.copy() for e in person2.ekg_tests if str(e.test_id) == ekg2_id), None)
 
     st.write("---")
 
+    # Beide Aufnahmen gleichzeitig laden und analysieren, gerendert wird danach
+    error1, error2 = prepare_tests([ekg1 if person1 else None, ekg2 if person2 else None])
+
     col_left, col_div, col_right = st.columns([5, 1, 5])
     with col_left:
         if person1 and ekg1:
             st.markdown(f"**Test-ID:** {ekg1.test_id}")
             st.markdown(f"**Datum:** {ekg1.date}")
             try:
+                if error1 is not None:
+                    raise error1
                 fig1, num_peaks1, bpm1 = ekg1.plot()
                 st.plotly_chart(fig1, use_container_width=True)
                 st.markdown(f"**Anzahl der Peaks:** {num_peaks1}")
                 st.markdown(f"**Herzfrequenz:** {int(round(bpm1))} bpm")
+                hrv1 = ekg1.hrv()
+                st.markdown(
+                    f"**HRV:** SDNN {hrv1['sdnn_ms']:.1f} ms · RMSSD {hrv1['rmssd_ms']:.1f} ms · "
+                    f"pNN50 {hrv1['pnn50']:.1f} %"
+                )
+                fig_beat1 = ekg1.plot_beat_template()
+                if fig_beat1 is not None:
+                    st.plotly_chart(fig_beat1, use_container_width=True)
             except Exception as e:
                 st.error(f"Fehler beim Plotten: {e}")
 
             # Diagnosefeld für EKG1
-            diagnosis1 = ""
-            with open("data/person_db.json", "r", encoding="utf-8") as f:
-                persons_list = json.load(f)
-            for p in persons_list:
-                if str(p["id"]) == str(person1.id):
-                    for test in p.get("ekg_tests", []):
-                        if str(test["id"]) == str(ekg1.test_id):
-                            diagnosis1 = test.get("diagnosis", "")
+            diagnosis1 = ekg1.diagnosis or ""
 
             new_diag1 = st.text_area("Diagnose zu diesem EKG-Test", value=diagnosis1, key=f"vergleich_diag1_{ekg1.test_id}")
             if st.button("Diagnose speichern (links)", key=f"vergleich_save_diag1_{ekg1.test_id}"):
-                for p in persons_list:
-                    if str(p["id"]) == str(person1.id):
-                        for test in p.get("ekg_tests", []):
-                            if str(test["id"]) == str(ekg1.test_id):
-                                test["diagnosis"] = new_diag1
-                with open("data/person_db.json", "w", encoding="utf-8") as f:
-                    json.dump(persons_list, f, ensure_ascii=False, indent=2)
+                person_db.set_diagnosis(ekg1.test_id, new_diag1)
+                person_db.save()
                 st.success("Diagnose gespeichert!")
                 st.rerun()
             if diagnosis1:
@@ -130,13 +169,8 @@ def show_vergleich_page(person_db):
                     unsafe_allow_html=True
                 )
                 if st.button("Diagnose löschen (links)", key=f"vergleich_del_diag1_{ekg1.test_id}"):
-                    for p in persons_list:
-                        if str(p["id"]) == str(person1.id):
-                            for test in p.get("ekg_tests", []):
-                                if str(test["id"]) == str(ekg1.test_id):
-                                    test["diagnosis"] = ""
-                    with open("data/person_db.json", "w", encoding="utf-8") as f:
-                        json.dump(persons_list, f, ensure_ascii=False, indent=2)
+                    person_db.set_diagnosis(ekg1.test_id, "")
+                    person_db.save()
                     st.success("Diagnose gelöscht!")
                     st.rerun()
 
@@ -148,32 +182,30 @@ def show_vergleich_page(person_db):
             st.markdown(f"**Test-ID:** {ekg2.test_id}")
             st.markdown(f"**Datum:** {ekg2.date}")
             try:
+                if error2 is not None:
+                    raise error2
                 fig2, num_peaks2, bpm2 = ekg2.plot()
                 st.plotly_chart(fig2, use_container_width=True)
                 st.markdown(f"**Anzahl der Peaks:** {num_peaks2}")
                 st.markdown(f"**Herzfrequenz:** {int(round(bpm2))} bpm")
+                hrv2 = ekg2.hrv()
+                st.markdown(
+                    f"**HRV:** SDNN {hrv2['sdnn_ms']:.1f} ms · RMSSD {hrv2['rmssd_ms']:.1f} ms · "
+                    f"pNN50 {hrv2['pnn50']:.1f} %"
+                )
+                fig_beat2 = ekg2.plot_beat_template()
+                if fig_beat2 is not None:
+                    st.plotly_chart(fig_beat2, use_container_width=True)
             except Exception as e:
                 st.error(f"Fehler beim Plotten: {e}")
 
             # Diagnosefeld für EKG2
-            diagnosis2 = ""
-            with open("data/person_db.json", "r", encoding="utf-8") as f:
-                persons_list = json.load(f)
-            for p in persons_list:
-                if str(p["id"]) == str(person2.id):
-                    for test in p.get("ekg_tests", []):
-                        if str(test["id"]) == str(ekg2.test_id):
-                            diagnosis2 = test.get("diagnosis", "")
+            diagnosis2 = ekg2.diagnosis or ""
 
             new_diag2 = st.text_area("Diagnose zu diesem EKG-Test", value=diagnosis2, key=f"vergleich_diag2_{ekg2.test_id}")
             if st.button("Diagnose speichern (rechts)", key=f"vergleich_save_diag2_{ekg2.test_id}"):
-                for p in persons_list:
-                    if str(p["id"]) == str(person2.id):
-                        for test in p.get("ekg_tests", []):
-                            if str(test["id"]) == str(ekg2.test_id):
-                                test["diagnosis"] = new_diag2
-                with open("data/person_db.json", "w", encoding="utf-8") as f:
-                    json.dump(persons_list, f, ensure_ascii=False, indent=2)
+                person_db.set_diagnosis(ekg2.test_id, new_diag2)
+                person_db.save()
                 st.success("Diagnose gespeichert!")
                 st.rerun()
             if diagnosis2:
@@ -182,15 +214,34 @@ def show_vergleich_page(person_db):
                     unsafe_allow_html=True
                 )
                 if st.button("Diagnose löschen (rechts)", key=f"vergleich_del_diag2_{ekg2.test_id}"):
-                    for p in persons_list:
-                        if str(p["id"]) == str(person2.id):
-                            for test in p.get("ekg_tests", []):
-                                if str(test["id"]) == str(ekg2.test_id):
-                                    test["diagnosis"] = ""
-                    with open("data/person_db.json", "w", encoding="utf-8") as f:
-                        json.dump(persons_list, f, ensure_ascii=False, indent=2)
+                    person_db.set_diagnosis(ekg2.test_id, "")
+                    person_db.save()
                     st.success("Diagnose gelöscht!")
                     st.rerun()
 
+    # --- Überlagerung beider EKGs auf einer Zeitachse ---
+    if ekg1 and ekg2 and error1 is None and error2 is None:
+        st.write("---")
+        if st.checkbox("EKGs überlagern (per Kreuzkorrelation ausgerichtet)", key="vergleich_overlay"):
+            t_min = round(float(ekg1.time[0]) / 1000, 1)
+            t_max = round(float(ekg1.time[-1]) / 1000, 1)
+            if t_max > t_min:
+                window = st.slider(
+                    "Zeitbereich der Überlagerung in s",
+                    min_value=t_min,
+                    max_value=t_max,
+                    value=(t_min, min(t_min + 10, t_max)),
+                    step=0.1,
+                    key=f"vergleich_overlay_bereich_{ekg1.test_id}"
+                )
+                try:
+                    with stage("overlay", tests=2):
+                        fig_overlay, lag_ms = plot_overlay(ekg1, ekg2, window[0] * 1000, window[1] * 1000)
+                    st.plotly_chart(fig_overlay, use_container_width=True)
+                    st.caption(f"Test {ekg2.test_id} ist um {lag_ms / 1000:+.2f} s verschoben, "
+                               "Amplituden sind z-normiert.")
+                except Exception as e:
+                    st.error(f"Fehler bei der Überlagerung: {e}")
+
     st.write("---")
     st.button("Zurück zur Startseite", on_click=lambda: st.session_state.update(state="start"))
\ No newline at end of file